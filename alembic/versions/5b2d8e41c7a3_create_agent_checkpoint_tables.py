@@ -0,0 +1,67 @@
+"""create agent checkpoint tables
+
+Revision ID: 5b2d8e41c7a3
+Revises: cf9a9a14a855
+Create Date: 2026-10-17 09:12:40.118203
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5b2d8e41c7a3"
+down_revision: Union[str, Sequence[str], None] = "cf9a9a14a855"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "agent_checkpoints",
+        sa.Column("thread_id", sa.String(length=255), nullable=False),
+        sa.Column("checkpoint_ns", sa.String(length=255), nullable=False),
+        sa.Column("checkpoint_id", sa.String(length=64), nullable=False),
+        sa.Column(
+            "data",
+            sa.LargeBinary().with_variant(mysql.LONGBLOB(), "mysql"),
+            nullable=False,
+        ),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("thread_id", "checkpoint_ns", "checkpoint_id"),
+    )
+    op.create_index(
+        op.f("ix_agent_checkpoints_updated_at"),
+        "agent_checkpoints",
+        ["updated_at"],
+        unique=False,
+    )
+    op.create_table(
+        "agent_checkpoint_writes",
+        sa.Column("thread_id", sa.String(length=255), nullable=False),
+        sa.Column("checkpoint_ns", sa.String(length=255), nullable=False),
+        sa.Column("checkpoint_id", sa.String(length=64), nullable=False),
+        sa.Column("write_key", sa.String(length=128), nullable=False),
+        sa.Column(
+            "data",
+            sa.LargeBinary().with_variant(mysql.LONGBLOB(), "mysql"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint(
+            "thread_id", "checkpoint_ns", "checkpoint_id", "write_key"
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("agent_checkpoint_writes")
+    op.drop_index(
+        op.f("ix_agent_checkpoints_updated_at"), table_name="agent_checkpoints"
+    )
+    op.drop_table("agent_checkpoints")
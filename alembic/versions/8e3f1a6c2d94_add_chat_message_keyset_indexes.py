@@ -0,0 +1,86 @@
+"""add chat and message keyset indexes
+
+Revision ID: 8e3f1a6c2d94
+Revises: 5b2d8e41c7a3
+Create Date: 2026-10-17 17:40:12.503318
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8e3f1a6c2d94"
+down_revision: Union[str, Sequence[str], None] = "5b2d8e41c7a3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # chats/messages had no migration before this one; create them if missing
+    existing = sa.inspect(op.get_bind()).get_table_names()
+    if "chats" not in existing:
+        op.create_table(
+            "chats",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("title", sa.String(length=255), nullable=False),
+            sa.Column("thread_id", sa.String(length=255), nullable=False),
+            sa.Column(
+                "created_at",
+                sa.DateTime(timezone=True),
+                server_default=sa.text("now()"),
+                nullable=True,
+            ),
+            sa.Column(
+                "updated_at",
+                sa.DateTime(timezone=True),
+                server_default=sa.text("now()"),
+                nullable=True,
+            ),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint("thread_id"),
+        )
+        op.create_index(op.f("ix_chats_id"), "chats", ["id"], unique=False)
+    if "messages" not in existing:
+        op.create_table(
+            "messages",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("chat_id", sa.Integer(), nullable=False),
+            sa.Column("role", sa.String(length=50), nullable=False),
+            sa.Column("content", sa.Text(), nullable=False),
+            sa.Column(
+                "created_at",
+                sa.DateTime(timezone=True),
+                server_default=sa.text("now()"),
+                nullable=True,
+            ),
+            sa.ForeignKeyConstraint(["chat_id"], ["chats.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index(op.f("ix_messages_id"), "messages", ["id"], unique=False)
+
+    op.create_index(
+        "ix_chats_user_created_id",
+        "chats",
+        ["user_id", "created_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_messages_chat_created_id",
+        "messages",
+        ["chat_id", "created_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Leaves chats/messages in place; they may predate this migration
+    op.drop_index("ix_messages_chat_created_id", table_name="messages")
+    op.drop_index("ix_chats_user_created_id", table_name="chats")
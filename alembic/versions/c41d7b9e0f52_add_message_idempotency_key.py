@@ -0,0 +1,35 @@
+"""add message idempotency key
+
+Revision ID: c41d7b9e0f52
+Revises: 8e3f1a6c2d94
+Create Date: 2026-10-17 18:02:47.915530
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c41d7b9e0f52"
+down_revision: Union[str, Sequence[str], None] = "8e3f1a6c2d94"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "messages", sa.Column("message_key", sa.String(length=64), nullable=True)
+    )
+    op.create_unique_constraint(
+        "uq_messages_message_key", "messages", ["message_key"]
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint("uq_messages_message_key", "messages", type_="unique")
+    op.drop_column("messages", "message_key")
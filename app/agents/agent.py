@@ -1,22 +1,50 @@
-from langchain_openai import ChatOpenAI
-from langgraph.prebuilt import create_react_agent
+"""
+Financial tools and the agent graph.
+
+The tools are defined at import time. The LLM client, checkpointer and
+compiled graph are built on first use (get_llm / get_agent) or ahead of
+the first request by warm_up() in the app lifespan: building them pulls in
+langchain_openai, openai and langgraph, which would otherwise slow down
+every worker boot and every process that only needs the tools (such as
+the tool pool workers). Keep those imports inside the builders.
+"""
 from langchain_core.tools import tool
+from pydantic import ValidationError
 from app.core.config import settings
 import math
-from langgraph.checkpoint.memory import MemorySaver
-from typing import List, Dict
+from app.agents.tool_pool import cpu_bound, single_flight
+from app.agents.tool_results import (
+    BudgetResult,
+    CompoundInterestResult,
+    DebtPayoffResult,
+    EmergencyFundResult,
+    LoanPaymentResult,
+    MonteCarloResult,
+    PayoffStrategy,
+    PortfolioResult,
+    RetirementResult,
+    SavingsResult,
+    ScenarioSweepResult,
+    TaxResult,
+)
+from app.services import finance_math, monte_carlo
+from app.services.scenarios import CALCULATORS, parse_grid_spec, run_batch
+
+# Tools return (compact content for the model, structured result); see
+# app.agents.tool_results
+financial_tool = tool(response_format="content_and_artifact")
 
 
-@tool
-def savings_calculator(amount: float, months: int) -> str:
+@financial_tool
+def savings_calculator(amount: float, months: int):
     """Calculate savings for a given monthly amount and months."""
-    return f"Total savings after {months} months: ${amount * months}"
+    return SavingsResult(months=months, total=amount * months).output()
 
 
-@tool
+@financial_tool
 def compound_interest(
     principal: float, monthly_contrib: float, annual_rate: float, years: int
-) -> str:
+):
     """
     Calculate compound interest with monthly contributions.
     principal = initial amount
@@ -24,39 +52,37 @@ def compound_interest(
     annual_rate = annual interest rate in percent (e.g. 5 for 5%)
     years = investment duration in years
     """
-    r = annual_rate / 100 / 12  # monthly rate
-    months = years * 12
-    future_value = principal * (1 + r) ** months
-    for _ in range(months):
-        future_value = (future_value + monthly_contrib) * (1 + r)
-    return f"Future value after {years} years: ${future_value:,.2f}"
+    # Contributions are made at the start of each month
+    future_value = finance_math.future_value(
+        principal, monthly_contrib, annual_rate, years, contrib_at_start=True
+    )
+    return CompoundInterestResult(years=years, future_value=future_value).output()
 
 
-@tool
+@financial_tool
 def loan_payment_calculator(
     principal: float, annual_rate: float, years: int
-) -> str:
+):
     """
     Calculate monthly loan payment using standard amortization formula.
     principal = loan amount
     annual_rate = annual interest rate in percent (e.g. 5 for 5%)
     years = loan term in years
     """
-    if annual_rate == 0:
-        monthly_payment = principal / (years * 12)
-        return f"Monthly payment (0% interest): ${monthly_payment:,.2f}"
-    
-    r = annual_rate / 100 / 12  # monthly rate
-    n = years * 12  # total payments
-    monthly_payment = principal * (r * (1 + r)**n) / ((1 + r)**n - 1)
-    total_paid = monthly_payment * n
+    monthly_payment = finance_math.loan_payment(principal, annual_rate, years)
+    total_paid = monthly_payment * years * 12
     total_interest = total_paid - principal
-    
-    return f"Monthly payment: ${monthly_payment:,.2f}\nTotal paid: ${total_paid:,.2f}\nTotal interest: ${total_interest:,.2f}"
 
+    return LoanPaymentResult(
+        annual_rate=annual_rate,
+        monthly_payment=monthly_payment,
+        total_paid=total_paid,
+        total_interest=total_interest,
+    ).output()
 
-@tool
-def portfolio_analyzer(investments: str) -> str:
+
+@financial_tool
+def portfolio_analyzer(investments: str):
     """
     Analyze investment portfolio allocation and risk.
     investments = comma-separated list like "stocks:60,bonds:30,cash:10"
@@ -71,7 +97,7 @@ def portfolio_analyzer(investments: str) -> str:
             total += percent
         
         if abs(total - 100) > 0.1:
-            return f"Warning: Allocations total {total}%, should equal 100%"
+            return f"Warning: Allocations total {total}%, should equal 100%", None
         
         risk_scores = {
             'stocks': 8, 'equities': 8, 'crypto': 10, 'cryptocurrency': 10,
@@ -83,24 +109,27 @@ def portfolio_analyzer(investments: str) -> str:
         
         risk_level = "Conservative" if portfolio_risk <= 3 else "Moderate" if portfolio_risk <= 6 else "Aggressive"
         
-        analysis = f"Portfolio Analysis:\n"
-        for asset, percent in allocations.items():
-            analysis += f"- {asset.title()}: {percent}%\n"
-        analysis += f"\nRisk Level: {risk_level} ({portfolio_risk:.1f}/10)\n"
-        
+        recommendation = None
         if portfolio_risk > 7:
-            analysis += "Recommendation: Consider reducing high-risk investments for better balance"
+            recommendation = (
+                "Consider reducing high-risk investments for better balance"
+            )
         elif portfolio_risk < 3:
-            analysis += "Recommendation: Consider adding growth investments for better returns"
+            recommendation = "Consider adding growth investments for better returns"
         
-        return analysis
+        return PortfolioResult(
+            allocations=allocations,
+            risk_score=portfolio_risk,
+            risk_level=risk_level,
+            recommendation=recommendation,
+        ).output()
         
-    except Exception as e:
-        return f"Error parsing portfolio. Use format: 'stocks:60,bonds:30,cash:10'"
+    except Exception:
+        return "Error parsing portfolio. Use format: 'stocks:60,bonds:30,cash:10'", None
 
 
-@tool
-def budget_planner(income: float, expenses: str) -> str:
+@financial_tool
+def budget_planner(income: float, expenses: str):
     """
     Analyze monthly budget and provide recommendations.
     income = monthly income
@@ -119,33 +148,39 @@ def budget_planner(income: float, expenses: str) -> str:
         remaining = income - total_expenses
         savings_rate = (remaining / income) * 100 if income > 0 else 0
         
-        budget_analysis = f"Budget Analysis:\n"
-        budget_analysis += f"Monthly Income: ${income:,.2f}\n"
-        budget_analysis += f"Total Expenses: ${total_expenses:,.2f}\n"
-        budget_analysis += f"Remaining: ${remaining:,.2f}\n"
-        budget_analysis += f"Savings Rate: {savings_rate:.1f}%\n\n"
-        
-        budget_analysis += "Expense Breakdown:\n"
-        for category, amount in expense_dict.items():
-            percentage = (amount / income) * 100 if income > 0 else 0
-            budget_analysis += f"- {category.title()}: ${amount:,.2f} ({percentage:.1f}%)\n"
-        
+        shares = {
+            category: (amount / income) * 100 if income > 0 else 0
+            for category, amount in expense_dict.items()
+        }
         if savings_rate < 10:
-            budget_analysis += "\n⚠️  Low savings rate. Consider reducing discretionary spending."
+            rating = "low"
         elif savings_rate > 20:
-            budget_analysis += "\n✅ Excellent savings rate! Consider investing surplus."
+            rating = "excellent"
+        else:
+            rating = "ok"
         
-        return budget_analysis
+        return BudgetResult(
+            income=income,
+            expenses=expense_dict,
+            total_expenses=total_expenses,
+            remaining=remaining,
+            savings_rate=savings_rate,
+            expense_shares=shares,
+            savings_rating=rating,
+        ).output()
         
-    except Exception as e:
-        return f"Error parsing budget. Use format: 'rent:1200,food:500,transport:300'"
+    except Exception:
+        return (
+            "Error parsing budget. Use format: 'rent:1200,food:500,transport:300'",
+            None,
+        )
 
 
-@tool
+@financial_tool
 def retirement_calculator(
     current_age: int, retirement_age: int, current_savings: float, 
     monthly_contribution: float, annual_return: float
-) -> str:
+):
     """
     Calculate retirement savings projection.
     current_age = your current age
@@ -156,42 +191,30 @@ def retirement_calculator(
     """
     years_to_retire = retirement_age - current_age
     if years_to_retire <= 0:
-        return "You're already at or past retirement age!"
-    
-    r = annual_return / 100 / 12  # monthly rate
-    months = years_to_retire * 12
-    
-    # Future value of current savings
-    future_current = current_savings * (1 + annual_return/100) ** years_to_retire
-    
-    # Future value of monthly contributions
-    if r > 0:
-        future_contributions = monthly_contribution * (((1 + r) ** months - 1) / r)
-    else:
-        future_contributions = monthly_contribution * months
+        return "You're already at or past retirement age!", None
     
-    total_retirement = future_current + future_contributions
+    # Savings and contributions both compound monthly
+    total_retirement = finance_math.future_value(
+        current_savings, monthly_contribution, annual_return, years_to_retire
+    )
     
     # 4% withdrawal rule estimate
     annual_income = total_retirement * 0.04
     monthly_income = annual_income / 12
     
-    result = f"Retirement Projection ({years_to_retire} years):\n"
-    result += f"Total at retirement: ${total_retirement:,.2f}\n"
-    result += f"Estimated annual income (4% rule): ${annual_income:,.2f}\n"
-    result += f"Estimated monthly income: ${monthly_income:,.2f}\n\n"
-    
-    # Recommendations
-    if monthly_income < monthly_contribution * 10:  # Rule of thumb
-        result += "⚠️  Consider increasing contributions for better retirement income."
-    else:
-        result += "✅ You're on track for a comfortable retirement!"
-    
-    return result
+    return RetirementResult(
+        years_to_retire=years_to_retire,
+        total_at_retirement=total_retirement,
+        annual_income=annual_income,
+        monthly_income=monthly_income,
+        on_track=monthly_income >= monthly_contribution * 10,  # Rule of thumb
+    ).output()
 
 
-@tool
-def debt_payoff_calculator(debt_amount: float, interest_rate: float, payment_strategies: str) -> str:
+@financial_tool
+def debt_payoff_calculator(
+    debt_amount: float, interest_rate: float, payment_strategies: str
+):
     """
     Compare debt payoff strategies.
     debt_amount = total debt amount
@@ -204,43 +227,42 @@ def debt_payoff_calculator(debt_amount: float, interest_rate: float, payment_str
             name, payment = strategy.strip().split(':')
             strategies[name.strip()] = float(payment)
         
-        r = interest_rate / 100 / 12  # monthly rate
         results = []
         
         for strategy_name, monthly_payment in strategies.items():
-            if monthly_payment <= debt_amount * r:
-                results.append(f"{strategy_name}: Payment too low to cover interest!")
+            months, total_paid, interest_paid = finance_math.payoff_totals(
+                debt_amount, interest_rate, monthly_payment
+            )
+            if months == float("inf"):
+                # Payment too low to cover interest
+                results.append(
+                    PayoffStrategy(name=strategy_name, monthly_payment=monthly_payment)
+                )
                 continue
-                
-            balance = debt_amount
-            months = 0
-            total_paid = 0
-            
-            while balance > 0 and months < 600:  # 50 year max
-                interest_payment = balance * r
-                principal_payment = min(monthly_payment - interest_payment, balance)
-                balance -= principal_payment
-                total_paid += monthly_payment
-                months += 1
-                
-                if balance <= 0:
-                    break
             
-            years = months / 12
-            interest_paid = total_paid - debt_amount
-            
-            results.append(f"{strategy_name.title()}: {months} months ({years:.1f} years)")
-            results.append(f"  Total paid: ${total_paid:,.2f}")
-            results.append(f"  Interest paid: ${interest_paid:,.2f}\n")
+            results.append(
+                PayoffStrategy(
+                    name=strategy_name,
+                    monthly_payment=monthly_payment,
+                    months=int(months),
+                    total_paid=total_paid,
+                    interest_paid=interest_paid,
+                )
+            )
         
-        return "Debt Payoff Comparison:\n" + "\n".join(results)
+        return DebtPayoffResult(strategies=results).output()
         
-    except Exception as e:
-        return f"Error parsing strategies. Use format: 'minimum:200,aggressive:400'"
+    except Exception:
+        return (
+            "Error parsing strategies. Use format: 'minimum:200,aggressive:400'",
+            None,
+        )
 
 
-@tool
-def emergency_fund_calculator(monthly_expenses: float, current_savings: float, target_months: int = 6) -> str:
+@financial_tool
+def emergency_fund_calculator(
+    monthly_expenses: float, current_savings: float, target_months: int = 6
+):
     """
     Calculate emergency fund requirements and progress.
     monthly_expenses = your monthly expenses
@@ -251,30 +273,32 @@ def emergency_fund_calculator(monthly_expenses: float, current_savings: float, t
     remaining_needed = max(0, target_amount - current_savings)
     coverage_months = current_savings / monthly_expenses if monthly_expenses > 0 else 0
     
-    result = f"Emergency Fund Analysis:\n"
-    result += f"Monthly expenses: ${monthly_expenses:,.2f}\n"
-    result += f"Target fund ({target_months} months): ${target_amount:,.2f}\n"
-    result += f"Current savings: ${current_savings:,.2f}\n"
-    result += f"Current coverage: {coverage_months:.1f} months\n"
-    result += f"Still needed: ${remaining_needed:,.2f}\n\n"
-    
     if coverage_months < 3:
-        result += "⚠️  Critical: Build emergency fund immediately!"
+        status = "critical"
     elif coverage_months < 6:
-        result += "⚠️  Warning: Increase emergency fund when possible."
+        status = "warning"
     else:
-        result += "✅ Great! You have adequate emergency coverage."
+        status = "adequate"
     
+    months_to_target = {}
     if remaining_needed > 0:
         for monthly_save in [100, 250, 500]:
-            months_to_target = remaining_needed / monthly_save
-            result += f"\nSaving ${monthly_save}/month: {months_to_target:.1f} months to target"
+            months_to_target[str(monthly_save)] = remaining_needed / monthly_save
     
-    return result
+    return EmergencyFundResult(
+        monthly_expenses=monthly_expenses,
+        current_savings=current_savings,
+        target_months=target_months,
+        target_amount=target_amount,
+        coverage_months=coverage_months,
+        remaining_needed=remaining_needed,
+        status=status,
+        months_to_target=months_to_target,
+    ).output()
 
 
-@tool
-def tax_calculator(income: float, filing_status: str = "single", state: str = "none") -> str:
+@financial_tool
+def tax_calculator(income: float, filing_status: str = "single", state: str = "none"):
     """
     Estimate federal income tax (simplified US tax calculation).
     income = annual gross income
@@ -317,35 +341,214 @@ def tax_calculator(income: float, filing_status: str = "single", state: str = "n
     effective_rate = (tax / income * 100) if income > 0 else 0
     marginal_rate = next((rate * 100 for limit, rate in brackets if taxable_income <= limit), 37)
     
-    result = f"Tax Estimate ({filing_status}):\n"
-    result += f"Gross income: ${income:,.2f}\n"
-    result += f"Standard deduction: ${standard_deduction:,.2f}\n"
-    result += f"Taxable income: ${taxable_income:,.2f}\n"
-    result += f"Federal tax: ${tax:,.2f}\n"
-    result += f"After-tax income: ${income - tax:,.2f}\n"
-    result += f"Effective rate: {effective_rate:.1f}%\n"
-    result += f"Marginal rate: {marginal_rate:.0f}%\n"
-    
-    if state != "none":
-        result += f"\nNote: State taxes for {state} not included in calculation."
-    
-    return result
+    return TaxResult(
+        income=income,
+        filing_status=filing_status,
+        state=state,
+        standard_deduction=standard_deduction,
+        taxable_income=taxable_income,
+        federal_tax=tax,
+        after_tax_income=income - tax,
+        effective_rate=effective_rate,
+        marginal_rate=marginal_rate,
+    ).output()
+
+
+@single_flight
+@cpu_bound
+@financial_tool
+def scenario_sweep(calculator: str, grid: str):
+    """
+    Run a calculator over a grid of parameter values in one pass.
+    calculator = loan_payment_calculator, debt_payoff_calculator,
+                 retirement_calculator or compound_interest
+    grid = every parameter of that calculator as "param:values" joined by ";".
+           values is a list "5,10,15" or a range "start..stop..step".
+           e.g. "debt_amount:10000;interest_rate:5,10,15;monthly_payment:200..2000..50"
+    """
+    if calculator not in CALCULATORS:
+        return f"Unknown calculator. Choose one of: {', '.join(CALCULATORS)}", None
+    try:
+        columns = run_batch(calculator, parse_grid_spec(grid))
+    except ValueError as e:
+        return f"Error: {e}", None
 
+    # Only the first rows are shown to the model and kept in the checkpoint;
+    # the batch API returns whole grids
+    max_rows = 60
+    count = len(next(iter(columns.values())))
+    shown = {
+        name: [float(v) if math.isfinite(v) else None for v in values[:max_rows]]
+        for name, values in columns.items()
+    }
+    return ScenarioSweepResult(
+        calculator=calculator, count=count, columns=shown
+    ).output()
+
+
+@single_flight
+@cpu_bound
+@financial_tool
+def monte_carlo_simulation(
+    current_savings: float,
+    monthly_contribution: float,
+    years: int,
+    target_amount: float = 0,
+    annual_return: float = 7,
+    volatility: float = 15,
+    investments: str = "",
+):
+    """
+    Simulate 10,000 market scenarios for savings or a portfolio over time.
+    Reports the chance of reaching a target and the range of likely outcomes.
+    current_savings = amount invested today
+    monthly_contribution = amount added each month
+    years = investment horizon in years (e.g. years until retirement)
+    target_amount = goal balance, e.g. retirement nest egg (0 = no goal)
+    annual_return = expected annual return in percent (ignored if investments given)
+    volatility = annual volatility in percent (ignored if investments given)
+    investments = optional allocation like "stocks:60,bonds:30,cash:10";
+                  return and volatility are then estimated from it
+    """
+    if investments:
+        try:
+            allocations = {}
+            for item in investments.split(','):
+                asset, percent = item.strip().split(':')
+                allocations[asset.strip()] = float(percent)
+            annual_return, volatility = monte_carlo.portfolio_assumptions(allocations)
+        except Exception:
+            return (
+                "Error parsing portfolio. Use format: 'stocks:60,bonds:30,cash:10'",
+                None,
+            )
+    target = target_amount if target_amount > 0 else None
+    try:
+        # Same bounds as the REST endpoint; years sizes every chunk's matrix
+        inputs = monte_carlo.SimulationInputs(
+            current_savings=current_savings,
+            monthly_contribution=monthly_contribution,
+            years=years,
+            annual_return=annual_return,
+            volatility=volatility,
+            target=target,
+        )
+    except ValidationError as e:
+        error = e.errors()[0]
+        return f"Error: {error['loc'][0]}: {error['msg']}.", None
+    try:
+        result = monte_carlo.simulate(
+            inputs.current_savings,
+            inputs.monthly_contribution,
+            inputs.years,
+            inputs.annual_return,
+            inputs.volatility,
+            paths=10_000,
+            target=target,
+            seed=0,
+        )
+    except ValueError as e:
+        return f"Error: {e}.", None
+    p = result["percentiles"]
 
-# LLM
-llm = ChatOpenAI(model="gpt-4o-mini", api_key=settings.OPENAI_API_KEY)
-# Create checkpointer  
-checkpointer = MemorySaver()
+    return MonteCarloResult(
+        paths=result["paths"],
+        years=years,
+        annual_return=annual_return,
+        volatility=volatility,
+        target=target,
+        success_probability=result["success_probability"] if target else None,
+        p10=p["p10"],
+        p50=p["p50"],
+        p90=p["p90"],
+        mean=result["mean"],
+    ).output()
 
-# Agent with all financial tools
-agent = create_react_agent(llm, [
+
+# All financial tools exposed to the agent
+tools = [
     savings_calculator,
-    compound_interest, 
+    compound_interest,
     loan_payment_calculator,
     portfolio_analyzer,
     budget_planner,
     retirement_calculator,
     debt_payoff_calculator,
     emergency_fund_calculator,
-    tax_calculator
-,], checkpointer=checkpointer)
+    tax_calculator,
+    scenario_sweep,
+    monte_carlo_simulation,
+]
+
+_models: dict = {}
+_checkpointer = None
+_agent = None
+
+
+def get_llm(tier: str = "small"):
+    """Chat model of a MODEL_TIERS tier; the small one also summarizes context."""
+    if tier not in _models:
+        from langchain_openai import ChatOpenAI
+
+        from app.agents.transport import openai_client_kwargs
+
+        # stream_usage: report token usage on streamed responses too (token budgets)
+        _models[tier] = ChatOpenAI(
+            model=settings.MODEL_TIERS[tier]["model"],
+            api_key=settings.OPENAI_API_KEY,
+            stream_usage=True,
+            **openai_client_kwargs(),
+        )
+    return _models[tier]
+
+
+def get_checkpointer():
+    global _checkpointer
+    if _checkpointer is None:
+        from app.agents.checkpoint import build_checkpointer
+
+        # Backend chosen by settings.CHECKPOINTER_BACKEND
+        _checkpointer = build_checkpointer()
+    return _checkpointer
+
+
+def get_agent():
+    """The agent with all financial tools, built on first call."""
+    global _agent
+    if _agent is None:
+        from langgraph.prebuilt import create_react_agent
+
+        from app.agents.context import ContextState, make_context_hook
+        from app.agents.model_router import ModelRouter
+        from app.agents.tool_node import ParallelToolNode
+
+        llm = get_llm()
+        if settings.MODEL_ROUTING_ENABLED:
+            # Cheap-first: picks the small or large tier per model call
+            models = {tier: get_llm(tier) for tier in settings.MODEL_TIERS}
+            model = ModelRouter(models, tools)
+        else:
+            model = llm
+        _agent = create_react_agent(
+            model,
+            ParallelToolNode(tools),  # runs one message's tool calls concurrently
+            checkpointer=get_checkpointer(),
+            state_schema=ContextState,
+            pre_model_hook=make_context_hook(llm),
+        )
+    return _agent
+
+
+def warm_up():
+    """Build the agent now instead of on the first request."""
+    get_agent()
+
+
+_LAZY = {"llm": get_llm, "checkpointer": get_checkpointer, "agent": get_agent}
+
+
+def __getattr__(name: str):
+    # `from app.agents.agent import agent` (scripts, older callers) still works
+    if name in _LAZY:
+        return _LAZY[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
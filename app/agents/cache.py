@@ -0,0 +1,311 @@
+import hashlib
+import json
+import re
+import time
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.redis import redis_client
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase, collapse whitespace and drop trailing punctuation."""
+    query = re.sub(r"\s+", " ", query.strip().lower())
+    return query.rstrip(" ?!.")
+
+
+def _text(value) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def _stream_id(entry_id) -> tuple[int, int]:
+    ms, seq = _text(entry_id).split("-")
+    return int(ms), int(seq)
+
+
+class VectorIndex:
+    """
+    In-process copy of the cached query vectors, searched with one matmul.
+
+    Rows live in a matrix that doubles as it fills; a removed key frees its
+    row for reuse. The owner keeps it in sync with Redis (ResponseCache._sync).
+    """
+
+    def __init__(self):
+        self.matrix: np.ndarray | None = None
+        self.keys: list[str | None] = []  # key per row; None marks a free row
+        self.rows: dict[str, int] = {}
+        self.free: list[int] = []
+        self.last_id: str | None = None  # last change-log entry applied
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def clear(self):
+        self.__init__()
+
+    def add(self, key: str, vector: np.ndarray):
+        row = self.rows.get(key)
+        if row is None:
+            if self.free:
+                row = self.free.pop()
+            else:
+                row = len(self.keys)
+                self.keys.append(None)
+                if self.matrix is None:
+                    self.matrix = np.zeros((16, vector.size), dtype=np.float32)
+                elif row == len(self.matrix):
+                    grown = np.zeros_like(self.matrix)
+                    self.matrix = np.concatenate([self.matrix, grown])
+            self.keys[row] = key
+            self.rows[key] = row
+        self.matrix[row] = vector
+
+    def remove(self, key: str):
+        row = self.rows.pop(key, None)
+        if row is not None:
+            self.keys[row] = None
+            self.free.append(row)
+
+    def nearest(self, vector: np.ndarray) -> tuple[str, float] | None:
+        """The most similar key and its score (vectors are normalized)."""
+        if not self.rows:
+            return None
+        scores = self.matrix[: len(self.keys)] @ vector
+        scores[self.free] = -np.inf
+        best = int(np.argmax(scores))
+        return self.keys[best], float(scores[best])
+
+
+class ResponseCache:
+    """
+    Redis-backed cache of agent answers for stateless queries.
+
+    Exact tier: key is a hash of the normalized query.
+    Semantic tier (optional): the closest cached query by embedding cosine
+    similarity is reused when it scores at least `threshold`. Vectors are
+    stored in Redis and every change is appended to a log stream; each
+    process searches its own VectorIndex and only reads the changes since
+    its last lookup, so a miss doesn't move the whole vector set.
+
+    Entries expire after `ttl` seconds; once `max_entries` is exceeded the
+    least recently used ones are evicted. Failures (Redis or embeddings) are
+    logged and treated as misses.
+    """
+
+    STATS_FIELDS = ("exact_hits", "semantic_hits", "misses", "bypassed")
+
+    def __init__(
+        self,
+        client=None,
+        prefix: str = "agent_cache",
+        ttl: int | None = None,
+        max_entries: int | None = None,
+        semantic: bool | None = None,
+        threshold: float | None = None,
+        embeddings=None,
+    ):
+        self.client = client or redis_client
+        self.prefix = prefix
+        self.ttl = ttl if ttl is not None else settings.RESPONSE_CACHE_TTL_SECONDS
+        self.max_entries = (
+            max_entries
+            if max_entries is not None
+            else settings.RESPONSE_CACHE_MAX_ENTRIES
+        )
+        self.semantic = (
+            semantic if semantic is not None else settings.RESPONSE_CACHE_SEMANTIC
+        )
+        self.threshold = (
+            threshold
+            if threshold is not None
+            else settings.RESPONSE_CACHE_SIMILARITY_THRESHOLD
+        )
+        self._embeddings = embeddings
+        self.index = VectorIndex()
+
+    @property
+    def embeddings(self):
+        if self._embeddings is None:
+            from langchain_openai import OpenAIEmbeddings
+
+            from app.agents.transport import openai_client_kwargs
+
+            self._embeddings = OpenAIEmbeddings(
+                model=settings.RESPONSE_CACHE_EMBEDDING_MODEL,
+                api_key=settings.OPENAI_API_KEY,
+                **openai_client_kwargs(),
+            )
+        return self._embeddings
+
+    def _entry_key(self, key: str) -> str:
+        return f"{self.prefix}:entry:{key}"
+
+    @property
+    def _lru_key(self) -> str:
+        return f"{self.prefix}:lru"
+
+    @property
+    def _vectors_key(self) -> str:
+        return f"{self.prefix}:vectors"
+
+    @property
+    def _log_key(self) -> str:
+        return f"{self.prefix}:vector_log"
+
+    @property
+    def _stats_key(self) -> str:
+        return f"{self.prefix}:stats"
+
+    @staticmethod
+    def key_for(query: str) -> str:
+        return hashlib.sha256(normalize_query(query).encode()).hexdigest()[:32]
+
+    async def record(self, field: str) -> None:
+        try:
+            await self.client.hincrby(self._stats_key, field, 1)
+        except Exception as e:
+            logger.warning("Response cache stats failed", error=str(e))
+
+    async def stats(self) -> dict:
+        raw = await self.client.hgetall(self._stats_key)
+        counts = {_text(k): int(v) for k, v in raw.items()}
+        stats = {field: counts.get(field, 0) for field in self.STATS_FIELDS}
+        lookups = stats["exact_hits"] + stats["semantic_hits"] + stats["misses"]
+        stats["hit_rate"] = (
+            (stats["exact_hits"] + stats["semantic_hits"]) / lookups if lookups else 0.0
+        )
+        stats["entries"] = await self.client.zcard(self._lru_key)
+        return stats
+
+    async def _load(self, key: str) -> str | None:
+        raw = await self.client.get(self._entry_key(key))
+        if raw is None:
+            return None
+        await self.client.zadd(self._lru_key, {key: time.time()})
+        return json.loads(raw)["answer"]
+
+    def _log_change(self, pipe, change: str, keys: list[str]):
+        # Kept to about max_entries changes; a process further behind reloads
+        pipe.xadd(
+            self._log_key,
+            {change: ",".join(keys)},
+            maxlen=max(self.max_entries, 1),
+            approximate=True,
+        )
+
+    async def _reload(self):
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.xrevrange(self._log_key, count=1)
+            pipe.hgetall(self._vectors_key)
+            latest, stored = await pipe.execute()
+        self.index.clear()
+        for key, raw in stored.items():
+            self.index.add(_text(key), np.frombuffer(raw, dtype=np.float32))
+        self.index.last_id = _text(latest[0][0]) if latest else "0-0"
+
+    async def _sync(self):
+        """Bring the local index up to date with the change log."""
+        if self.index.last_id is None:
+            return await self._reload()
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.xrange(self._log_key, "-", "+", count=1)
+            pipe.xrange(self._log_key, f"({self.index.last_id}", "+")
+            oldest, changes = await pipe.execute()
+        if oldest and _stream_id(oldest[0][0]) > _stream_id(self.index.last_id):
+            return await self._reload()  # changes we haven't seen were trimmed
+        if not changes:
+            return
+
+        added = set()
+        for _, fields in changes:
+            for change, keys in fields.items():
+                keys = _text(keys).split(",")
+                if _text(change) == "add":
+                    added.update(keys)
+                else:
+                    added.difference_update(keys)
+                    for key in keys:
+                        self.index.remove(key)
+        if added:
+            added = list(added)
+            vectors = await self.client.hmget(self._vectors_key, added)
+            for key, raw in zip(added, vectors):
+                if raw is not None:
+                    self.index.add(key, np.frombuffer(raw, dtype=np.float32))
+        self.index.last_id = _text(changes[-1][0])
+
+    async def _nearest(self, vector: np.ndarray) -> str | None:
+        await self._sync()
+        nearest = self.index.nearest(vector)
+        if nearest is None:
+            return None
+        key, score = nearest
+        return key if score >= self.threshold else None
+
+    async def _embed(self, query: str) -> np.ndarray:
+        vector = np.asarray(
+            await self.embeddings.aembed_query(normalize_query(query)), dtype=np.float32
+        )
+        return vector / (np.linalg.norm(vector) or 1.0)
+
+    async def get(self, query: str) -> str | None:
+        """Return a cached answer for the query, or None on a miss."""
+        try:
+            answer = await self._load(self.key_for(query))
+            if answer is not None:
+                await self.record("exact_hits")
+                return answer
+
+            if self.semantic:
+                nearest = await self._nearest(await self._embed(query))
+                if nearest is not None:
+                    answer = await self._load(nearest)
+                    if answer is not None:
+                        await self.record("semantic_hits")
+                        return answer
+                    # Entry expired; forget its vector
+                    async with self.client.pipeline(transaction=True) as pipe:
+                        pipe.hdel(self._vectors_key, nearest)
+                        self._log_change(pipe, "del", [nearest])
+                        await pipe.execute()
+        except Exception as e:
+            logger.warning("Response cache lookup failed", error=str(e))
+
+        await self.record("misses")
+        return None
+
+    async def set(self, query: str, answer: str) -> None:
+        key = self.key_for(query)
+        try:
+            vector = await self._embed(query) if self.semantic else None
+            async with self.client.pipeline(transaction=True) as pipe:
+                pipe.set(
+                    self._entry_key(key),
+                    json.dumps({"query": query, "answer": answer}),
+                    ex=self.ttl,
+                )
+                pipe.zadd(self._lru_key, {key: time.time()})
+                if vector is not None:
+                    pipe.hset(self._vectors_key, key, vector.tobytes())
+                    self._log_change(pipe, "add", [key])
+                pipe.zcard(self._lru_key)
+                *_, size = await pipe.execute()
+
+            if size > self.max_entries:
+                evicted = await self.client.zpopmin(
+                    self._lru_key, size - self.max_entries
+                )
+                stale = [_text(k) for k, _ in evicted]
+                async with self.client.pipeline(transaction=True) as pipe:
+                    pipe.delete(*(self._entry_key(k) for k in stale))
+                    pipe.hdel(self._vectors_key, *stale)
+                    self._log_change(pipe, "del", stale)
+                    await pipe.execute()
+        except Exception as e:
+            logger.warning("Response cache store failed", error=str(e))
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,429 @@
+import random
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Sequence
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from langgraph.checkpoint.memory import MemorySaver
+from sqlalchemy import delete, func, select
+
+from app.core.config import settings
+from app.core.redis import redis_client
+from app.db.session import AsyncSessionLocal
+from app.models import AgentCheckpoint, AgentCheckpointWrite
+
+
+class CompactCheckpointSaver(BaseCheckpointSaver):
+    """
+    Async checkpointer that stores each checkpoint as one compressed record.
+
+    Subclasses provide storage primitives; this class handles serialization,
+    history trimming and building CheckpointTuples. Only the async API is
+    supported, which is what the FastAPI handlers use.
+    """
+
+    def __init__(self, ttl: int | None = None, history: int | None = None):
+        super().__init__()
+        self.ttl = ttl if ttl is not None else settings.CHECKPOINT_TTL_SECONDS
+        self.history = history if history is not None else settings.CHECKPOINT_HISTORY
+
+    # ---- serialization ----
+
+    def _dump(self, obj: Any) -> bytes:
+        type_, data = self.serde.dumps_typed(obj)
+        return type_.encode() + b"|" + zlib.compress(data, 1)
+
+    def _load(self, blob: bytes) -> Any:
+        type_, _, data = blob.partition(b"|")
+        return self.serde.loads_typed((type_.decode(), zlib.decompress(data)))
+
+    # ---- storage primitives ----
+
+    async def _fetch(
+        self, thread_id: str, ns: str, checkpoint_id: str | None
+    ) -> tuple[str, bytes] | None:
+        """Return (checkpoint_id, record); the latest one if no id is given."""
+        raise NotImplementedError
+
+    async def _fetch_all(self, thread_id: str, ns: str) -> list[tuple[str, bytes]]:
+        """Return every (checkpoint_id, record) for the thread, newest first."""
+        raise NotImplementedError
+
+    async def _fetch_writes(
+        self, thread_id: str, ns: str, checkpoint_id: str
+    ) -> list[bytes]:
+        raise NotImplementedError
+
+    async def _store(
+        self, thread_id: str, ns: str, checkpoint_id: str, record: bytes
+    ) -> None:
+        raise NotImplementedError
+
+    async def _store_writes(
+        self, thread_id: str, ns: str, checkpoint_id: str, records: dict[str, bytes]
+    ) -> None:
+        """Store writes by "task_id:idx"; a negative idx never overwrites."""
+        raise NotImplementedError
+
+    # ---- BaseCheckpointSaver API ----
+
+    async def _tuple(
+        self, thread_id: str, ns: str, checkpoint_id: str, record: bytes
+    ) -> CheckpointTuple:
+        checkpoint, metadata, parent_id = self._load(record)
+        stored = await self._fetch_writes(thread_id, ns, checkpoint_id)
+        writes = sorted(
+            (self._load(w) for w in stored),
+            key=lambda w: (w[3], w[0], w[4]),  # task_path, task_id, idx
+        )
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint=checkpoint,
+            metadata=metadata,
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": ns,
+                        "checkpoint_id": parent_id,
+                    }
+                }
+                if parent_id
+                else None
+            ),
+            pending_writes=[
+                (task_id, channel, value) for task_id, channel, value, *_ in writes
+            ],
+        )
+
+    async def aget_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        thread_id = config["configurable"]["thread_id"]
+        ns = config["configurable"].get("checkpoint_ns", "")
+        found = await self._fetch(thread_id, ns, get_checkpoint_id(config))
+        if found is None:
+            return None
+        return await self._tuple(thread_id, ns, *found)
+
+    async def alist(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        if not config:
+            return
+        thread_id = config["configurable"]["thread_id"]
+        ns = config["configurable"].get("checkpoint_ns", "")
+        wanted_id = get_checkpoint_id(config)
+        before_id = get_checkpoint_id(before) if before else None
+
+        for checkpoint_id, record in await self._fetch_all(thread_id, ns):
+            if wanted_id and checkpoint_id != wanted_id:
+                continue
+            if before_id and checkpoint_id >= before_id:
+                continue
+            result = await self._tuple(thread_id, ns, checkpoint_id, record)
+            if filter and any(result.metadata.get(k) != v for k, v in filter.items()):
+                continue
+            if limit is not None:
+                if limit <= 0:
+                    break
+                limit -= 1
+            yield result
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        ns = config["configurable"].get("checkpoint_ns", "")
+        record = self._dump(
+            (
+                checkpoint,
+                get_checkpoint_metadata(config, metadata),
+                config["configurable"].get("checkpoint_id"),  # parent
+            )
+        )
+        await self._store(thread_id, ns, checkpoint["id"], record)
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        ns = config["configurable"].get("checkpoint_ns", "")
+        records = {}
+        for idx, (channel, value) in enumerate(writes):
+            idx = WRITES_IDX_MAP.get(channel, idx)
+            records[f"{task_id}:{idx}"] = self._dump(
+                (task_id, channel, value, task_path, idx)
+            )
+        await self._store_writes(
+            thread_id, ns, config["configurable"]["checkpoint_id"], records
+        )
+
+    def get_next_version(self, current: str | None, channel: None = None) -> str:
+        # Same scheme as MemorySaver so threads can move between backends
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+
+class RedisCheckpointSaver(CompactCheckpointSaver):
+    """
+    Checkpointer shared by all workers through Redis.
+
+    Each thread/namespace is a hash of checkpoint_id -> record, and each
+    checkpoint's writes are a separate hash. Keys expire after `ttl` seconds
+    without a write, so idle threads are evicted by Redis itself.
+    """
+
+    def __init__(self, client=None, prefix: str = "checkpoint", **kwargs):
+        super().__init__(**kwargs)
+        self.client = client or redis_client
+        self.prefix = prefix
+
+    def _key(self, thread_id: str, ns: str) -> str:
+        return f"{self.prefix}:{thread_id}:{ns}"
+
+    def _writes_key(self, thread_id: str, ns: str, checkpoint_id: str) -> str:
+        return f"{self.prefix}_writes:{thread_id}:{ns}:{checkpoint_id}"
+
+    @staticmethod
+    def _str(value) -> str:
+        return value.decode() if isinstance(value, bytes) else value
+
+    async def _fetch(self, thread_id, ns, checkpoint_id):
+        key = self._key(thread_id, ns)
+        if checkpoint_id is None:
+            ids = [self._str(i) for i in await self.client.hkeys(key)]
+            if not ids:
+                return None
+            checkpoint_id = max(ids)
+        record = await self.client.hget(key, checkpoint_id)
+        return (checkpoint_id, record) if record is not None else None
+
+    async def _fetch_all(self, thread_id, ns):
+        records = await self.client.hgetall(self._key(thread_id, ns))
+        return sorted(
+            ((self._str(k), v) for k, v in records.items()), reverse=True
+        )
+
+    async def _fetch_writes(self, thread_id, ns, checkpoint_id):
+        key = self._writes_key(thread_id, ns, checkpoint_id)
+        return list((await self.client.hgetall(key)).values())
+
+    async def _store(self, thread_id, ns, checkpoint_id, record):
+        key = self._key(thread_id, ns)
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.hset(key, checkpoint_id, record)
+            pipe.expire(key, self.ttl)
+            pipe.hkeys(key)
+            *_, ids = await pipe.execute()
+
+        stale = sorted((self._str(i) for i in ids), reverse=True)[self.history:]
+        if stale:
+            async with self.client.pipeline(transaction=True) as pipe:
+                pipe.hdel(key, *stale)
+                pipe.delete(*(self._writes_key(thread_id, ns, i) for i in stale))
+                await pipe.execute()
+
+    async def _store_writes(self, thread_id, ns, checkpoint_id, records):
+        key = self._writes_key(thread_id, ns, checkpoint_id)
+        async with self.client.pipeline(transaction=True) as pipe:
+            for field, record in records.items():
+                if field.rsplit(":", 1)[1].startswith("-"):
+                    pipe.hsetnx(key, field, record)
+                else:
+                    pipe.hset(key, field, record)
+            pipe.expire(key, self.ttl)
+            await pipe.execute()
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        for pattern in (
+            f"{self.prefix}:{thread_id}:*",
+            f"{self.prefix}_writes:{thread_id}:*",
+        ):
+            keys = [k async for k in self.client.scan_iter(match=pattern)]
+            if keys:
+                await self.client.delete(*keys)
+
+
+class SQLCheckpointSaver(CompactCheckpointSaver):
+    """
+    Checkpointer stored in the application database.
+
+    Idle threads (no checkpoint written for `ttl` seconds) are evicted every
+    `evict_every` puts.
+    """
+
+    def __init__(self, session_factory=None, evict_every: int = 1000, **kwargs):
+        super().__init__(**kwargs)
+        self.session_factory = session_factory or AsyncSessionLocal
+        self.evict_every = evict_every
+        self._puts = 0
+
+    async def _fetch(self, thread_id, ns, checkpoint_id):
+        query = select(AgentCheckpoint.checkpoint_id, AgentCheckpoint.data).where(
+            AgentCheckpoint.thread_id == thread_id,
+            AgentCheckpoint.checkpoint_ns == ns,
+        )
+        if checkpoint_id is None:
+            query = query.order_by(AgentCheckpoint.checkpoint_id.desc()).limit(1)
+        else:
+            query = query.where(AgentCheckpoint.checkpoint_id == checkpoint_id)
+        async with self.session_factory() as session:
+            row = (await session.execute(query)).first()
+        return tuple(row) if row else None
+
+    async def _fetch_all(self, thread_id, ns):
+        async with self.session_factory() as session:
+            rows = await session.execute(
+                select(AgentCheckpoint.checkpoint_id, AgentCheckpoint.data)
+                .where(
+                    AgentCheckpoint.thread_id == thread_id,
+                    AgentCheckpoint.checkpoint_ns == ns,
+                )
+                .order_by(AgentCheckpoint.checkpoint_id.desc())
+            )
+            return [tuple(row) for row in rows]
+
+    async def _fetch_writes(self, thread_id, ns, checkpoint_id):
+        async with self.session_factory() as session:
+            rows = await session.execute(
+                select(AgentCheckpointWrite.data).where(
+                    AgentCheckpointWrite.thread_id == thread_id,
+                    AgentCheckpointWrite.checkpoint_ns == ns,
+                    AgentCheckpointWrite.checkpoint_id == checkpoint_id,
+                )
+            )
+            return list(rows.scalars())
+
+    async def _store(self, thread_id, ns, checkpoint_id, record):
+        async with self.session_factory() as session:
+            await session.merge(
+                AgentCheckpoint(
+                    thread_id=thread_id,
+                    checkpoint_ns=ns,
+                    checkpoint_id=checkpoint_id,
+                    data=record,
+                    updated_at=datetime.now(timezone.utc),
+                )
+            )
+            stale = (
+                await session.execute(
+                    select(AgentCheckpoint.checkpoint_id)
+                    .where(
+                        AgentCheckpoint.thread_id == thread_id,
+                        AgentCheckpoint.checkpoint_ns == ns,
+                    )
+                    .order_by(AgentCheckpoint.checkpoint_id.desc())
+                    .offset(self.history)
+                )
+            ).scalars().all()
+            if stale:
+                for model in (AgentCheckpoint, AgentCheckpointWrite):
+                    await session.execute(
+                        delete(model).where(
+                            model.thread_id == thread_id,
+                            model.checkpoint_ns == ns,
+                            model.checkpoint_id.in_(stale),
+                        )
+                    )
+            await session.commit()
+
+        self._puts += 1
+        if self._puts % self.evict_every == 0:
+            await self.aevict_idle()
+
+    async def _store_writes(self, thread_id, ns, checkpoint_id, records):
+        async with self.session_factory() as session:
+            for field, record in records.items():
+                row = AgentCheckpointWrite(
+                    thread_id=thread_id,
+                    checkpoint_ns=ns,
+                    checkpoint_id=checkpoint_id,
+                    write_key=field,
+                    data=record,
+                )
+                if field.rsplit(":", 1)[1].startswith("-"):
+                    existing = await session.get(
+                        AgentCheckpointWrite, (thread_id, ns, checkpoint_id, field)
+                    )
+                    if existing is not None:
+                        continue
+                await session.merge(row)
+            await session.commit()
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        async with self.session_factory() as session:
+            for model in (AgentCheckpoint, AgentCheckpointWrite):
+                await session.execute(delete(model).where(model.thread_id == thread_id))
+            await session.commit()
+
+    async def aevict_idle(self) -> int:
+        """Delete threads with no checkpoint written in the last `ttl` seconds."""
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.ttl)
+        async with self.session_factory() as session:
+            idle = (
+                await session.execute(
+                    select(AgentCheckpoint.thread_id)
+                    .group_by(AgentCheckpoint.thread_id)
+                    .having(func.max(AgentCheckpoint.updated_at) < cutoff)
+                )
+            ).scalars().all()
+        for thread_id in idle:
+            await self.adelete_thread(thread_id)
+        return len(idle)
+
+
+def build_checkpointer(backend: str | None = None) -> BaseCheckpointSaver:
+    """
+    Create the checkpointer selected by settings.CHECKPOINTER_BACKEND.
+
+    "memory" keeps state in this process only; "redis" and "sql" share it
+    between workers and survive restarts.
+    """
+    backend = backend or settings.CHECKPOINTER_BACKEND
+    if backend == "memory":
+        return MemorySaver()
+    if backend == "redis":
+        return RedisCheckpointSaver()
+    if backend == "sql":
+        return SQLCheckpointSaver()
+    raise ValueError(f"Unknown checkpointer backend: {backend}")
@@ -0,0 +1,140 @@
+from typing import List
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import (
+    BaseMessage,
+    HumanMessage,
+    RemoveMessage,
+    SystemMessage,
+)
+from langchain_core.messages.utils import count_tokens_approximately, trim_messages
+from langchain_core.runnables import RunnableLambda
+from langgraph.prebuilt.chat_agent_executor import AgentState
+
+from app.core.config import settings
+
+
+class ContextState(AgentState):
+    """Agent state with a rolling summary of turns dropped from `messages`."""
+
+    summary: str
+
+
+# Tags the summarizer's model calls so streams can tell them from answers
+SUMMARY_TAG = "context_summary"
+
+
+class SummaryUsage(BaseCallbackHandler):
+    """Counts the tokens of the context-summary calls made during a run."""
+
+    run_inline = True
+
+    def __init__(self):
+        self.tokens = 0
+
+    def on_llm_end(self, response, *, tags=None, **kwargs):
+        if SUMMARY_TAG not in (tags or []):
+            return
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                usage = getattr(message, "usage_metadata", None) or {}
+                self.tokens += usage.get("total_tokens", 0)
+
+
+SUMMARY_PROMPT = (
+    "Update the running summary of a conversation between a user and a "
+    "financial assistant. Keep every figure the user shared (income, expenses, "
+    "debts, savings, goals) and the key results of calculations. Be concise.\n\n"
+    "Current summary:\n{summary}\n\nNew messages:\n{messages}"
+)
+
+
+def split_window(messages: List[BaseMessage], max_tokens: int):
+    """
+    Split messages into (older, window).
+
+    The window is the most recent run of whole turns that fits in
+    `max_tokens`; it always starts on a user message so tool calls stay with
+    their results, and always includes the current turn.
+    """
+    window = trim_messages(
+        messages,
+        strategy="last",
+        token_counter=count_tokens_approximately,
+        max_tokens=max_tokens,
+        start_on="human",
+    )
+    if not window:
+        last_human = max(
+            (i for i, m in enumerate(messages) if isinstance(m, HumanMessage)),
+            default=0,
+        )
+        window = messages[last_human:]
+    return messages[: len(messages) - len(window)], window
+
+
+def _summary_request(summary: str, older: List[BaseMessage]) -> List[BaseMessage]:
+    transcript = "\n".join(f"{m.type}: {m.content}" for m in older if m.content)
+    return [
+        HumanMessage(
+            SUMMARY_PROMPT.format(summary=summary or "(none)", messages=transcript)
+        )
+    ]
+
+
+def _update(window: List[BaseMessage], older: List[BaseMessage], summary: str) -> dict:
+    llm_input = list(window)
+    if summary:
+        llm_input.insert(
+            0, SystemMessage(f"Summary of the earlier conversation:\n{summary}")
+        )
+    update = {"llm_input_messages": llm_input}
+    if older:
+        # Drop summarized turns from the checkpoint so it stays bounded too
+        update["messages"] = [RemoveMessage(id=m.id) for m in older]
+        update["summary"] = summary
+    return update
+
+
+def make_context_hook(
+    llm, max_tokens: int | None = None, summary_max_tokens: int | None = None
+):
+    """
+    Build a pre-model hook that keeps the LLM input within a token budget.
+
+    Turns that no longer fit in the window are folded into `summary` with one
+    extra LLM call, only when the budget is exceeded, so each message is
+    summarized once.
+
+    Args:
+        llm: Chat model used to write the summary
+        max_tokens: Token budget for recent messages
+            (defaults to settings.CONTEXT_MAX_TOKENS)
+        summary_max_tokens: Length cap for the summary
+            (defaults to settings.CONTEXT_SUMMARY_MAX_TOKENS)
+    """
+    if max_tokens is None:
+        max_tokens = settings.CONTEXT_MAX_TOKENS
+    if summary_max_tokens is None:
+        summary_max_tokens = settings.CONTEXT_SUMMARY_MAX_TOKENS
+    summarizer = llm.bind(max_tokens=summary_max_tokens).with_config(
+        tags=[SUMMARY_TAG], run_name=SUMMARY_TAG
+    )
+
+    def hook(state: dict) -> dict:
+        summary = state.get("summary", "")
+        older, window = split_window(state["messages"], max_tokens)
+        if older:
+            summary = summarizer.invoke(_summary_request(summary, older)).content
+        return _update(window, older, summary)
+
+    async def ahook(state: dict) -> dict:
+        summary = state.get("summary", "")
+        older, window = split_window(state["messages"], max_tokens)
+        if older:
+            reply = await summarizer.ainvoke(_summary_request(summary, older))
+            summary = reply.content
+        return _update(window, older, summary)
+
+    return RunnableLambda(hook, afunc=ahook, name="context_window")
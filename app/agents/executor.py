@@ -0,0 +1,312 @@
+import asyncio
+from functools import cache
+from typing import AsyncIterator
+from langchain_core.messages import AIMessage, HumanMessage
+from app.agents.cache import response_cache
+from app.agents.fast_path import fast_path_answer
+from app.agents.quota import get_admission, run_usage, token_budget
+from app.agents.singleflight import agent_flight
+from app.core.config import settings
+
+# The agent module is imported on first use (see app.agents.agent)
+def default_agent():
+    from app.agents.agent import get_agent
+
+    return get_agent()
+
+
+@cache
+def tools_by_name() -> dict:
+    from app.agents.agent import tools
+
+    return {t.name: t for t in tools}
+
+
+async def record_turn(agent, config: dict, query: str, answer: str) -> None:
+    """Write a turn answered outside the graph into the thread's state."""
+    await agent.aupdate_state(
+        config,
+        {"messages": [HumanMessage(query), AIMessage(answer)]},
+        as_node="agent",
+    )
+
+
+async def is_fresh_thread(agent, config: dict) -> bool:
+    """True if the thread has no history, so the answer can't depend on it."""
+    state = await agent.aget_state(config)
+    return not state.values.get("messages")
+
+
+async def cache_lookup(agent, query: str, config: dict) -> tuple[bool, str | None]:
+    """
+    Look the query up in the response cache.
+
+    Only the first message of a thread is cacheable; follow-ups bypass the
+    cache. On a hit the turn is still written to the thread so later
+    messages have it as context.
+
+    Returns:
+        (cacheable, answer): whether the answer may be stored afterwards, and
+        the cached answer or None
+    """
+    if not settings.RESPONSE_CACHE_ENABLED:
+        return False, None
+    if not await is_fresh_thread(agent, config):
+        await response_cache.record("bypassed")
+        return False, None
+
+    answer = await response_cache.get(query)
+    if answer is not None:
+        await record_turn(agent, config, query, answer)
+    return True, answer
+
+
+async def flight_key(agent, query: str, config: dict, cacheable: bool) -> str | None:
+    """
+    Single-flight key for a query whose answer can't depend on its thread.
+
+    Like caching, only the first message of a thread qualifies: concurrent
+    identical first messages share one agent run (see app.agents.singleflight).
+    """
+    if not settings.SINGLE_FLIGHT_ENABLED:
+        return None
+    if not cacheable:
+        # cache_lookup only checks freshness when the cache is enabled
+        if settings.RESPONSE_CACHE_ENABLED or not await is_fresh_thread(agent, config):
+            return None
+    return response_cache.key_for(query)
+
+
+async def run_agent(
+    query: str,
+    thread_id: str = "default",
+    agent=None,
+    timeout: float | None = None,
+    user_key: str = "anonymous",
+) -> str:
+    """
+    Run the agent without blocking the event loop.
+
+    Args:
+        query: The user's message
+        thread_id: Conversation thread ID used by the checkpointer
+        agent: Compiled graph to run (defaults to the app agent)
+        timeout: Seconds before the run is cancelled
+            (defaults to settings.AGENT_TIMEOUT_SECONDS)
+        user_key: Who the run is metered under, for token budgets and fair
+            queuing (see app.agents.quota)
+
+    Returns:
+        str: Content of the final agent message
+
+    Raises:
+        asyncio.TimeoutError: If the run does not finish within the timeout
+        QuotaExceeded: If the user's daily token budget is spent
+        AdmissionRejected: If too many runs are already queued
+    """
+    if agent is None:
+        agent = default_agent()
+    if timeout is None:
+        timeout = settings.AGENT_TIMEOUT_SECONDS
+
+    config = {"configurable": {"thread_id": thread_id}}
+    # Imported here: it loads LangGraph, which the agent has loaded by now
+    from app.agents.context import SummaryUsage
+
+    # The context summary's tokens aren't on the turn's messages
+    summary_usage = SummaryUsage()
+
+    async def _run():
+        async with get_admission().slot(user_key):
+            return await agent.ainvoke(
+                {"messages": [("user", query)]},
+                config={**config, "callbacks": [summary_usage]},
+            )
+
+    # Plain calculator requests skip the LLM entirely
+    answer = fast_path_answer(query, tools_by_name())
+    if answer is not None:
+        await record_turn(agent, config, query, answer)
+        return answer
+
+    cacheable, answer = await cache_lookup(agent, query, config)
+    if answer is not None:
+        return answer
+
+    await token_budget.check(user_key)
+
+    async def _answer() -> str:
+        # The timeout covers time spent waiting for a free slot as well
+        result = await asyncio.wait_for(_run(), timeout=timeout)
+        if "messages" in result:
+            tokens = run_usage(result["messages"]) + summary_usage.tokens
+            await token_budget.charge(user_key, tokens)
+
+        # Extract the final message
+        answer = result["messages"][-1].content if "messages" in result else result
+        if cacheable:
+            await response_cache.set(query, answer)
+        return answer
+
+    key = await flight_key(agent, query, config, cacheable)
+    if key is None:
+        return await _answer()
+
+    answer, shared = await asyncio.wait_for(
+        agent_flight.do(key, _answer), timeout=timeout
+    )
+    if shared:
+        # Another request ran the agent; this thread still needs the turn
+        await record_turn(agent, config, query, answer)
+    return answer
+
+
+async def stream_agent(
+    query: str,
+    thread_id: str = "default",
+    agent=None,
+    timeout: float | None = None,
+    user_key: str = "anonymous",
+) -> AsyncIterator[dict]:
+    """
+    Run the agent and yield progress events as they happen.
+
+    Yields dicts with a "type" key:
+        token: {"content"} - a chunk of assistant text
+        tool_start: {"id", "name", "input"} - a tool call began
+        tool_end: {"id", "name", "output", "result"} - a tool call finished;
+            result is its structured result (see app.agents.tool_results)
+        done: {"answer"} - the final assistant message
+
+    Token budgets and admission work as in run_agent.
+
+    Raises:
+        asyncio.TimeoutError: If the run does not finish within the timeout
+        QuotaExceeded: If the user's daily token budget is spent
+        AdmissionRejected: If too many runs are already queued
+    """
+    if agent is None:
+        agent = default_agent()
+    if timeout is None:
+        timeout = settings.AGENT_TIMEOUT_SECONDS
+
+    config = {"configurable": {"thread_id": thread_id}}
+    answer = fast_path_answer(query, tools_by_name())
+    if answer is not None:
+        await record_turn(agent, config, query, answer)
+    else:
+        cacheable, answer = await cache_lookup(agent, query, config)
+    if answer is not None:
+        yield {"type": "token", "content": answer}
+        yield {"type": "done", "answer": answer}
+        return
+
+    await token_budget.check(user_key)
+    result = {"answer": "", "tokens": 0}
+    # Imported here: it loads LangGraph, which the agent has loaded by now
+    from app.agents.context import SUMMARY_TAG, SummaryUsage
+
+    summary_usage = SummaryUsage()
+
+    async def _events() -> AsyncIterator[dict]:
+        streamed = False
+        try:
+            async with asyncio.timeout(timeout), get_admission().slot(user_key):
+                async for event in agent.astream_events(
+                    {"messages": [("user", query)]},
+                    config={**config, "callbacks": [summary_usage]},
+                    version="v2",
+                ):
+                    kind = event["event"]
+                    if SUMMARY_TAG in event.get("tags", []):
+                        # Not part of the answer; summary_usage charges it
+                        continue
+                    if kind == "on_chat_model_start":
+                        streamed = False
+                    elif kind == "on_chat_model_stream":
+                        content = event["data"]["chunk"].content
+                        if content:
+                            streamed = True
+                            yield {"type": "token", "content": content}
+                    elif kind == "on_chat_model_end":
+                        output = event["data"]["output"]
+                        result["answer"] = output.content
+                        usage = getattr(output, "usage_metadata", None) or {}
+                        result["tokens"] += usage.get("total_tokens", 0)
+                        # Models that don't stream still deliver their text once
+                        if output.content and not streamed:
+                            yield {"type": "token", "content": output.content}
+                    elif kind == "on_tool_start":
+                        yield {
+                            "type": "tool_start",
+                            "id": event["run_id"],
+                            "name": event["name"],
+                            "input": event["data"].get("input"),
+                        }
+                    elif kind == "on_tool_end":
+                        output = event["data"].get("output")
+                        yield {
+                            "type": "tool_end",
+                            "id": event["run_id"],
+                            "name": event["name"],
+                            "output": getattr(output, "content", output),
+                            "result": getattr(output, "artifact", None),
+                        }
+        finally:
+            # Charge for what was used, even if the run failed part way
+            tokens = result["tokens"] + summary_usage.tokens
+            await token_budget.charge(user_key, tokens)
+
+    shared = False
+    key = await flight_key(agent, query, config, cacheable)
+    if key is None:
+        async for event in _events():
+            yield event
+        answer = result["answer"]
+    else:
+        async for event in _coalesced_events(key, _events, result, timeout):
+            if event["type"] == "done":
+                answer, shared = event["answer"], event["shared"]
+            else:
+                yield event
+        if shared:
+            # Another request ran the agent; this thread still needs the turn
+            await record_turn(agent, config, query, answer)
+            yield {"type": "token", "content": answer}
+
+    if cacheable and not shared:
+        await response_cache.set(query, answer)
+    yield {"type": "done", "answer": answer}
+
+
+async def _coalesced_events(key: str, events, result: dict, timeout: float):
+    """
+    Share one streamed run among identical concurrent requests.
+
+    The request that leads the single flight relays the run's events as
+    they arrive; requests that join it get only a final "done" event with
+    the shared answer (and "shared": True).
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def _run() -> str:
+        async for event in events():
+            await queue.put(event)
+        return result["answer"]
+
+    flight = asyncio.create_task(agent_flight.do(key, _run))
+    try:
+        async with asyncio.timeout(timeout):
+            while not (flight.done() and queue.empty()):
+                getter = asyncio.ensure_future(queue.get())
+                await asyncio.wait(
+                    {getter, flight}, return_when=asyncio.FIRST_COMPLETED
+                )
+                if getter.done():
+                    yield getter.result()
+                else:
+                    getter.cancel()
+        answer, shared = flight.result()
+        yield {"type": "done", "answer": answer, "shared": shared}
+    finally:
+        flight.cancel()
@@ -0,0 +1,220 @@
+import math
+import re
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from app.agents.tool_results import parse_result
+from app.core.config import settings
+
+
+class Number(NamedTuple):
+    value: float
+    kind: str  # money, monthly, percent, years, months
+    start: int
+
+
+class FastPathMatch(NamedTuple):
+    tool: str
+    args: dict
+    confidence: float
+
+
+_NUMBER = re.compile(
+    r"\$?(\d[\d,]*(?:\.\d+)?)\s*(k|m|thousand|million)?\b",
+    re.IGNORECASE,
+)
+_MULTIPLIERS = {"k": 1e3, "thousand": 1e3, "m": 1e6, "million": 1e6}
+_PERCENT = re.compile(r"\s*(%|percent)", re.IGNORECASE)
+_YEARS = re.compile(r"\s*-?\s*(years?|yrs?)\b", re.IGNORECASE)
+_MONTHS = re.compile(r"\s*-?\s*months?\b", re.IGNORECASE)
+_PER_MONTH = re.compile(
+    r"\s*(/\s*mo(nth)?|per month|a month|monthly|each month|every month)",
+    re.IGNORECASE,
+)
+# Words that signal the user wants reasoning, not just a number
+_OPEN_ENDED = re.compile(
+    r"\b(should|compare|better|vs|versus|advice|advise|recommend|why|explain|"
+    r"afford|instead|worth)\b",
+    re.IGNORECASE,
+)
+
+
+def extract_numbers(text: str) -> List[Number]:
+    """Find numbers in the text and classify them by the unit that follows."""
+    numbers = []
+    for m in _NUMBER.finditer(text):
+        value = float(m.group(1).replace(",", ""))
+        if m.group(2):
+            value *= _MULTIPLIERS[m.group(2).lower()]
+        rest = text[m.end():]
+        if _PERCENT.match(rest):
+            kind = "percent"
+        elif _YEARS.match(rest):
+            kind = "years"
+        elif _MONTHS.match(rest):
+            kind = "months"
+        elif _PER_MONTH.match(rest):
+            kind = "monthly"
+        else:
+            kind = "money"
+        numbers.append(Number(value, kind, m.start()))
+    return numbers
+
+
+def is_open_ended(query: str) -> bool:
+    """True if the query asks for advice or comparison rather than a number."""
+    return _OPEN_ENDED.search(query) is not None
+
+
+def _take(numbers: List[Number], kind: str) -> Optional[float]:
+    """Pop the first number of a kind."""
+    for i, n in enumerate(numbers):
+        if n.kind == kind:
+            return numbers.pop(i).value
+    return None
+
+
+def _whole(value: Optional[float]) -> Optional[int]:
+    """A positive whole count (years, months), else None."""
+    if value is None or value < 1 or value != int(value):
+        return None
+    return int(value)
+
+
+def _loan(query: str, numbers: List[Number]) -> Optional[dict]:
+    if not re.search(r"\b(loan|mortgage|borrow)", query, re.IGNORECASE):
+        return None
+    principal = _take(numbers, "money")
+    rate = _take(numbers, "percent")
+    years = _whole(_take(numbers, "years"))
+    if principal is None or rate is None or years is None:
+        return None
+    return {"principal": principal, "annual_rate": rate, "years": years}
+
+
+def _savings(query: str, numbers: List[Number]) -> Optional[dict]:
+    if not re.search(r"\bsav(e|ing)", query, re.IGNORECASE):
+        return None
+    if re.search(r"\b(interest|return|invest)", query, re.IGNORECASE):
+        return None
+    amount = _take(numbers, "monthly")
+    months = _take(numbers, "months")
+    if months is None:
+        years = _take(numbers, "years")
+        months = years * 12 if years is not None else None
+    months = _whole(months)
+    if amount is None or months is None:
+        return None
+    return {"amount": amount, "months": months}
+
+
+def _compound(query: str, numbers: List[Number]) -> Optional[dict]:
+    if not re.search(r"\b(compound|invest|grow)", query, re.IGNORECASE):
+        return None
+    principal = _take(numbers, "money")
+    monthly = _take(numbers, "monthly") or 0.0
+    rate = _take(numbers, "percent")
+    years = _whole(_take(numbers, "years"))
+    if principal is None or rate is None or years is None:
+        return None
+    return {
+        "principal": principal,
+        "monthly_contrib": monthly,
+        "annual_rate": rate,
+        "years": years,
+    }
+
+
+def _tax(query: str, numbers: List[Number]) -> Optional[dict]:
+    if not re.search(r"\btax", query, re.IGNORECASE):
+        return None
+    income = _take(numbers, "money")
+    if income is None:
+        return None
+    if re.search(r"head of household", query, re.IGNORECASE):
+        status = "head_of_household"
+    elif re.search(r"married.*separate", query, re.IGNORECASE):
+        status = "married_separate"
+    elif re.search(r"married|joint", query, re.IGNORECASE):
+        status = "married_joint"
+    else:
+        status = "single"
+    return {"income": income, "filing_status": status}
+
+
+# Tried in order; the first matcher that extracts all arguments wins
+MATCHERS: Dict[str, Callable[[str, List[Number]], Optional[dict]]] = {
+    "loan_payment_calculator": _loan,
+    "compound_interest": _compound,
+    "savings_calculator": _savings,
+    "tax_calculator": _tax,
+}
+
+TEMPLATES = {
+    "loan_payment_calculator": (
+        "For a ${principal:,.0f} loan at {annual_rate}% over {years} years:\n\n{result}"
+    ),
+    "compound_interest": (
+        "Investing ${principal:,.0f} plus ${monthly_contrib:,.0f}/month at "
+        "{annual_rate}% for {years} years:\n\n{result}"
+    ),
+    "savings_calculator": (
+        "Saving ${amount:,.0f} every month for {months} months:\n\n{result}"
+    ),
+    "tax_calculator": "Here is your estimate for ${income:,.0f} of income:\n\n{result}",
+}
+
+
+def _all_finite(value) -> bool:
+    if isinstance(value, float):
+        return math.isfinite(value)
+    if isinstance(value, dict):
+        return all(_all_finite(v) for v in value.values())
+    if isinstance(value, list):
+        return all(_all_finite(v) for v in value)
+    return True
+
+
+def match_fast_path(query: str) -> Optional[FastPathMatch]:
+    """
+    Recognize a query that maps directly onto one calculator.
+
+    Confidence drops for every number the matcher didn't use and for wording
+    that asks for advice or comparison, which the full agent handles better.
+    """
+    for tool_name, matcher in MATCHERS.items():
+        numbers = extract_numbers(query)
+        args = matcher(query, numbers)
+        if args is None:
+            continue
+        confidence = 1.0 - 0.3 * len(numbers)
+        if is_open_ended(query):
+            confidence -= 0.5
+        return FastPathMatch(tool_name, args, max(confidence, 0.0))
+    return None
+
+
+def fast_path_answer(query: str, tools: Dict[str, object]) -> Optional[str]:
+    """
+    Answer the query by calling one tool directly, without the LLM.
+
+    Returns None when no calculator matches with at least
+    settings.FAST_PATH_MIN_CONFIDENCE, or when the result isn't finite, so
+    the caller falls back to the agent.
+    """
+    if not settings.FAST_PATH_ENABLED:
+        return None
+    match = match_fast_path(query)
+    if match is None or match.confidence < settings.FAST_PATH_MIN_CONFIDENCE:
+        return None
+    tool = tools.get(match.tool)
+    if tool is None:
+        return None
+    # Invoked as a tool call so the structured result comes back as well
+    message = tool.invoke(
+        {"name": match.tool, "args": match.args, "id": "fast_path", "type": "tool_call"}
+    )
+    if not _all_finite(message.artifact):
+        return None
+    result = parse_result(match.tool, message.artifact)
+    text = result.summary() if result is not None else message.content
+    return TEMPLATES[match.tool].format(result=text, **match.args)
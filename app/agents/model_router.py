@@ -0,0 +1,237 @@
+"""
+Cheap-first model routing for the agent.
+
+Every model call of a turn picks a tier from MODEL_TIERS:
+    - small for calculator-style queries: one financial topic, no request
+      for advice or comparison, not too long
+    - large when the confidence that the small model is enough falls below
+      MODEL_ROUTER_MIN_CONFIDENCE, or once a tool call in the turn has
+      failed (the small model's arguments were probably wrong)
+
+ModelRouter is passed to create_react_agent as a dynamic model, so any
+chat models work, fakes included. Per-tier calls, latency, tokens and cost
+are kept in Redis (RouteMetrics) and served by /query/router/stats.
+"""
+import re
+import time
+from typing import NamedTuple, Sequence
+
+from langchain_core.callbacks import AsyncCallbackHandler
+from langchain_core.messages import BaseMessage, HumanMessage, ToolMessage
+
+from app.agents.fast_path import is_open_ended
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.redis import redis_client
+
+SMALL, LARGE = "small", "large"
+
+# A query touching several of these needs planning across tools
+_TOPICS = [
+    re.compile(pattern, re.IGNORECASE)
+    for pattern in (
+        r"\b(loan|mortgage|borrow)",
+        r"\btax",
+        r"\bsav(e|ing)",
+        r"\b(invest|compound|portfolio|stocks?|bonds?)",
+        r"\b(retire|401\(?k|ira\b)",
+        r"\b(debt|credit card|pay ?off)",
+        r"\b(budget|expenses?|spending)",
+        r"\bemergency",
+        r"\b(monte carlo|simulat|scenario|what if)",
+    )
+]
+_LONG_QUERY_WORDS = 40
+
+
+class Route(NamedTuple):
+    tier: str
+    confidence: float
+    reason: str  # simple, low_confidence or tool_error
+
+
+def classify(query: str) -> float:
+    """Confidence (0-1) that the small model can handle the query."""
+    confidence = 1.0
+    topics = sum(1 for topic in _TOPICS if topic.search(query))
+    if topics > 1:
+        confidence -= 0.3 * (topics - 1)
+    if is_open_ended(query):
+        confidence -= 0.4
+    if len(query.split()) > _LONG_QUERY_WORDS:
+        confidence -= 0.3
+    return max(confidence, 0.0)
+
+
+def split_turn(messages: Sequence[BaseMessage]) -> tuple[str, list]:
+    """The latest user message and the messages of the turn that followed it."""
+    for i in range(len(messages) - 1, -1, -1):
+        if isinstance(messages[i], HumanMessage):
+            return str(messages[i].content), list(messages[i + 1 :])
+    return "", list(messages)
+
+
+def tool_failed(messages: Sequence[BaseMessage]) -> bool:
+    # Tools report bad input as "Error ..." text; ToolNode marks exceptions
+    return any(
+        isinstance(m, ToolMessage)
+        and (m.status == "error" or str(m.content).startswith("Error"))
+        for m in messages
+    )
+
+
+class RouteMetrics:
+    """Per-tier model call counters in a Redis hash, shared by all workers."""
+
+    ESCALATIONS = ("low_confidence", "tool_error")
+
+    def __init__(
+        self, client=None, tiers: dict | None = None, prefix: str = "model_router"
+    ):
+        self.client = client or redis_client
+        self.tiers = tiers or settings.MODEL_TIERS
+        self._stats_key = f"{prefix}:stats"
+
+    def cost(self, tier: str, usage: dict) -> float:
+        prices = self.tiers.get(tier, {})
+        return (
+            usage.get("input_tokens", 0) * prices.get("input_cost_per_mtok", 0)
+            + usage.get("output_tokens", 0) * prices.get("output_cost_per_mtok", 0)
+        ) / 1_000_000
+
+    async def record_call(
+        self,
+        tier: str,
+        latency: float,
+        usage: dict | None,
+        reason: str | None = None,
+        failed: bool = False,
+    ):
+        usage = usage or {}
+        key = self._stats_key
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                pipe.hincrby(key, f"{tier}:calls", 1)
+                if reason in self.ESCALATIONS:
+                    pipe.hincrby(key, f"escalated:{reason}", 1)
+                if failed:
+                    pipe.hincrby(key, f"{tier}:errors", 1)
+                pipe.hincrbyfloat(key, f"{tier}:latency_ms", latency * 1000)
+                for field in ("input_tokens", "output_tokens"):
+                    pipe.hincrby(key, f"{tier}:{field}", usage.get(field, 0))
+                pipe.hincrbyfloat(key, f"{tier}:cost_usd", self.cost(tier, usage))
+                await pipe.execute()
+        except Exception as e:
+            logger.warning("Model router stats failed", error=str(e))
+
+    async def stats(self) -> dict:
+        raw = await self.client.hgetall(self._stats_key)
+        values = {
+            k.decode() if isinstance(k, bytes) else k: float(v) for k, v in raw.items()
+        }
+        tiers = {}
+        for tier, config in self.tiers.items():
+            calls = int(values.get(f"{tier}:calls", 0))
+            cost = values.get(f"{tier}:cost_usd", 0.0)
+            latency = values.get(f"{tier}:latency_ms", 0.0)
+            tiers[tier] = {
+                "model": config.get("model"),
+                "calls": calls,
+                "errors": int(values.get(f"{tier}:errors", 0)),
+                "avg_latency_ms": latency / calls if calls else 0.0,
+                "input_tokens": int(values.get(f"{tier}:input_tokens", 0)),
+                "output_tokens": int(values.get(f"{tier}:output_tokens", 0)),
+                "cost_usd": round(cost, 6),
+                "cost_per_call_usd": round(cost / calls, 6) if calls else 0.0,
+            }
+        escalations = {
+            reason: int(values.get(f"escalated:{reason}", 0))
+            for reason in self.ESCALATIONS
+        }
+        return {"tiers": tiers, "escalations": escalations}
+
+
+class _TierTimer(AsyncCallbackHandler):
+    """Times the model calls of one tier and records them with their usage."""
+
+    def __init__(self, tier: str, metrics: RouteMetrics):
+        self.tier = tier
+        self.metrics = metrics
+        self._started: dict = {}  # run id -> (start time, route reason)
+
+    async def on_chat_model_start(
+        self, serialized, messages, *, run_id, metadata=None, **kwargs
+    ):
+        reason = (metadata or {}).get("model_route")
+        self._started[run_id] = (time.perf_counter(), reason)
+
+    async def on_llm_end(self, response, *, run_id, **kwargs):
+        if run_id not in self._started:
+            return
+        started, reason = self._started.pop(run_id)
+        usage = None
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                usage = getattr(message, "usage_metadata", None) or usage
+        await self.metrics.record_call(
+            self.tier, time.perf_counter() - started, usage, reason=reason
+        )
+
+    async def on_llm_error(self, error, *, run_id, **kwargs):
+        if run_id not in self._started:
+            return
+        started, reason = self._started.pop(run_id)
+        await self.metrics.record_call(
+            self.tier, time.perf_counter() - started, None, reason=reason, failed=True
+        )
+
+
+class ModelRouter:
+    """
+    Dynamic model for create_react_agent that picks a tier per model call.
+
+    Args:
+        models: Chat model per tier; needs "small" and "large"
+        tools: Tools bound to every tier
+        metrics: Where calls are recorded (defaults to route_metrics)
+        min_confidence: Defaults to settings.MODEL_ROUTER_MIN_CONFIDENCE
+    """
+
+    def __init__(
+        self,
+        models: dict,
+        tools: Sequence,
+        metrics: RouteMetrics | None = None,
+        min_confidence: float | None = None,
+    ):
+        missing = {SMALL, LARGE} - set(models)
+        if missing:
+            raise ValueError(f"Model tiers missing: {', '.join(sorted(missing))}")
+        self.models = {tier: model.bind_tools(tools) for tier, model in models.items()}
+        self.metrics = metrics or route_metrics
+        self.min_confidence = (
+            min_confidence
+            if min_confidence is not None
+            else settings.MODEL_ROUTER_MIN_CONFIDENCE
+        )
+        self._timers = {tier: _TierTimer(tier, self.metrics) for tier in models}
+
+    def route(self, messages: Sequence[BaseMessage]) -> Route:
+        query, turn = split_turn(messages)
+        if tool_failed(turn):
+            return Route(LARGE, 0.0, "tool_error")
+        confidence = classify(query)
+        if confidence < self.min_confidence:
+            return Route(LARGE, confidence, "low_confidence")
+        return Route(SMALL, confidence, "simple")
+
+    def __call__(self, state, runtime):
+        route = self.route(state["messages"])
+        return self.models[route.tier].with_config(
+            callbacks=[self._timers[route.tier]],
+            metadata={"model_route": route.reason},
+        )
+
+
+route_metrics = RouteMetrics()
@@ -0,0 +1,208 @@
+"""
+LLM capacity controls for agent runs.
+
+TokenBudget: per-user daily token allowance in Redis, charged with the
+token usage OpenAI reports for each run. Checked before a run that will
+call the LLM; fast-path and cached answers are free.
+
+FairAdmission: replaces a plain semaphore in front of the agent. When all
+slots are busy, waiting runs are queued per user and slots are handed out
+round-robin across users, so one user's burst waits behind itself rather
+than in front of everyone else. Queues are bounded: a user with too many
+runs waiting, or a worker with too many in total, is turned away at once
+instead of piling up until timeouts.
+"""
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import Iterable
+
+from langchain_core.messages import BaseMessage, HumanMessage
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.redis import redis_client
+
+
+class QuotaExceeded(Exception):
+    """The caller's daily token budget is used up."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Daily token budget exhausted")
+        self.retry_after = retry_after
+
+
+class AdmissionRejected(Exception):
+    """Too many agent runs are already waiting (for this user, or overall)."""
+
+    def __init__(self, message: str, per_user: bool = False):
+        super().__init__(message)
+        self.per_user = per_user
+
+
+def run_usage(messages: Iterable[BaseMessage]) -> int:
+    """Tokens used by the model calls of the latest turn in `messages`."""
+    total = 0
+    for message in reversed(list(messages)):
+        if isinstance(message, HumanMessage):
+            break
+        usage = getattr(message, "usage_metadata", None)
+        if usage:
+            total += usage.get("total_tokens", 0)
+    return total
+
+
+class TokenBudget:
+    def __init__(
+        self,
+        client=None,
+        daily_tokens: int | None = None,
+        prefix: str = "token_budget",
+    ):
+        self.client = client or redis_client
+        self.daily_tokens = (
+            daily_tokens
+            if daily_tokens is not None
+            else settings.AGENT_DAILY_TOKEN_BUDGET
+        )
+        self.prefix = prefix
+
+    def _key(self, user_key: str) -> str:
+        day = datetime.now(timezone.utc).strftime("%Y%m%d")
+        return f"{self.prefix}:{user_key}:{day}"
+
+    @staticmethod
+    def _seconds_to_midnight() -> int:
+        now = time.time()
+        return int(86400 - now % 86400) + 1
+
+    async def used(self, user_key: str) -> int:
+        return int(await self.client.get(self._key(user_key)) or 0)
+
+    async def check(self, user_key: str):
+        """Raise QuotaExceeded if the budget is spent; allow if Redis fails."""
+        if not self.daily_tokens:
+            return
+        try:
+            used = await self.used(user_key)
+        except Exception as e:
+            logger.warning("Token budget check failed", key=user_key, error=str(e))
+            return
+        if used >= self.daily_tokens:
+            raise QuotaExceeded(self._seconds_to_midnight())
+
+    async def charge(self, user_key: str, tokens: int):
+        if not self.daily_tokens or tokens <= 0:
+            return
+        key = self._key(user_key)
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                pipe.incrby(key, tokens)
+                pipe.expire(key, 2 * 86400)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning("Token budget charge failed", key=user_key, error=str(e))
+
+
+class FairAdmission:
+    """Per-worker concurrency limit with round-robin queuing across users."""
+
+    def __init__(
+        self,
+        limit: int | None = None,
+        max_queued_per_key: int | None = None,
+        max_queued: int | None = None,
+    ):
+        self.limit = limit or settings.AGENT_MAX_CONCURRENCY
+        self.max_queued_per_key = (
+            max_queued_per_key or settings.AGENT_MAX_QUEUED_PER_USER
+        )
+        self.max_queued = max_queued or settings.AGENT_MAX_QUEUED
+        self.active = 0
+        self._queues: dict[str, deque] = {}
+        self._turns: deque = deque()  # keys with waiters, in round-robin order
+        self._waiting = 0
+
+    def stats(self) -> dict:
+        return {
+            "active": self.active,
+            "waiting": self._waiting,
+            "waiting_users": len(self._queues),
+        }
+
+    async def acquire(self, key: str):
+        if self.active < self.limit and not self._waiting:
+            self.active += 1
+            return
+        queue = self._queues.get(key)
+        if queue is not None and len(queue) >= self.max_queued_per_key:
+            raise AdmissionRejected(
+                "Too many queued requests for this user", per_user=True
+            )
+        if self._waiting >= self.max_queued:
+            raise AdmissionRejected("Server busy")
+
+        waiter = asyncio.get_running_loop().create_future()
+        if queue is None:
+            queue = self._queues[key] = deque()
+            self._turns.append(key)
+        queue.append(waiter)
+        self._waiting += 1
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we gave up; pass it on
+                self.release()
+            else:
+                self._discard(key, waiter)
+            raise
+
+    def _discard(self, key: str, waiter: asyncio.Future):
+        queue = self._queues.get(key)
+        if queue is None or waiter not in queue:
+            return
+        queue.remove(waiter)
+        self._waiting -= 1
+        if not queue:
+            del self._queues[key]
+            self._turns.remove(key)
+
+    def release(self):
+        """Hand the slot to the next user's oldest waiter, or free it."""
+        while self._turns:
+            key = self._turns.popleft()
+            queue = self._queues[key]
+            waiter = queue.popleft()
+            self._waiting -= 1
+            if queue:
+                self._turns.append(key)
+            else:
+                del self._queues[key]
+            if not waiter.done():
+                waiter.set_result(None)  # the slot moves over; active is unchanged
+                return
+        self.active -= 1
+
+    @asynccontextmanager
+    async def slot(self, key: str):
+        await self.acquire(key)
+        try:
+            yield
+        finally:
+            self.release()
+
+
+token_budget = TokenBudget()
+
+# Created lazily so its futures bind to the running event loop
+_admission: FairAdmission | None = None
+
+
+def get_admission() -> FairAdmission:
+    global _admission
+    if _admission is None:
+        _admission = FairAdmission()
+    return _admission
@@ -1,6 +1,28 @@
-from fastapi import APIRouter
+import asyncio
+import json
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from app.agents.agent import agent
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.agents.cache import response_cache
+from app.agents.executor import run_agent, stream_agent
+from app.agents.quota import (
+    AdmissionRejected,
+    QuotaExceeded,
+    get_admission,
+    token_budget,
+)
+from app.agents.model_router import route_metrics
+from app.agents.singleflight import agent_flight, tool_flight
+from app.agents.transport import transport_stats
+from app.auth.cache import Principal
+from app.auth.dependencies import get_current_user, get_optional_user
+from app.auth.rate_limit import limit_agent_requests
+from app.db.session import get_db
+from app.models import Chat
+from app.services.message_writer import message_writer, new_message
+from app.core.logging import logger
 from app.api.v1.health import router as health_router  # <-- import at top
 from app.api.v1.auth import router as auth_router  # <-- import at top
 
@@ -17,10 +39,165 @@ class QueryRequest(BaseModel):
     thread_id: str = "default"
 
 
+class StreamQueryRequest(BaseModel):
+    query: str
+    chat_id: int
+
+
+def quota_exceeded(e: QuotaExceeded) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=str(e),
+        headers={"Retry-After": str(e.retry_after)},
+    )
+
+
+def admission_rejected(e: AdmissionRejected) -> HTTPException:
+    # The caller's own queue is full: 429; the worker is full: 503
+    return HTTPException(
+        status_code=(
+            status.HTTP_429_TOO_MANY_REQUESTS
+            if e.per_user
+            else status.HTTP_503_SERVICE_UNAVAILABLE
+        ),
+        detail=str(e),
+        headers={"Retry-After": "1"},
+    )
+
+
 # Endpoint: POST with JSON body
 @router.post("/query")
-async def query_agent(request: QueryRequest):
-    result = agent.invoke({"messages": [("user", request.query)]}, config={"configurable": {"thread_id": request.thread_id}})
-    # Extract the final message
-    final_message = result["messages"][-1].content if "messages" in result else result
+async def query_agent(
+    request: QueryRequest,
+    http_request: Request,
+    current_user: Optional[Principal] = Depends(get_optional_user),
+):
+    """
+    Ask the agent a question.
+
+    Anonymous callers are rate limited and budgeted per client IP; send a
+    bearer token to be metered as your user instead.
+    """
+    user_key = await limit_agent_requests(http_request, current_user)
+    try:
+        final_message = await run_agent(
+            request.query, request.thread_id, user_key=user_key
+        )
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail="Agent timed out"
+        )
+    except QuotaExceeded as e:
+        raise quota_exceeded(e)
+    except AdmissionRejected as e:
+        raise admission_rejected(e)
     return {"answer": final_message}
+
+
+@router.get("/query/cache/stats")
+async def response_cache_stats():
+    """Hit/miss counters for the agent response cache."""
+    return await response_cache.stats()
+
+
+@router.get("/query/singleflight/stats")
+async def single_flight_stats():
+    """How many agent runs and tool calls were coalesced into in-flight ones."""
+    return {"agent": await agent_flight.stats(), "tools": await tool_flight.stats()}
+
+
+@router.get("/query/router/stats")
+async def model_router_stats():
+    """Model calls, latency, tokens and cost per tier, and escalations."""
+    return await route_metrics.stats()
+
+
+@router.get("/query/transport/stats")
+async def llm_transport_stats():
+    """LLM HTTP attempts, retries, timeouts and hedges in this worker."""
+    return transport_stats()
+
+
+@router.get("/query/admission/stats")
+async def admission_stats():
+    """Agent runs active and waiting in this worker."""
+    return get_admission().stats()
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+# Endpoint: POST with JSON body, answered as Server-Sent Events
+@router.post("/query/stream")
+async def stream_query_agent(
+    request: StreamQueryRequest,
+    http_request: Request,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Stream tokens and tool progress for a chat as Server-Sent Events.
+
+    The user and assistant messages, and the tool calls in between, are
+    saved to the chat once the answer is complete, so clients don't need to
+    call save_message themselves.
+    """
+    chat = await db.get(Chat, request.chat_id)
+    if not chat or chat.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Chat not found")
+    chat_id, thread_id = chat.id, chat.thread_id
+    user_key = await limit_agent_requests(http_request, current_user)
+    # Refuse before the stream starts, while a status code can still be sent
+    try:
+        await token_budget.check(user_key)
+    except QuotaExceeded as e:
+        raise quota_exceeded(e)
+
+    async def event_stream():
+        tool_calls = {}  # by call id, in start order
+        try:
+            async for event in stream_agent(
+                request.query, thread_id, user_key=user_key
+            ):
+                if event["type"] == "done":
+                    answer = event["answer"]
+                else:
+                    if event["type"] == "tool_start":
+                        tool_calls[event["id"]] = {
+                            "name": event["name"],
+                            "input": event["input"],
+                        }
+                    elif event["type"] == "tool_end" and event["id"] in tool_calls:
+                        tool_calls[event["id"]]["result"] = event["result"]
+                    yield _sse(event.pop("type"), event)
+        except asyncio.TimeoutError:
+            yield _sse("error", {"detail": "Agent timed out"})
+            return
+        except (QuotaExceeded, AdmissionRejected) as e:
+            yield _sse("error", {"detail": str(e)})
+            return
+        except Exception as e:
+            logger.error("Agent stream failed", chat_id=chat_id, error=str(e))
+            yield _sse("error", {"detail": "Agent failed"})
+            return
+
+        # Tool calls and their results are kept as "tool" messages; reports
+        # read facts from them
+        await message_writer.enqueue(
+            [
+                new_message(chat_id, "user", request.query),
+                *(
+                    new_message(chat_id, "tool", json.dumps(call, default=str))
+                    for call in tool_calls.values()
+                ),
+                new_message(chat_id, "assistant", answer),
+            ]
+        )
+        yield _sse("done", {"answer": answer})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
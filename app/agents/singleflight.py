@@ -0,0 +1,213 @@
+"""
+Single-flight execution: concurrent identical calls share one computation.
+
+Within a worker, callers of a key already in flight await the same future.
+Across workers, the first caller takes a Redis lock on the key and becomes
+the leader; callers elsewhere poll for the result the leader publishes
+(kept for SINGLE_FLIGHT_RESULT_TTL_SECONDS) and return it. Followers get
+the leader's outcome, error included. If a leader dies without publishing,
+its lock expires and one of the waiting callers takes over.
+
+Results must be JSON-serializable. If Redis is unavailable calls are
+still coalesced within the worker.
+"""
+import asyncio
+import hashlib
+import json
+import uuid
+from typing import Any, Awaitable, Callable
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.redis import redis_client
+
+
+class SingleFlightError(Exception):
+    """The leader of a coalesced call failed; raised in its followers."""
+
+
+# Outcome telling local followers the leader was cancelled
+_RETRY = object()
+
+
+def flight_key(*parts) -> str:
+    canonical = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()[:32]
+
+
+class SingleFlight:
+    STATS_FIELDS = ("leaders", "coalesced_local", "coalesced_remote", "takeovers")
+    # takeovers: leaders that ran after a previous leader died (subset of leaders)
+
+    def __init__(
+        self,
+        namespace: str,
+        client=None,
+        lock_ttl: float | None = None,
+        result_ttl: int | None = None,
+        poll_interval: float | None = None,
+    ):
+        self.client = client or redis_client
+        self.prefix = f"singleflight:{namespace}"
+        self.lock_ttl = lock_ttl or settings.AGENT_TIMEOUT_SECONDS + 5
+        self.result_ttl = result_ttl or settings.SINGLE_FLIGHT_RESULT_TTL_SECONDS
+        self.poll_interval = (
+            poll_interval
+            if poll_interval is not None
+            else settings.SINGLE_FLIGHT_POLL_MS / 1000
+        )
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    def _lock_key(self, key: str) -> str:
+        return f"{self.prefix}:lock:{key}"
+
+    def _result_key(self, key: str) -> str:
+        return f"{self.prefix}:result:{key}"
+
+    @property
+    def _stats_key(self) -> str:
+        return f"{self.prefix}:stats"
+
+    async def record(self, field: str) -> None:
+        try:
+            await self.client.hincrby(self._stats_key, field, 1)
+        except Exception as e:
+            logger.warning("Single-flight stats failed", error=str(e))
+
+    async def stats(self) -> dict:
+        raw = await self.client.hgetall(self._stats_key)
+        counts = {
+            k.decode() if isinstance(k, bytes) else k: int(v) for k, v in raw.items()
+        }
+        stats = {field: counts.get(field, 0) for field in self.STATS_FIELDS}
+        coalesced = stats["coalesced_local"] + stats["coalesced_remote"]
+        calls = stats["leaders"] + coalesced
+        stats["coalesced_rate"] = coalesced / calls if calls else 0.0
+        stats["in_flight"] = len(self._inflight)
+        return stats
+
+    async def _try_lock(self, key: str, token: str) -> bool:
+        try:
+            return bool(
+                await self.client.set(
+                    self._lock_key(key), token, nx=True, px=int(self.lock_ttl * 1000)
+                )
+            )
+        except Exception as e:
+            logger.warning("Single-flight lock failed", error=str(e))
+            return True  # lead locally
+
+    async def _await_remote(self, key: str) -> tuple[bool, Any]:
+        """Poll for the leader's result; (False, None) once its lock is gone."""
+        while True:
+            async with self.client.pipeline(transaction=False) as pipe:
+                pipe.get(self._result_key(key))
+                pipe.exists(self._lock_key(key))
+                raw, locked = await pipe.execute()
+            if raw is not None:
+                return True, json.loads(raw)
+            if not locked:
+                # Check once more: the leader publishes before unlocking
+                raw = await self.client.get(self._result_key(key))
+                return (True, json.loads(raw)) if raw is not None else (False, None)
+            await asyncio.sleep(self.poll_interval)
+
+    async def _clear(self, key: str):
+        # Followers of this flight must not pick up an earlier flight's result
+        try:
+            await self.client.delete(self._result_key(key))
+        except Exception as e:
+            logger.warning("Single-flight clear failed", error=str(e))
+
+    async def _publish(self, key: str, outcome: dict):
+        try:
+            await self.client.set(
+                self._result_key(key), json.dumps(outcome), ex=self.result_ttl
+            )
+        except Exception as e:
+            logger.warning("Single-flight publish failed", error=str(e))
+
+    async def _unlock(self, key: str, token: str):
+        # Release only our own lock (it may have expired and been retaken)
+        try:
+            async with self.client.pipeline(transaction=True) as pipe:
+                await pipe.watch(self._lock_key(key))
+                current = await pipe.get(self._lock_key(key))
+                if current is not None and current.decode() == token:
+                    pipe.multi()
+                    pipe.delete(self._lock_key(key))
+                    await pipe.execute()
+                else:
+                    await pipe.unwatch()
+        except Exception as e:
+            logger.warning("Single-flight unlock failed", error=str(e))
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> tuple[Any, bool]:
+        """
+        Run `fn` once for concurrent callers of `key`.
+
+        Returns (value, shared): shared is False for the caller that ran
+        `fn`, True for callers that reused its result. If `fn` raises,
+        callers in this worker get the same exception and callers in other
+        workers a SingleFlightError.
+        """
+        while (local := self._inflight.get(key)) is not None:
+            value, error = await asyncio.shield(local)
+            if error is _RETRY:
+                continue  # the leader was cancelled; contend again
+            await self.record("coalesced_local")
+            if error is not None:
+                raise error
+            return value, True
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        token = uuid.uuid4().hex
+        locked = False
+        try:
+            takeover = False
+            while not (locked := await self._try_lock(key, token)):
+                try:
+                    found, outcome = await self._await_remote(key)
+                except Exception as e:
+                    logger.warning("Single-flight wait failed", error=str(e))
+                    break
+                if found:
+                    error = None
+                    if "error" in outcome:
+                        error = SingleFlightError(outcome["error"])
+                    future.set_result((outcome.get("value"), error))
+                    await self.record("coalesced_remote")
+                    if error is not None:
+                        raise error
+                    return outcome["value"], True
+                takeover = True
+
+            if locked:
+                await self._clear(key)
+            await self.record("leaders")
+            if takeover:
+                await self.record("takeovers")
+            try:
+                value = await fn()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                future.set_result((None, e))
+                if locked:
+                    await self._publish(key, {"error": str(e)})
+                raise
+            future.set_result((value, None))
+            if locked:
+                await self._publish(key, {"value": value})
+            return value, False
+        finally:
+            if not future.done():
+                future.set_result((None, _RETRY))
+            self._inflight.pop(key, None)
+            if locked:
+                await self._unlock(key, token)
+
+
+agent_flight = SingleFlight("agent")
+tool_flight = SingleFlight("tool")
@@ -0,0 +1,90 @@
+"""
+Concurrent tool execution for the agent graph.
+
+When the model asks for several tools in one message (e.g. budget,
+emergency fund and retirement together), ParallelToolNode runs the calls
+concurrently and returns their results in the order the calls were made.
+
+Each tool gets an async implementation that dispatches it:
+    - tools marked cpu_bound (see app.agents.tool_pool) run in a process
+      pool (TOOL_PROCESS_WORKERS; 0 = threads), so heavy simulations run
+      truly in parallel
+    - other (light) tools run on the thread pool
+    - tools marked single_flight share identical concurrent calls
+      (see app.agents.singleflight)
+
+Every call has a timeout (TOOL_TIMEOUT_SECONDS, per tool overrides in
+TOOL_TIMEOUTS). A call that times out returns an error message to the
+model instead of failing the turn. Cancelling the turn cancels calls still
+waiting for a worker; a call already running in a thread or process
+finishes in the background and its result is dropped.
+"""
+import asyncio
+from typing import Sequence
+
+from langchain_core.tools import BaseTool
+from langgraph.prebuilt import ToolNode
+
+from app.agents.singleflight import SingleFlightError, flight_key, tool_flight
+from app.agents.tool_pool import get_tool_pool, run_tool
+from app.core.config import settings
+from app.core.logging import logger
+
+
+def tool_timeout(name: str) -> float:
+    return settings.TOOL_TIMEOUTS.get(name, settings.TOOL_TIMEOUT_SECONDS)
+
+
+def dispatching(tool_: BaseTool) -> BaseTool:
+    """Copy of the tool whose async implementation dispatches as above."""
+    metadata = tool_.metadata or {}
+    timeout = tool_timeout(tool_.name)
+
+    async def compute(kwargs: dict):
+        loop = asyncio.get_running_loop()
+        pool = get_tool_pool() if metadata.get("cpu_bound") else None
+        if pool is not None:
+            call = loop.run_in_executor(pool, run_tool, tool_.name, kwargs)
+        else:
+            call = asyncio.to_thread(tool_.func, **kwargs)
+        return await asyncio.wait_for(call, timeout)
+
+    def output(result):
+        # content_and_artifact tools return (content, artifact); a result
+        # shared through Redis comes back as a list, and errors are text only
+        if tool_.response_format != "content_and_artifact":
+            return result
+        return tuple(result) if isinstance(result, (list, tuple)) else (result, None)
+
+    async def run(**kwargs):
+        try:
+            if metadata.get("single_flight") and settings.SINGLE_FLIGHT_ENABLED:
+                result, _ = await tool_flight.do(
+                    flight_key(tool_.name, kwargs), lambda: compute(kwargs)
+                )
+                return output(result)
+            return output(await compute(kwargs))
+        except asyncio.TimeoutError:
+            logger.warning("Tool timed out", tool=tool_.name, timeout=timeout)
+            return output(
+                f"Error: {tool_.name} took longer than {timeout:g}s and was stopped."
+            )
+        except SingleFlightError as e:
+            # The shared call failed in another worker
+            return output(f"Error: {e}")
+
+    return tool_.model_copy(update={"coroutine": run})
+
+
+class ParallelToolNode(ToolNode):
+    """
+    ToolNode whose tool calls run concurrently through `dispatching`.
+
+    ToolNode gathers the calls of one message and keeps their order; the
+    dispatching tools make that gather run heavy calls in parallel and
+    bound each one with a timeout. Only the async path (ainvoke /
+    astream_events, as the executor uses) goes through the dispatchers.
+    """
+
+    def __init__(self, tools: Sequence[BaseTool], **kwargs):
+        super().__init__([dispatching(t) for t in tools], **kwargs)
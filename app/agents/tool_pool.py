@@ -0,0 +1,54 @@
+"""
+Process pool for CPU-heavy tool calls, and the markers the tool node
+dispatches on (see app.agents.tool_node).
+
+Kept apart from the tool node so the app can shut the pool down, and the
+tools can be defined and run (in pool workers too), without importing
+LangGraph.
+"""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from langchain_core.tools import BaseTool
+
+from app.core.config import settings
+
+
+def cpu_bound(tool_: BaseTool) -> BaseTool:
+    """Mark a tool as CPU-heavy: it runs in the tool process pool."""
+    tool_.metadata = {**(tool_.metadata or {}), "cpu_bound": True}
+    return tool_
+
+
+def single_flight(tool_: BaseTool) -> BaseTool:
+    """Mark a deterministic tool whose identical concurrent calls can be shared."""
+    tool_.metadata = {**(tool_.metadata or {}), "single_flight": True}
+    return tool_
+
+
+def run_tool(name: str, kwargs: dict):
+    """Pool entry point: look the tool up by name (tools don't pickle)."""
+    from app.agents.agent import tools
+
+    return next(t for t in tools if t.name == name).func(**kwargs)
+
+
+_pool: ProcessPoolExecutor | None = None
+
+
+def get_tool_pool() -> ProcessPoolExecutor | None:
+    global _pool
+    if _pool is None and settings.TOOL_PROCESS_WORKERS > 0:
+        # spawn: forking a threaded server process isn't safe
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.TOOL_PROCESS_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def shutdown_tool_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
@@ -0,0 +1,334 @@
+"""
+Typed results of the financial tools.
+
+Each tool returns (content, artifact) (LangChain's content_and_artifact):
+    - content: the result as compact JSON for the model, without the
+      arguments it just passed (ECHOED fields) and rounded to cents
+    - artifact: the full result as a dict, kept on the ToolMessage in the
+      checkpoint (the model never sees it)
+
+Downstream code reads numbers from the artifact with parse_result instead
+of parsing text or running the tool again. summary() renders a result as
+readable text, as the tools used to return it (used by the fast path).
+Errors and warnings stay plain text with no artifact.
+"""
+import abc
+import json
+import math
+from typing import ClassVar, Literal
+
+from pydantic import BaseModel
+
+
+def _compact(value):
+    if isinstance(value, float):
+        return round(value, 2) if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {k: _compact(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_compact(v) for v in value]
+    return value
+
+
+class ToolResult(BaseModel, abc.ABC):
+    # Arguments of the call kept for summary(); the model already knows them
+    ECHOED: ClassVar[set] = set()
+
+    @abc.abstractmethod
+    def summary(self) -> str:
+        """The result as readable text."""
+
+    def compact(self) -> str:
+        fields = self.model_dump(exclude=self.ECHOED, exclude_none=True)
+        return json.dumps(_compact(fields), separators=(",", ":"))
+
+    def output(self) -> tuple[str, dict]:
+        """(content, artifact) for a content_and_artifact tool."""
+        return self.compact(), self.model_dump()
+
+
+class SavingsResult(ToolResult):
+    ECHOED = {"months"}
+    months: int
+    total: float
+
+    def summary(self) -> str:
+        return f"Total savings after {self.months} months: ${self.total}"
+
+
+class CompoundInterestResult(ToolResult):
+    ECHOED = {"years"}
+    years: int
+    future_value: float
+
+    def summary(self) -> str:
+        return f"Future value after {self.years} years: ${self.future_value:,.2f}"
+
+
+class LoanPaymentResult(ToolResult):
+    ECHOED = {"annual_rate"}
+    annual_rate: float
+    monthly_payment: float
+    total_paid: float
+    total_interest: float
+
+    def summary(self) -> str:
+        if self.annual_rate == 0:
+            return f"Monthly payment (0% interest): ${self.monthly_payment:,.2f}"
+        return (
+            f"Monthly payment: ${self.monthly_payment:,.2f}\n"
+            f"Total paid: ${self.total_paid:,.2f}\n"
+            f"Total interest: ${self.total_interest:,.2f}"
+        )
+
+
+class PortfolioResult(ToolResult):
+    ECHOED = {"allocations"}
+    allocations: dict[str, float]
+    risk_score: float  # 0-10
+    risk_level: Literal["Conservative", "Moderate", "Aggressive"]
+    recommendation: str | None = None
+
+    def summary(self) -> str:
+        text = "Portfolio Analysis:\n"
+        for asset, percent in self.allocations.items():
+            text += f"- {asset.title()}: {percent}%\n"
+        text += f"\nRisk Level: {self.risk_level} ({self.risk_score:.1f}/10)\n"
+        if self.recommendation:
+            text += f"Recommendation: {self.recommendation}"
+        return text
+
+
+class BudgetResult(ToolResult):
+    ECHOED = {"income", "expenses"}
+    income: float
+    expenses: dict[str, float]
+    total_expenses: float
+    remaining: float
+    savings_rate: float  # percent of income
+    expense_shares: dict[str, float]  # percent of income per category
+    savings_rating: Literal["low", "ok", "excellent"]
+
+    def summary(self) -> str:
+        text = "Budget Analysis:\n"
+        text += f"Monthly Income: ${self.income:,.2f}\n"
+        text += f"Total Expenses: ${self.total_expenses:,.2f}\n"
+        text += f"Remaining: ${self.remaining:,.2f}\n"
+        text += f"Savings Rate: {self.savings_rate:.1f}%\n\n"
+        text += "Expense Breakdown:\n"
+        for category, amount in self.expenses.items():
+            text += (
+                f"- {category.title()}: ${amount:,.2f} "
+                f"({self.expense_shares[category]:.1f}%)\n"
+            )
+        if self.savings_rating == "low":
+            text += "\n⚠️  Low savings rate. Consider reducing discretionary spending."
+        elif self.savings_rating == "excellent":
+            text += "\n✅ Excellent savings rate! Consider investing surplus."
+        return text
+
+
+class RetirementResult(ToolResult):
+    years_to_retire: int
+    total_at_retirement: float
+    annual_income: float  # 4% rule
+    monthly_income: float
+    on_track: bool
+
+    def summary(self) -> str:
+        text = f"Retirement Projection ({self.years_to_retire} years):\n"
+        text += f"Total at retirement: ${self.total_at_retirement:,.2f}\n"
+        text += f"Estimated annual income (4% rule): ${self.annual_income:,.2f}\n"
+        text += f"Estimated monthly income: ${self.monthly_income:,.2f}\n\n"
+        if self.on_track:
+            text += "✅ You're on track for a comfortable retirement!"
+        else:
+            text += "⚠️  Consider increasing contributions for better retirement income."
+        return text
+
+
+class PayoffStrategy(BaseModel):
+    name: str
+    monthly_payment: float
+    # None when the payment doesn't cover the interest
+    months: int | None = None
+    total_paid: float | None = None
+    interest_paid: float | None = None
+
+
+class DebtPayoffResult(ToolResult):
+    strategies: list[PayoffStrategy]
+
+    def compact(self) -> str:
+        # The payments are the model's own arguments
+        strategies = [
+            s.model_dump(exclude={"monthly_payment"}, exclude_none=True)
+            for s in self.strategies
+        ]
+        return json.dumps(_compact({"strategies": strategies}), separators=(",", ":"))
+
+    def summary(self) -> str:
+        lines = []
+        for s in self.strategies:
+            if s.months is None:
+                lines.append(f"{s.name}: Payment too low to cover interest!")
+                continue
+            lines.append(
+                f"{s.name.title()}: {s.months} months ({s.months / 12:.1f} years)"
+            )
+            lines.append(f"  Total paid: ${s.total_paid:,.2f}")
+            lines.append(f"  Interest paid: ${s.interest_paid:,.2f}\n")
+        return "Debt Payoff Comparison:\n" + "\n".join(lines)
+
+
+class EmergencyFundResult(ToolResult):
+    ECHOED = {"monthly_expenses", "current_savings", "target_months"}
+    monthly_expenses: float
+    current_savings: float
+    target_months: int
+    target_amount: float
+    coverage_months: float
+    remaining_needed: float
+    status: Literal["critical", "warning", "adequate"]
+    # Monthly saving ("100", "250", "500") -> months to reach the target
+    months_to_target: dict[str, float] = {}
+
+    def summary(self) -> str:
+        text = "Emergency Fund Analysis:\n"
+        text += f"Monthly expenses: ${self.monthly_expenses:,.2f}\n"
+        text += (
+            f"Target fund ({self.target_months} months): ${self.target_amount:,.2f}\n"
+        )
+        text += f"Current savings: ${self.current_savings:,.2f}\n"
+        text += f"Current coverage: {self.coverage_months:.1f} months\n"
+        text += f"Still needed: ${self.remaining_needed:,.2f}\n\n"
+        text += {
+            "critical": "⚠️  Critical: Build emergency fund immediately!",
+            "warning": "⚠️  Warning: Increase emergency fund when possible.",
+            "adequate": "✅ Great! You have adequate emergency coverage.",
+        }[self.status]
+        for monthly_save, months in self.months_to_target.items():
+            text += f"\nSaving ${monthly_save}/month: {months:.1f} months to target"
+        return text
+
+
+class TaxResult(ToolResult):
+    ECHOED = {"income", "filing_status", "state"}
+    income: float
+    filing_status: str
+    state: str
+    standard_deduction: float
+    taxable_income: float
+    federal_tax: float
+    after_tax_income: float
+    effective_rate: float  # percent
+    marginal_rate: float  # percent
+
+    def summary(self) -> str:
+        text = f"Tax Estimate ({self.filing_status}):\n"
+        text += f"Gross income: ${self.income:,.2f}\n"
+        text += f"Standard deduction: ${self.standard_deduction:,.2f}\n"
+        text += f"Taxable income: ${self.taxable_income:,.2f}\n"
+        text += f"Federal tax: ${self.federal_tax:,.2f}\n"
+        text += f"After-tax income: ${self.after_tax_income:,.2f}\n"
+        text += f"Effective rate: {self.effective_rate:.1f}%\n"
+        text += f"Marginal rate: {self.marginal_rate:.0f}%\n"
+        if self.state != "none":
+            text += f"\nNote: State taxes for {self.state} not included in calculation."
+        return text
+
+    def compact(self) -> str:
+        fields = self.model_dump(exclude=self.ECHOED)
+        if self.state != "none":
+            fields["note"] = "federal only; state tax not included"
+        return json.dumps(_compact(fields), separators=(",", ":"))
+
+
+class ScenarioSweepResult(ToolResult):
+    ECHOED = {"calculator"}
+    calculator: str
+    count: int  # scenarios computed
+    # First rows only (see scenario_sweep); None where a value is undefined
+    columns: dict[str, list[float | None]]
+
+    def _rows(self) -> list[str]:
+        def fmt(value):
+            if value is None:
+                return "n/a"
+            return f"{value:.2f}".rstrip("0").rstrip(".")
+
+        names = list(self.columns)
+        shown = len(self.columns[names[0]]) if names else 0
+        rows = [",".join(names)]
+        for i in range(shown):
+            rows.append(",".join(fmt(self.columns[name][i]) for name in names))
+        if self.count > shown:
+            rows.append(
+                f"... {self.count - shown} more rows; narrow the grid to see them."
+            )
+        return rows
+
+    def compact(self) -> str:
+        # CSV is shorter than JSON for a table
+        return f"{self.count} scenarios\n" + "\n".join(self._rows())
+
+    def summary(self) -> str:
+        return f"Scenario sweep ({self.count} scenarios):\n" + "\n".join(self._rows())
+
+
+class MonteCarloResult(ToolResult):
+    ECHOED = {"years", "target"}
+    paths: int
+    years: int
+    annual_return: float  # percent; estimated from the portfolio if one was given
+    volatility: float
+    target: float | None = None
+    success_probability: float | None = None  # 0-1, with a target
+    p10: float
+    p50: float
+    p90: float
+    mean: float
+
+    def summary(self) -> str:
+        text = (
+            f"Monte Carlo Simulation ({self.paths:,} scenarios, "
+            f"{self.years} years):\n"
+        )
+        text += (
+            f"Assumed return: {self.annual_return:.1f}%/yr, "
+            f"volatility: {self.volatility:.1f}%\n"
+        )
+        if self.target:
+            text += (
+                f"Chance of reaching ${self.target:,.2f}: "
+                f"{self.success_probability * 100:.1f}%\n"
+            )
+        text += f"Pessimistic (10th percentile): ${self.p10:,.2f}\n"
+        text += f"Median outcome: ${self.p50:,.2f}\n"
+        text += f"Optimistic (90th percentile): ${self.p90:,.2f}\n"
+        text += f"Average outcome: ${self.mean:,.2f}"
+        return text
+
+
+# Tool name -> its result type
+RESULT_TYPES: dict[str, type[ToolResult]] = {
+    "savings_calculator": SavingsResult,
+    "compound_interest": CompoundInterestResult,
+    "loan_payment_calculator": LoanPaymentResult,
+    "portfolio_analyzer": PortfolioResult,
+    "budget_planner": BudgetResult,
+    "retirement_calculator": RetirementResult,
+    "debt_payoff_calculator": DebtPayoffResult,
+    "emergency_fund_calculator": EmergencyFundResult,
+    "tax_calculator": TaxResult,
+    "scenario_sweep": ScenarioSweepResult,
+    "monte_carlo_simulation": MonteCarloResult,
+}
+
+
+def parse_result(tool_name: str, artifact: dict | None) -> ToolResult | None:
+    """The typed result of a tool call from its artifact; None if it has none."""
+    result_type = RESULT_TYPES.get(tool_name)
+    if result_type is None or not artifact:
+        return None
+    return result_type.model_validate(artifact)
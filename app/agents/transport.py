@@ -0,0 +1,240 @@
+"""
+HTTP transport for OpenAI calls.
+
+Every chat model tier and the embeddings share one pooled async httpx
+client per worker (HTTP/2 when LLM_HTTP2, bounded by LLM_MAX_CONNECTIONS
+and LLM_MAX_KEEPALIVE_CONNECTIONS), so calls reuse warm connections
+instead of opening new ones.
+
+The OpenAI SDK's own retries are off; ResilientTransport owns them:
+    - each attempt must start responding within LLM_ATTEMPT_TIMEOUT_SECONDS
+      (a streamed body then has LLM_READ_TIMEOUT_SECONDS between chunks)
+    - connection errors, timeouts, 429 and 5xx are retried up to
+      LLM_MAX_RETRIES times after a full-jitter exponential backoff, or
+      after Retry-After when the server sends one
+    - with LLM_HEDGE_ENABLED, an attempt still waiting past the recent
+      LLM_HEDGE_PERCENTILE latency gets a second, hedged request. The first
+      good response wins and the other request is cancelled. A hedged call
+      can be billed twice, so it trades tokens for tail latency.
+
+Synchronous model calls (scripts using invoke) go through the SDK's
+default client, without retries. Point OPENAI_BASE_URL at an
+OpenAI-compatible server, such as a local mock, to exercise all of this
+without OpenAI.
+"""
+import asyncio
+import random
+import time
+from collections import Counter, deque
+
+import httpx
+
+from app.core.config import settings
+from app.core.logging import logger
+
+RETRY_STATUSES = {408, 409, 429, 500, 502, 503, 504}
+
+
+class LatencyWindow:
+    """Time to response headers of the most recent attempts."""
+
+    def __init__(self, size: int = 500):
+        self._samples: deque = deque(maxlen=size)
+
+    def add(self, seconds: float):
+        self._samples.append(seconds)
+
+    def percentile(self, p: float, min_samples: int = 1) -> float | None:
+        if len(self._samples) < max(min_samples, 1):
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(int(len(ordered) * p / 100), len(ordered) - 1)]
+
+
+class ResilientTransport(httpx.AsyncBaseTransport):
+    """Retries with jittered backoff and optional hedging over a pooled transport."""
+
+    def __init__(
+        self,
+        inner: httpx.AsyncBaseTransport | None = None,
+        max_retries: int | None = None,
+        attempt_timeout: float | None = None,
+        hedge: bool | None = None,
+    ):
+        self.inner = inner or httpx.AsyncHTTPTransport(
+            http2=settings.LLM_HTTP2,
+            limits=httpx.Limits(
+                max_connections=settings.LLM_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.LLM_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+        )
+        self.max_retries = (
+            max_retries if max_retries is not None else settings.LLM_MAX_RETRIES
+        )
+        self.attempt_timeout = attempt_timeout or settings.LLM_ATTEMPT_TIMEOUT_SECONDS
+        self.hedge = hedge if hedge is not None else settings.LLM_HEDGE_ENABLED
+        self.latencies = LatencyWindow()
+        self.counts: Counter = Counter()
+
+    def stats(self) -> dict:
+        fields = ("requests", "attempts", "retries", "timeouts", "hedges", "hedge_wins")
+        stats = {field: self.counts[field] for field in fields}
+        stats["p95_ms"] = (self.latencies.percentile(95) or 0.0) * 1000
+        stats["hedge_after_ms"] = (self.hedge_delay() or 0.0) * 1000
+        return stats
+
+    def hedge_delay(self) -> float | None:
+        """Seconds before an attempt is hedged; None when hedging is off."""
+        if not self.hedge:
+            return None
+        delay = self.latencies.percentile(
+            settings.LLM_HEDGE_PERCENTILE, settings.LLM_HEDGE_MIN_SAMPLES
+        )
+        return delay if delay is not None else settings.LLM_HEDGE_AFTER_MS / 1000
+
+    @staticmethod
+    def backoff(attempt: int, retry_after: str | None = None) -> float:
+        if retry_after:
+            try:
+                return min(float(retry_after), settings.LLM_RETRY_BACKOFF_MAX_SECONDS)
+            except ValueError:
+                pass  # an HTTP date; fall back to our own backoff
+        cap = min(
+            settings.LLM_RETRY_BACKOFF_SECONDS * 2**attempt,
+            settings.LLM_RETRY_BACKOFF_MAX_SECONDS,
+        )
+        return random.uniform(0, cap)
+
+    async def _send(self, request: httpx.Request) -> httpx.Response:
+        # A fresh Request per attempt: the body is sent again
+        attempt = httpx.Request(
+            request.method,
+            request.url,
+            headers=request.headers,
+            content=request.content,
+            extensions=request.extensions,
+        )
+        self.counts["attempts"] += 1
+        start = time.perf_counter()
+        try:
+            async with asyncio.timeout(self.attempt_timeout):
+                response = await self.inner.handle_async_request(attempt)
+        except TimeoutError:
+            self.counts["timeouts"] += 1
+            raise httpx.ReadTimeout(
+                f"No response within {self.attempt_timeout:g}s", request=request
+            ) from None
+        self.latencies.add(time.perf_counter() - start)
+        return response
+
+    async def _hedged(self, request: httpx.Request) -> httpx.Response:
+        """One attempt, with a hedge if it runs past the hedge delay."""
+        delay = self.hedge_delay()
+        if delay is None:
+            return await self._send(request)
+
+        tasks = [asyncio.ensure_future(self._send(request))]
+        winner = None
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                self.counts["hedges"] += 1
+                tasks.append(asyncio.ensure_future(self._send(request)))
+            pending = set(tasks)
+            while pending and winner is None:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is not None:
+                        continue
+                    # A retryable status only wins if nothing better can come
+                    if task.result().status_code not in RETRY_STATUSES or not pending:
+                        winner = task
+                        break
+            if winner is None:
+                return tasks[-1].result()  # every attempt raised
+            if winner is not tasks[0]:
+                self.counts["hedge_wins"] += 1
+            return winner.result()
+        finally:
+            for task in tasks:
+                if task is winner:
+                    continue
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled() and task.exception() is None:
+                    await task.result().aclose()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        self.counts["requests"] += 1
+        for attempt in range(self.max_retries + 1):
+            last = attempt == self.max_retries
+            try:
+                response = await self._hedged(request)
+            except httpx.TransportError as e:
+                if last:
+                    raise
+                logger.warning(
+                    "LLM request failed, retrying", error=repr(e), attempt=attempt + 1
+                )
+                self.counts["retries"] += 1
+                await asyncio.sleep(self.backoff(attempt))
+                continue
+            if response.status_code in RETRY_STATUSES and not last:
+                retry_after = response.headers.get("retry-after")
+                await response.aclose()
+                logger.warning(
+                    "LLM request failed, retrying",
+                    status=response.status_code,
+                    attempt=attempt + 1,
+                )
+                self.counts["retries"] += 1
+                await asyncio.sleep(self.backoff(attempt, retry_after))
+                continue
+            return response
+
+    async def aclose(self):
+        await self.inner.aclose()
+
+
+_client: httpx.AsyncClient | None = None
+_transport: ResilientTransport | None = None
+
+
+def get_llm_http_client() -> httpx.AsyncClient:
+    global _client, _transport
+    if _client is None:
+        _transport = ResilientTransport()
+        _client = httpx.AsyncClient(transport=_transport, timeout=llm_timeout())
+    return _client
+
+
+async def close_llm_http_client():
+    global _client, _transport
+    if _client is not None:
+        await _client.aclose()
+        _client = _transport = None
+
+
+def llm_timeout() -> httpx.Timeout:
+    return httpx.Timeout(
+        settings.LLM_READ_TIMEOUT_SECONDS, connect=settings.LLM_CONNECT_TIMEOUT_SECONDS
+    )
+
+
+def transport_stats() -> dict:
+    """Counters of this worker's LLM transport ({} before the first call)."""
+    return _transport.stats() if _transport is not None else {}
+
+
+def openai_client_kwargs() -> dict:
+    """Client arguments for ChatOpenAI / OpenAIEmbeddings."""
+    return {
+        "base_url": settings.OPENAI_BASE_URL,
+        "http_async_client": get_llm_http_client(),
+        "timeout": llm_timeout(),
+        "max_retries": 0,  # ResilientTransport retries
+    }
@@ -4,9 +4,11 @@ from sqlalchemy.future import select
 from pydantic import BaseModel
 from app.db.session import get_db
 from app.models import User
-from app.utils.security import hash_password, verify_password
-from app.utils.jwt import create_access_token, decode_access_token
-from fastapi.security import OAuth2PasswordBearer
+from app.utils.jwt import create_access_token
+from app.auth.cache import Principal
+from app.auth.dependencies import get_current_user
+from app.auth.passwords import HasherBusy, password_hasher
+from app.auth.rate_limit import limit_auth_attempts
 
 router = APIRouter()
 
@@ -25,10 +27,18 @@ class LoginRequest(BaseModel):
     password: str
 
 
+def hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many sign-ins in progress, try again shortly",
+        headers={"Retry-After": "1"},
+    )
+
+
 # ======================
 # Endpoints
 # ======================
-@router.post("/register")
+@router.post("/register", dependencies=[Depends(limit_auth_attempts)])
 async def register(data: RegisterRequest, db: AsyncSession = Depends(get_db)):
     # Check if user exists
     result = await db.execute(select(User).where(User.email == data.email))
@@ -38,10 +48,14 @@ async def register(data: RegisterRequest, db: AsyncSession = Depends(get_db)):
             status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered"
         )
 
-    # Hash password and create user
+    # Hash password (off the event loop) and create user
+    try:
+        hashed_password = await password_hasher.hash(data.password)
+    except HasherBusy:
+        raise hasher_busy()
     new_user = User(
         email=data.email,
-        hashed_password=hash_password(data.password),
+        hashed_password=hashed_password,
         full_name=data.full_name,
     )
     db.add(new_user)
@@ -49,39 +63,41 @@ async def register(data: RegisterRequest, db: AsyncSession = Depends(get_db)):
     return {"message": "User registered successfully"}
 
 
-@router.post("/login")
+@router.post("/login", dependencies=[Depends(limit_auth_attempts)])
 async def login(data: LoginRequest, db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(User).where(User.email == data.email))
     user = result.scalar_one_or_none()
-    if not user or not verify_password(data.password, user.hashed_password):
+    # Return the connection to the pool while bcrypt runs
+    await db.commit()
+    if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials"
         )
 
-    token = create_access_token({"sub": user.email})
-    return {"access_token": token, "token_type": "bearer"}
+    try:
+        valid, new_hash = await password_hasher.verify_and_update(
+            data.password, user.hashed_password
+        )
+    except HasherBusy:
+        raise hasher_busy()
+    if not valid:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials"
+        )
 
+    # Hash was made at an older work factor; store it at the current one
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
 
-# Auth middleware
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/login")
+    token = create_access_token({"sub": user.email, "uid": user.id})
+    return {"access_token": token, "token_type": "bearer"}
 
 
 @router.get("/me")
-async def read_me(
-    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)
-):
-    payload = decode_access_token(token)
-    if not payload:
-        raise HTTPException(status_code=401, detail="Invalid token")
-
-    email = payload.get("sub")
-    result = await db.execute(select(User).where(User.email == email))
-    user = result.scalar_one_or_none()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
+async def read_me(current_user: Principal = Depends(get_current_user)):
     return {
-        "email": user.email,
-        "full_name": user.full_name,
-        "created_at": user.created_at,
+        "email": current_user.email,
+        "full_name": current_user.full_name,
+        "created_at": current_user.created_at,
     }
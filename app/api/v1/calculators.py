@@ -0,0 +1,83 @@
+import json
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel
+from typing import Dict, List, Union
+from app.auth.cache import Principal
+from app.auth.dependencies import get_current_user
+from app.services.scenarios import CALCULATORS, expand_range, run_batch, to_lists
+
+router = APIRouter()
+
+
+# ======================
+# Schemas
+# ======================
+class RangeSpec(BaseModel):
+    start: float
+    stop: float  # inclusive
+    step: float
+
+
+class BatchRequest(BaseModel):
+    # Each parameter is a list of values or an inclusive range
+    grid: Dict[str, Union[List[float], RangeSpec]]
+
+
+# ======================
+# Endpoints
+# ======================
+@router.get("/")
+async def list_calculators():
+    return {name: calc.params for name, calc in CALCULATORS.items()}
+
+
+@router.post("/{name}/batch")
+async def batch_calculate(
+    name: str,
+    request: BatchRequest,
+    current_user: Principal = Depends(get_current_user),
+):
+    """
+    Evaluate a calculator over every combination of the grid values.
+
+    The response is columnar: {"calculator", "count", "axes", "columns"}.
+    axes holds each parameter's values in the calculator's parameter order;
+    columns holds one list per output, with points in row-major order over
+    the axes (the last parameter varies fastest).
+    """
+    if name not in CALCULATORS:
+        raise HTTPException(status_code=404, detail="Calculator not found")
+
+    try:
+        grid = {
+            param: (
+                expand_range(values.start, values.stop, values.step)
+                if isinstance(values, RangeSpec)
+                else values
+            )
+            for param, values in request.grid.items()
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    params = CALCULATORS[name].params
+
+    def compute() -> str:
+        columns = run_batch(name, grid)
+        outputs = {k: v for k, v in columns.items() if k not in params}
+        return json.dumps(
+            {
+                "calculator": name,
+                "count": len(columns[params[0]]),
+                "axes": to_lists({p: grid[p] for p in params}),
+                "columns": to_lists(outputs),
+            }
+        )
+
+    # Large grids take long enough to matter; keep them off the event loop
+    try:
+        body = await run_in_threadpool(compute)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return Response(content=body, media_type="application/json")
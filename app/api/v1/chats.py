@@ -1,13 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.db import pagination
+from app.core.config import settings
 from app.db.session import get_db
+from app.auth.cache import Principal
 from app.auth.dependencies import get_current_user
-from app.models import User, Chat, Message
+from app.models import Chat, Message
+from app.services.message_writer import message_writer, new_message
+from sqlalchemy import func, insert
 from sqlalchemy.future import select
 from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import List
+from typing import List, Literal, Optional
 
 # Pydantic schemas for API responses
 class ChatResponse(BaseModel):
@@ -29,26 +34,52 @@ class MessageResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class ChatPage(BaseModel):
+    items: List[ChatResponse]  # newest first
+    next_cursor: Optional[str] = None  # pass as cursor for older chats
+
+
+class MessagePage(BaseModel):
+    items: List[MessageResponse]  # oldest first
+    before_cursor: Optional[str] = None  # pass as before for older messages
+    since_cursor: Optional[str] = None  # pass as since to poll for new messages
+
+
 class CreateChatRequest(BaseModel):
     title: str
 
 router = APIRouter()
 
-# Try writing a simple GET /chats endpoint that returns the current user's chats
-@router.get("/", response_model=List[ChatResponse])
+def invalid_cursor() -> HTTPException:
+    return HTTPException(status_code=400, detail="Invalid cursor")
+
+
+# Returns the current user's chats, newest first, one page at a time
+@router.get("/", response_model=ChatPage)
 async def get_user_chats(
-    current_user: User = Depends(get_current_user),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    chats = await db.execute(
-        select(Chat).filter(Chat.user_id == current_user.id)
+    query = select(Chat).filter(Chat.user_id == current_user.id)
+    if cursor:
+        try:
+            query = query.filter(pagination.before(Chat, cursor))
+        except ValueError:
+            raise invalid_cursor()
+    result = await db.execute(
+        query.order_by(Chat.created_at.desc(), Chat.id.desc()).limit(limit + 1)
     )
-    return chats.scalars().all()
+    chats = result.scalars().all()
+
+    next_cursor = pagination.cursor_of(chats[limit - 1]) if len(chats) > limit else None
+    return {"items": chats[:limit], "next_cursor": next_cursor}
 # Try writing a simple POST /chats endpoint that creates a new chat for the current user
 @router.post("/", response_model=ChatResponse)
 async def create_chat(
     request: CreateChatRequest,  # Changed this
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     # Need to generate a unique thread_id and create Chat object
@@ -65,26 +96,63 @@ async def create_chat(
     await db.refresh(new_chat)
     return new_chat
 
-# Try writing a simple GET /chats/{chat_id}/messages endpoint that returns messages for a chat
-@router.get("/{chat_id}/messages", response_model=List[MessageResponse])
+# Returns a page of a chat's messages in chronological order:
+# - default: the latest `limit` messages
+# - before=<cursor>: the `limit` messages preceding the cursor
+# - since=<cursor>: messages after the cursor (poll with since_cursor)
+@router.get("/{chat_id}/messages", response_model=MessagePage)
 async def get_chat_messages(
     chat_id: int,
-    current_user: User = Depends(get_current_user),
+    limit: int = Query(50, ge=1, le=500),
+    before: Optional[str] = None,
+    since: Optional[str] = None,
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
+    if before and since:
+        raise HTTPException(status_code=400, detail="Use either before or since")
+
     # First check if chat belongs to user
     chat = await db.get(Chat, chat_id)
     if not chat or chat.user_id != current_user.id:
         raise HTTPException(status_code=404, detail="Chat not found")
-    
-    messages = await db.execute(
-        select(Message).filter(Message.chat_id == chat_id)
-    )
-    return messages.scalars().all()
+
+    # Make messages still queued for write-behind visible to this read
+    await message_writer.flush_chat(chat_id)
+
+    query = select(Message).filter(Message.chat_id == chat_id)
+    try:
+        if since:
+            query = query.filter(pagination.after(Message, since)).order_by(
+                Message.created_at, Message.id
+            )
+        else:
+            if before:
+                query = query.filter(pagination.before(Message, before))
+            query = query.order_by(Message.created_at.desc(), Message.id.desc())
+    except ValueError:
+        raise invalid_cursor()
+    result = await db.execute(query.limit(limit + 1))
+    messages = result.scalars().all()
+
+    if since:
+        messages = messages[:limit]
+        has_older = True
+    else:
+        has_older = len(messages) > limit
+        messages = messages[:limit][::-1]
+
+    return {
+        "items": messages,
+        "before_cursor": (
+            pagination.cursor_of(messages[0]) if messages and has_older else None
+        ),
+        "since_cursor": pagination.cursor_of(messages[-1]) if messages else since,
+    }
 @router.delete("/{chat_id}", response_model=dict)
 async def delete_chat(
     chat_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     chat = await db.get(Chat, chat_id)
@@ -93,15 +161,21 @@ async def delete_chat(
     await db.delete(chat)
     await db.commit()
     return {"detail": "Chat deleted"}
+# Fits messages.role (String(50)); "tool" is a recorded tool call
+MessageRole = Literal["user", "assistant", "system", "tool"]
+
+
 class SaveMessageRequest(BaseModel):
-    role: str
-    content: str
+    role: MessageRole
+    content: str = Field(max_length=settings.MESSAGE_MAX_CHARS)
+    # Retries with the same key save the message once
+    idempotency_key: Optional[str] = Field(None, max_length=64)
 
 @router.post("/{chat_id}/messages")
 async def save_message(
     chat_id: int,
     request: SaveMessageRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     # Verify chat belongs to user
@@ -109,12 +183,71 @@ async def save_message(
     if not chat or chat.user_id != current_user.id:
         raise HTTPException(status_code=404, detail="Chat not found")
     
-    # Create and save message
-    new_message = Message(
-        chat_id=chat_id,
-        role=request.role,
-        content=request.content
+    # Queue the message; it is written in the background (see message_writer)
+    await message_writer.enqueue(
+        [new_message(chat_id, request.role, request.content, request.idempotency_key)]
     )
-    db.add(new_message)
-    await db.commit()
     return {"message": "Message saved"}
+
+
+class BulkMessage(BaseModel):
+    chat_id: int
+    role: MessageRole
+    content: str = Field(max_length=settings.MESSAGE_MAX_CHARS)
+    created_at: Optional[datetime] = None  # keep original timestamps on import
+
+
+class BulkMessagesRequest(BaseModel):
+    messages: List[BulkMessage]
+
+
+@router.post("/messages/bulk")
+async def save_messages_bulk(
+    request: BulkMessagesRequest,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Save many messages, across one or more chats, in one request.
+
+    All chats are ownership-checked in a single query and the messages are
+    written in one transaction, as multi-row INSERTs of up to
+    BULK_INSERT_BATCH_SIZE rows. Either every message is saved or none is.
+    """
+    if len(request.messages) > settings.BULK_MESSAGES_MAX:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.BULK_MESSAGES_MAX} messages per request",
+        )
+    if not request.messages:
+        return {"saved": 0, "chats": {}}
+
+    # Verify every chat belongs to user
+    chat_ids = {m.chat_id for m in request.messages}
+    owned = await db.execute(
+        select(Chat.id).filter(Chat.id.in_(chat_ids), Chat.user_id == current_user.id)
+    )
+    missing = chat_ids - set(owned.scalars().all())
+    if missing:
+        raise HTTPException(
+            status_code=404, detail=f"Chat not found: {sorted(missing)}"
+        )
+
+    rows = [
+        {
+            "chat_id": m.chat_id,
+            "role": m.role,
+            "content": m.content,
+            "created_at": m.created_at or func.now(),
+        }
+        for m in request.messages
+    ]
+    batch = settings.BULK_INSERT_BATCH_SIZE
+    for start in range(0, len(rows), batch):
+        await db.execute(insert(Message).values(rows[start : start + batch]))
+    await db.commit()
+
+    counts = {}
+    for m in request.messages:
+        counts[m.chat_id] = counts.get(m.chat_id, 0) + 1
+    return {"saved": len(rows), "chats": counts}
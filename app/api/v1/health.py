@@ -1,4 +1,6 @@
 from fastapi import APIRouter
+from app.db.engine import pool_status
+from app.db.session import engine
 
 router = APIRouter()
 
@@ -6,3 +8,9 @@ router = APIRouter()
 @router.get("/")
 async def health():
     return {"status": "ok"}
+
+
+@router.get("/db")
+async def db_pool_health():
+    """Connection pool occupancy and checkout wait metrics for this worker."""
+    return pool_status(engine)
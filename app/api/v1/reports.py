@@ -1,35 +1,98 @@
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import StreamingResponse
-from sqlalchemy.ext.asyncio import AsyncSession
-from app.db.session import get_db
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import FileResponse
+from app.auth.cache import Principal
 from app.auth.dependencies import get_current_user
-from app.models import User
-from app.services.pdf_generator import generate_financial_report
-import io
+from app.core.logging import logger
+from app.db.session import get_db
+from app.services.insights import (
+    has_new_messages,
+    load_user_insights,
+    prepare_report_inputs,
+    report_inputs,
+)
+from app.services.report_jobs import report_jobs
+from sqlalchemy.ext.asyncio import AsyncSession
+import os
 
 router = APIRouter()
 
-@router.post("/generate")
+
+def job_response(job: dict) -> dict:
+    response = {"job_id": job["id"], "status": job["status"]}
+    if job["status"] == "done":
+        response["download_url"] = f"/api/v1/reports/jobs/{job['id']}/download"
+    return response
+
+
+async def get_user_job(job_id: str, current_user: Principal) -> dict:
+    job = await report_jobs.get(job_id)
+    if not job or job["user_id"] != current_user.id:
+        raise HTTPException(status_code=404, detail="Report job not found")
+    return job
+
+
+@router.post("/generate", status_code=status.HTTP_202_ACCEPTED)
 async def generate_report(
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
 ):
-    """Generate a PDF financial report for the current user."""
-    
-    # Gather user data (you can expand this with actual financial data from your database)
-    user_data = {
-        "name": current_user.full_name,
-        "email": current_user.email,
-        "monthly_income": 0,  # You'll replace this with real data later
-        "monthly_expenses": 0,
-    }
-    
-    # Generate the PDF
-    pdf_content = generate_financial_report(user_data, "Sample chat summary")
-    
-    # Return the PDF as a downloadable file
-    return StreamingResponse(
-        io.BytesIO(pdf_content),
+    """
+    Start generating a PDF financial report for the current user.
+
+    Returns a job id; poll GET /reports/jobs/{job_id} until status is
+    "done", then download the PDF. An unchanged report is served from
+    cache and comes back already done.
+    """
+    user = {"name": current_user.full_name, "email": current_user.email}
+    if await has_new_messages(db, current_user.id):
+        # Summarizing the new messages takes LLM calls; the job does it
+        job = await report_jobs.submit_later(
+            current_user.id, lambda: prepare_report_inputs(current_user.id, user)
+        )
+    else:
+        user_data, chat_summary = report_inputs(
+            user, await load_user_insights(db, current_user.id)
+        )
+        job = await report_jobs.submit(current_user.id, user_data, chat_summary)
+    return job_response(job)
+
+
+@router.get("/jobs/{job_id}")
+async def get_report_job(
+    job_id: str, current_user: Principal = Depends(get_current_user)
+):
+    return job_response(await get_user_job(job_id, current_user))
+
+
+@router.get("/jobs/{job_id}/download")
+async def download_report(
+    job_id: str,
+    request: Request,
+    current_user: Principal = Depends(get_current_user),
+):
+    """Download a finished report; supports If-None-Match (ETag is the content hash)."""
+    job = await get_user_job(job_id, current_user)
+    if job["status"] != "done":
+        raise HTTPException(status_code=409, detail=f"Report is {job['status']}")
+
+    etag = f'"{job["hash"]}"'
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+        )
+
+    path = report_jobs.path_for(job["hash"])
+    if not os.path.exists(path):
+        if job.get("host", report_jobs.host) != report_jobs.host:
+            logger.warning(
+                "Report rendered on another host; REPORT_CACHE_DIR must be shared",
+                job_id=job_id,
+                rendered_on=job["host"],
+            )
+        raise HTTPException(status_code=410, detail="Report expired; generate it again")
+    return FileResponse(
+        path,
         media_type="application/pdf",
-        headers={"Content-Disposition": "attachment; filename=financial_report.pdf"}
-    )
\ No newline at end of file
+        filename="financial_report.pdf",
+        headers={"ETag": etag, "Cache-Control": "private, max-age=0, must-revalidate"},
+    )
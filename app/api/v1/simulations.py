@@ -0,0 +1,62 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from pydantic import Field
+from typing import Annotated, Dict, Optional
+from app.auth.cache import Principal
+from app.auth.dependencies import get_current_user
+from app.core.config import settings
+from app.services import monte_carlo
+
+router = APIRouter()
+
+
+# ======================
+# Schemas
+# ======================
+# Bounds keep every balance finite (and the response valid JSON)
+class MonteCarloRequest(monte_carlo.SimulationInputs):
+    # Either a return/volatility pair or an allocation like {"stocks": 60, "bonds": 40}
+    allocations: Optional[Dict[str, Annotated[float, Field(ge=0)]]] = None
+    paths: int = Field(10_000, gt=0, le=settings.MONTE_CARLO_MAX_PATHS)
+    seed: Optional[int] = None
+
+
+# ======================
+# Endpoints
+# ======================
+@router.post("/monte-carlo")
+async def run_monte_carlo(
+    request: MonteCarloRequest,
+    current_user: Principal = Depends(get_current_user),
+):
+    """
+    Simulate ending balances over many random return paths.
+
+    Returns success probability (when a target is given), mean and
+    percentile outcomes. Pass a seed for reproducible results; above
+    MONTE_CARLO_EXACT_MAX_PATHS percentiles are estimated in streaming mode.
+    """
+    annual_return, volatility = request.annual_return, request.volatility
+    if request.allocations:
+        if sum(request.allocations.values()) <= 0:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Allocations must add up to a positive total",
+            )
+        annual_return, volatility = monte_carlo.portfolio_assumptions(
+            request.allocations
+        )
+
+    # CPU-bound; keep it off the event loop
+    result = await run_in_threadpool(
+        monte_carlo.simulate,
+        request.current_savings,
+        request.monthly_contribution,
+        request.years,
+        annual_return,
+        volatility,
+        paths=request.paths,
+        target=request.target,
+        seed=request.seed,
+    )
+    return {"annual_return": annual_return, "volatility": volatility, **result}
@@ -0,0 +1,164 @@
+import asyncio
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.redis import redis_client
+from app.db.session import AsyncSessionLocal
+from app.models import User
+
+
+class Principal(BaseModel):
+    """The authenticated user as seen by request handlers."""
+
+    id: int
+    email: str
+    full_name: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            full_name=user.full_name,
+            created_at=user.created_at,
+        )
+
+
+class UserCache:
+    """
+    Two-tier cache of user records keyed by user id.
+
+    Lookups go to an in-process LRU (short TTL, so other workers' changes
+    show up quickly), then Redis, then the database by primary key.
+    Committed updates/deletes of a User invalidate both tiers (see the
+    session events below). Redis failures are logged and fall through to
+    the database.
+    """
+
+    def __init__(
+        self,
+        client=None,
+        prefix: str = "auth:user",
+        ttl: int | None = None,
+        local_ttl: float | None = None,
+        local_max_entries: int | None = None,
+    ):
+        self.client = client or redis_client
+        self.prefix = prefix
+        self.ttl = ttl if ttl is not None else settings.AUTH_CACHE_TTL_SECONDS
+        self.local_ttl = (
+            local_ttl
+            if local_ttl is not None
+            else settings.AUTH_CACHE_LOCAL_TTL_SECONDS
+        )
+        self.local_max_entries = (
+            local_max_entries
+            if local_max_entries is not None
+            else settings.AUTH_CACHE_LOCAL_MAX_ENTRIES
+        )
+        self._local: OrderedDict[int, tuple[float, Principal]] = OrderedDict()
+
+    def _key(self, user_id: int) -> str:
+        return f"{self.prefix}:{user_id}"
+
+    def _get_local(self, user_id: int) -> Optional[Principal]:
+        entry = self._local.get(user_id)
+        if entry is None:
+            return None
+        expires, principal = entry
+        if expires < time.monotonic():
+            del self._local[user_id]
+            return None
+        self._local.move_to_end(user_id)
+        return principal
+
+    def _set_local(self, principal: Principal):
+        self._local[principal.id] = (time.monotonic() + self.local_ttl, principal)
+        self._local.move_to_end(principal.id)
+        while len(self._local) > self.local_max_entries:
+            self._local.popitem(last=False)
+
+    async def get(self, user_id: int) -> Optional[Principal]:
+        """Return the user's principal, or None if the user doesn't exist."""
+        principal = self._get_local(user_id)
+        if principal is not None:
+            return principal
+
+        try:
+            raw = await self.client.get(self._key(user_id))
+            if raw is not None:
+                principal = Principal.model_validate_json(raw)
+        except Exception as e:
+            logger.warning("User cache lookup failed", error=str(e))
+
+        if principal is None:
+            async with AsyncSessionLocal() as db:
+                user = await db.get(User, user_id)
+            if user is None:
+                return None
+            principal = Principal.from_user(user)
+            try:
+                await self.client.set(
+                    self._key(user_id), principal.model_dump_json(), ex=self.ttl
+                )
+            except Exception as e:
+                logger.warning("User cache store failed", error=str(e))
+
+        self._set_local(principal)
+        return principal
+
+    def forget_local(self, user_id: int):
+        self._local.pop(user_id, None)
+
+    async def invalidate(self, user_id: int):
+        """Drop a user from both tiers (other workers' LRUs expire on their own)."""
+        self.forget_local(user_id)
+        try:
+            await self.client.delete(self._key(user_id))
+        except Exception as e:
+            logger.warning("User cache invalidation failed", error=str(e))
+
+
+user_cache = UserCache()
+_pending_invalidations: set = set()
+
+
+# Invalidate cached users when their rows change. Changed ids are collected
+# at flush and dropped once the transaction commits.
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _collect_changed_user(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("changed_user_ids", set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session):
+    user_ids = session.info.pop("changed_user_ids", None)
+    if not user_ids:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    for user_id in user_ids:
+        user_cache.forget_local(user_id)
+        if loop is not None:
+            task = loop.create_task(user_cache.invalidate(user_id))
+            _pending_invalidations.add(task)
+            task.add_done_callback(_pending_invalidations.discard)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_users(session):
+    session.info.pop("changed_user_ids", None)
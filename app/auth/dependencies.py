@@ -1,17 +1,26 @@
+from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from app.db.session import get_db
+from app.auth.cache import Principal, user_cache
+from app.db.session import AsyncSessionLocal
 from app.models import User
 from app.utils.jwt import decode_access_token
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(
+    tokenUrl="/api/v1/auth/login", auto_error=False
+)
 
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)
-):
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> Principal:
+    """
+    Resolve the bearer token to the current user.
+
+    Tokens carry the user id ("uid"), so the user is read from the user
+    cache without touching the database on most requests. Tokens issued
+    before the id was embedded are looked up by email.
+    """
     payload = decode_access_token(token)
     if not payload:
         raise HTTPException(
@@ -24,11 +33,30 @@ async def get_current_user(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload"
         )
 
-    result = await db.execute(select(User).where(User.email == email))
-    user = result.scalar_one_or_none()
+    user_id = payload.get("uid")
+    if user_id is not None:
+        user = await user_cache.get(user_id)
+        # The email claim guards against a token outliving its user id
+        if user is not None and user.email != email:
+            user = None
+    else:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(User).where(User.email == email))
+            record = result.scalar_one_or_none()
+        user = Principal.from_user(record) if record else None
+
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
         )
 
     return user
+
+
+async def get_optional_user(
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+) -> Optional[Principal]:
+    """The current user if a bearer token was sent, else None (anonymous)."""
+    if token is None:
+        return None
+    return await get_current_user(token)
@@ -0,0 +1,59 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from app.core.config import settings
+from app.utils.security import hash_password, needs_rehash, verify_password
+
+
+class HasherBusy(Exception):
+    """Raised when too many hashes are already queued or running."""
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt off the event loop on a bounded thread pool.
+
+    bcrypt releases the GIL while hashing, so `workers` threads hash in
+    parallel. At most `max_pending` hashes may be queued or running; beyond
+    that calls fail fast with HasherBusy instead of queueing without bound.
+    """
+
+    def __init__(self, workers: int | None = None, max_pending: int | None = None):
+        self.workers = workers or settings.PASSWORD_HASH_WORKERS
+        self.max_pending = max_pending or settings.PASSWORD_HASH_MAX_PENDING
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="password-hash"
+        )
+        self.pending = 0
+
+    async def _run(self, fn, *args):
+        if self.pending >= self.max_pending:
+            raise HasherBusy()
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, fn, *args)
+        finally:
+            self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, password, hashed_password)
+
+    async def verify_and_update(
+        self, password: str, hashed_password: str
+    ) -> tuple[bool, str | None]:
+        """
+        Verify a password; if it matches a hash at an outdated cost, also
+        return a new hash at the configured cost (else None).
+        """
+        if not await self.verify(password, hashed_password):
+            return False, None
+        if needs_rehash(hashed_password):
+            return True, await self.hash(password)
+        return True, None
+
+
+password_hasher = PasswordHasher()
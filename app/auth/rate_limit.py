@@ -0,0 +1,82 @@
+import math
+import time
+
+from fastapi import HTTPException, Request, status
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.redis import redis_client
+
+
+async def check_rate_limit(key: str, limit: int, window: int = 60, client=None):
+    """
+    Sliding-window rate limit: at most `limit` hits per `window` seconds.
+
+    Uses the sliding window counter approximation: the previous fixed
+    window's count, weighted by how much of it still overlaps the sliding
+    window, plus the current window's count. Two Redis keys per client, and
+    no burst of 2x the limit across a window boundary.
+
+    Raises 429 with Retry-After once the limit is exceeded; rejected hits
+    aren't counted. If Redis is unavailable the request is allowed (and the
+    failure logged).
+    """
+    client = client or redis_client
+    now = time.time()
+    window_start = int(now) - int(now) % window
+    current_key = f"rate_limit:{key}:{window_start}"
+    previous_key = f"rate_limit:{key}:{window_start - window}"
+    try:
+        async with client.pipeline(transaction=False) as pipe:
+            pipe.incr(current_key)
+            pipe.expire(current_key, 2 * window)
+            pipe.get(previous_key)
+            current, _, previous = await pipe.execute()
+        previous = int(previous or 0)
+        elapsed = now - window_start
+        weighted = previous * (1 - elapsed / window) + current
+        if weighted > limit:
+            await client.decr(current_key)
+    except Exception as e:
+        logger.warning("Rate limit check failed", key=key, error=str(e))
+        return
+
+    if weighted > limit:
+        if current > limit or not previous:
+            retry_after = window - elapsed
+        else:
+            # Until the previous window's weight has decayed enough
+            retry_after = window * (1 - (limit - current) / previous) - elapsed
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests, try again later",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+
+async def limit_auth_attempts(request: Request):
+    """Dependency limiting login/register attempts per client IP."""
+    ip = request.client.host if request.client else "unknown"
+    await check_rate_limit(
+        f"auth:{ip}", settings.AUTH_RATE_LIMIT_PER_MINUTE, window=60
+    )
+
+
+async def limit_agent_requests(request: Request, principal=None):
+    """
+    Limit agent queries per user, or per client IP for anonymous callers.
+
+    Returns the key the caller is metered under (also used for token
+    budgets and fair queuing).
+    """
+    key = client_key(request, principal)
+    await check_rate_limit(
+        f"agent:{key}", settings.AGENT_RATE_LIMIT_PER_MINUTE, window=60
+    )
+    return key
+
+
+def client_key(request: Request, principal=None) -> str:
+    if principal is not None:
+        return f"user:{principal.id}"
+    return f"ip:{request.client.host if request.client else 'unknown'}"
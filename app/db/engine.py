@@ -0,0 +1,189 @@
+"""
+Async engine factory driven by Settings.
+
+Pool sizing, recycling, pre-ping and the statement timeout come from
+DB_* settings. Instead of echoing every statement, only statements slower
+than DB_SLOW_QUERY_MS are logged (DB_ECHO=true restores full echo for
+debugging). Pool checkouts are metered so pool pressure is visible at
+/api/v1/health/db.
+"""
+import time
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.config import settings
+from app.core.logging import logger
+
+
+class PoolMetrics:
+    """Counters for connection checkouts, waits and pool churn."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.waits = 0  # checkouts that found no idle connection
+        self.connects = 0
+        self.invalidations = 0
+        self.checked_out = 0
+        self.checked_out_peak = 0
+
+    def record_wait(self, seconds: float, waited: bool):
+        self.checkouts += 1
+        self.wait_seconds_total += seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+        if waited:
+            self.waits += 1
+
+    def snapshot(self) -> dict:
+        return {
+            "checkouts": self.checkouts,
+            "checkouts_waited": self.waits,
+            "wait_ms_avg": round(
+                self.wait_seconds_total / self.checkouts * 1000, 3
+            ) if self.checkouts else 0.0,
+            "wait_ms_max": round(self.wait_seconds_max * 1000, 3),
+            "connects": self.connects,
+            "invalidations": self.invalidations,
+            "checked_out": self.checked_out,
+            "checked_out_peak": self.checked_out_peak,
+        }
+
+
+class MeteredQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that times how long each checkout waits for a connection."""
+
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        idle = self.checkedin() > 0
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.metrics.record_wait(time.perf_counter() - start, not idle)
+
+    def recreate(self):
+        pool = super().recreate()  # e.g. on engine.dispose()
+        pool.metrics = self.metrics
+        return pool
+
+
+def _install_pool_events(engine: AsyncEngine, metrics: PoolMetrics):
+    pool = engine.sync_engine.pool
+
+    @event.listens_for(pool, "connect")
+    def on_connect(dbapi_conn, record):
+        metrics.connects += 1
+
+    @event.listens_for(pool, "checkout")
+    def on_checkout(dbapi_conn, record, proxy):
+        metrics.checked_out += 1
+        metrics.checked_out_peak = max(metrics.checked_out_peak, metrics.checked_out)
+
+    @event.listens_for(pool, "checkin")
+    def on_checkin(dbapi_conn, record):
+        metrics.checked_out = max(metrics.checked_out - 1, 0)
+
+    @event.listens_for(pool, "invalidate")
+    def on_invalidate(dbapi_conn, record, exception):
+        metrics.invalidations += 1
+
+
+def _install_slow_query_log(engine: AsyncEngine, threshold_ms: float):
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after(conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - conn.info["query_start"].pop()) * 1000
+        if elapsed_ms >= threshold_ms:
+            logger.warning(
+                "Slow query",
+                duration_ms=round(elapsed_ms, 1),
+                statement=statement[:500],
+            )
+
+
+def _install_statement_timeout(engine: AsyncEngine, backend: str, timeout_ms: int):
+    if backend != "mysql":
+        return  # postgres gets it via connect_args; sqlite has no equivalent
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def set_timeout(dbapi_conn, record):
+        cursor = dbapi_conn.cursor()
+        # Applies to read-only SELECTs, the only statements MySQL can time out
+        cursor.execute(f"SET SESSION max_execution_time = {int(timeout_ms)}")
+        cursor.close()
+
+
+def build_engine(url: Optional[str] = None, **overrides) -> AsyncEngine:
+    """
+    Create the async engine from settings.
+
+    Args:
+        url: Database URL (defaults to settings.DB_URI)
+        **overrides: Setting values to use instead of the DB_* settings,
+            by lowercase name without the prefix (e.g. pool_size=5, echo=True)
+
+    The engine's PoolMetrics are available as engine.sync_engine.pool_metrics.
+    """
+    def option(name):
+        return overrides.get(name, getattr(settings, f"DB_{name.upper()}"))
+
+    url = make_url(url or settings.DB_URI)
+    backend = url.get_backend_name()
+    kwargs = {"echo": option("echo"), "pool_pre_ping": option("pool_pre_ping")}
+
+    # In-memory SQLite uses a single static connection; nothing to size
+    pooled = not (backend == "sqlite" and url.database in (None, "", ":memory:"))
+    if pooled:
+        kwargs.update(
+            poolclass=MeteredQueuePool,
+            pool_size=option("pool_size"),
+            max_overflow=option("max_overflow"),
+            pool_timeout=option("pool_timeout"),
+            pool_recycle=option("pool_recycle"),
+        )
+
+    timeout_ms = option("statement_timeout_ms")
+    if timeout_ms and backend == "postgresql":
+        kwargs["connect_args"] = {
+            "server_settings": {"statement_timeout": str(int(timeout_ms))}
+        }
+
+    engine = create_async_engine(url, **kwargs)
+
+    metrics = PoolMetrics()
+    if pooled:
+        engine.sync_engine.pool.metrics = metrics
+    _install_pool_events(engine, metrics)
+    engine.sync_engine.pool_metrics = metrics
+
+    slow_ms = option("slow_query_ms")
+    if slow_ms and not kwargs["echo"]:
+        _install_slow_query_log(engine, slow_ms)
+    if timeout_ms:
+        _install_statement_timeout(engine, backend, timeout_ms)
+    return engine
+
+
+def pool_status(engine: AsyncEngine) -> dict:
+    """Current pool occupancy plus the engine's checkout metrics."""
+    pool = engine.sync_engine.pool
+    status = {"pool": type(pool).__name__}
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        status.update(
+            size=pool.size(),
+            idle=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+        )
+    status.update(engine.sync_engine.pool_metrics.snapshot())
+    return status
@@ -0,0 +1,49 @@
+"""
+Keyset (cursor) pagination over (created_at, id).
+
+A cursor is an opaque token for one row's position. Pages are fetched
+with `WHERE (created_at, id) > / < cursor ORDER BY created_at, id LIMIT n`,
+which the (parent_id, created_at, id) indexes answer without scanning or
+skipping rows, however deep the page.
+"""
+import base64
+from datetime import datetime
+
+from sqlalchemy import and_, or_
+
+
+def encode_cursor(created_at: datetime, id: int) -> str:
+    raw = f"{created_at.isoformat()}|{id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Raises ValueError for a malformed cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id = base64.urlsafe_b64decode(padded).decode().split("|")
+        return datetime.fromisoformat(created_at), int(id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def after(model, cursor: str):
+    """Filter for rows positioned after the cursor."""
+    created_at, id = decode_cursor(cursor)
+    return or_(
+        model.created_at > created_at,
+        and_(model.created_at == created_at, model.id > id),
+    )
+
+
+def before(model, cursor: str):
+    """Filter for rows positioned before the cursor."""
+    created_at, id = decode_cursor(cursor)
+    return or_(
+        model.created_at < created_at,
+        and_(model.created_at == created_at, model.id < id),
+    )
+
+
+def cursor_of(row) -> str:
+    return encode_cursor(row.created_at, row.id)
@@ -1,8 +1,9 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import sessionmaker
-from app.core.config import settings
+from app.db.engine import build_engine
 
-engine = create_async_engine(settings.DB_URI, echo=True, future=True)
+# Pool size, timeouts and logging come from the DB_* settings
+engine = build_engine()
 AsyncSessionLocal = sessionmaker(
     bind=engine, class_=AsyncSession, expire_on_commit=False
 )
@@ -1,13 +1,39 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from app.api.v1.router import router as v1_router
 from app.core.logging import setup_logging, logger
 from app.core.config import settings
 from app.agents.router import router as agent_router
+from app.services.message_writer import message_writer
+from app.services.report_jobs import report_jobs
+from app.services.monte_carlo import shutdown_pools as shutdown_simulation_pools
+from app.agents.tool_pool import shutdown_tool_pool
+from app.agents.transport import close_llm_http_client
 
 # Setup logging
 setup_logging()
 
-app = FastAPI(title="Financial AI Agents API", version="0.0.1")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Background writer for queued chat messages; flushed on shutdown
+    await message_writer.start()
+    if settings.AGENT_WARM_UP:
+        # Imported here: the agent (LangChain, OpenAI, LangGraph) is only
+        # loaded by workers that serve it, see app.agents.agent
+        from app.agents.agent import warm_up
+
+        warm_up()
+        logger.info("Agent ready")
+    yield
+    await message_writer.stop()
+    report_jobs.shutdown()
+    shutdown_tool_pool()
+    shutdown_simulation_pools()
+    await close_llm_http_client()
+
+
+app = FastAPI(title="Financial AI Agents API", version="0.1.0", lifespan=lifespan)
 
 # Include the main v1 API router
 app.include_router(v1_router, prefix="/api/v1")
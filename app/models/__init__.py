@@ -1,5 +1,8 @@
 from sqlalchemy.orm import DeclarativeBase, relationship
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, func
+from sqlalchemy import (
+    Column, Integer, String, DateTime, Text, ForeignKey, Index, LargeBinary, func
+)
+from sqlalchemy.dialects import mysql
 
 
 class Base(DeclarativeBase):
@@ -32,6 +35,10 @@ class Chat(Base):
     # Relationships
     user = relationship("User", back_populates="chats")
     messages = relationship("Message", back_populates="chat", cascade="all, delete-orphan")
+    insight = relationship("ChatInsight", cascade="all, delete-orphan", uselist=False)
+
+    # Keyset pagination of a user's chats by (created_at, id)
+    __table_args__ = (Index("ix_chats_user_created_id", "user_id", "created_at", "id"),)
 
 
 class Message(Base):
@@ -39,9 +46,56 @@ class Message(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     chat_id = Column(Integer, ForeignKey("chats.id"), nullable=False)
-    role = Column(String(50), nullable=False)  # 'user' or 'assistant'
+    # 'user', 'assistant' or 'tool' (a recorded tool call)
+    role = Column(String(50), nullable=False)
     content = Column(Text, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Idempotency key for write-behind inserts
+    message_key = Column(String(64), unique=True, nullable=True)
     
     # Relationship
     chat = relationship("Chat", back_populates="messages")
+
+    # Keyset pagination of a chat's messages by (created_at, id)
+    __table_args__ = (
+        Index("ix_messages_chat_created_id", "chat_id", "created_at", "id"),
+    )
+
+
+class ChatInsight(Base):
+    """Rolling summary and financial facts for a chat, kept up to date incrementally."""
+
+    __tablename__ = "chat_insights"
+
+    chat_id = Column(Integer, ForeignKey("chats.id"), primary_key=True)
+    summary = Column(Text, nullable=False, default="")
+    facts = Column(Text, nullable=False, default="{}")  # JSON object
+    # Highest message id folded into summary and facts
+    last_message_id = Column(Integer, nullable=False, default=0)
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+
+# Checkpoint records can exceed MySQL's 64KB BLOB limit
+CheckpointData = LargeBinary().with_variant(mysql.LONGBLOB(), "mysql")
+
+
+class AgentCheckpoint(Base):
+    __tablename__ = "agent_checkpoints"
+
+    thread_id = Column(String(255), primary_key=True)
+    checkpoint_ns = Column(String(255), primary_key=True, default="")
+    checkpoint_id = Column(String(64), primary_key=True)
+    data = Column(CheckpointData, nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+
+class AgentCheckpointWrite(Base):
+    __tablename__ = "agent_checkpoint_writes"
+
+    thread_id = Column(String(255), primary_key=True)
+    checkpoint_ns = Column(String(255), primary_key=True, default="")
+    checkpoint_id = Column(String(64), primary_key=True)
+    write_key = Column(String(128), primary_key=True)  # "task_id:idx"
+    data = Column(CheckpointData, nullable=False)
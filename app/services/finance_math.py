@@ -0,0 +1,127 @@
+"""
+Closed-form time-value-of-money formulas.
+
+Every function broadcasts over NumPy arrays, so the same call evaluates one
+scenario or a whole grid of them (see `scenario_grid`). Scalar inputs give
+Python floats back. Rates are annual percentages (5 means 5%) compounded
+monthly; terms are in years or months as named.
+"""
+import numpy as np
+
+
+def _out(value):
+    """Return Python scalars for scalar inputs, arrays otherwise."""
+    return value.item() if np.ndim(value) == 0 else value
+
+
+def monthly_rate(annual_rate):
+    return np.asarray(annual_rate, dtype=float) / 100 / 12
+
+
+def growth_factor(r, n):
+    """(1 + r) ** n, computed stably for small r."""
+    return np.exp(np.asarray(n, dtype=float) * np.log1p(r))
+
+
+def annuity_factor(r, n):
+    """Future value of 1 paid at the end of each of n periods."""
+    r = np.asarray(r, dtype=float)
+    n = np.asarray(n, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(r == 0, n, np.expm1(n * np.log1p(r)) / r)
+
+
+def future_value(
+    principal, monthly_contrib, annual_rate, years, contrib_at_start=False
+):
+    """
+    Value of a lump sum plus monthly contributions after `years`.
+
+    contrib_at_start: contributions are made at the start of each month
+        (annuity due) instead of the end.
+    """
+    r = monthly_rate(annual_rate)
+    n = np.asarray(years, dtype=float) * 12
+    contributions = np.asarray(monthly_contrib, dtype=float) * annuity_factor(r, n)
+    if contrib_at_start:
+        contributions = contributions * (1 + r)
+    principal = np.asarray(principal, dtype=float)
+    return _out(principal * growth_factor(r, n) + contributions)
+
+
+def loan_payment(principal, annual_rate, years):
+    """Level monthly payment that amortizes `principal` over `years`."""
+    r = monthly_rate(annual_rate)
+    n = np.asarray(years, dtype=float) * 12
+    principal = np.asarray(principal, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        payment = np.where(
+            r == 0, principal / n, principal * r / -np.expm1(-n * np.log1p(r))
+        )
+    return _out(payment)
+
+
+def remaining_balance(principal, annual_rate, payment, months):
+    """Loan balance after `months` level payments."""
+    r = monthly_rate(annual_rate)
+    return _out(
+        np.asarray(principal, dtype=float) * growth_factor(r, months)
+        - np.asarray(payment, dtype=float) * annuity_factor(r, months)
+    )
+
+
+def payoff_months(balance, annual_rate, payment):
+    """
+    Number of monthly payments needed to clear `balance` (the last one may be
+    partial). inf when the payment doesn't cover the monthly interest.
+    """
+    r = monthly_rate(annual_rate)
+    balance = np.asarray(balance, dtype=float)
+    payment = np.asarray(payment, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        exact = np.where(
+            r == 0,
+            balance / payment,
+            -np.log1p(-balance * r / payment) / np.log1p(r),
+        )
+        months = np.where(payment > balance * r, np.ceil(exact - 1e-9), np.inf)
+    return _out(np.maximum(months, 0))
+
+
+def payoff_totals(balance, annual_rate, payment):
+    """
+    Months to payoff, total paid and interest paid for a level payment.
+
+    Returns:
+        (months, total_paid, total_interest); inf where the payment doesn't
+        cover the monthly interest
+    """
+    r = monthly_rate(annual_rate)
+    balance = np.asarray(balance, dtype=float)
+    payment = np.asarray(payment, dtype=float)
+    months = np.asarray(payoff_months(balance, annual_rate, payment))
+    finite = np.isfinite(months)
+    whole = np.where(finite, np.maximum(months - 1, 0), 0)
+    # The final payment only covers what's left, plus that month's interest
+    final = (
+        balance * growth_factor(r, whole) - payment * annuity_factor(r, whole)
+    ) * (1 + r)
+    total_paid = np.where(finite, payment * whole + final, np.inf)
+    return _out(months), _out(total_paid), _out(total_paid - balance)
+
+
+def scenario_grid(**axes):
+    """
+    Cartesian product of parameter values as flat, equally long arrays.
+
+    Example:
+        grid = scenario_grid(balance=[10000], annual_rate=[5, 10, 15],
+                             payment=np.arange(200, 2001, 50))
+        months = payoff_months(**grid)
+    """
+    names = list(axes)
+    mesh = np.meshgrid(
+        *(np.atleast_1d(np.asarray(axes[name], dtype=float)) for name in names),
+        indexing="ij",
+    )
+    return {name: values.ravel() for name, values in zip(names, mesh)}
@@ -0,0 +1,328 @@
+"""
+Incremental chat insights for reports.
+
+Each chat keeps a rolling summary and a set of financial facts (income,
+expenses, debts, savings) in chat_insights, plus a watermark: the highest
+message id already folded in. A refresh reads only messages above the
+watermark, so keeping insights current costs O(new messages), not
+O(history).
+
+Facts come from the tool calls the agent made, stored as "tool" messages
+whose content is {"name": ..., "input": {...}, "result": {...}}: what the
+user stated from the input, computed figures (tax, projections, payments)
+from the structured result. The newest call wins. The summary is updated
+by the LLM from the new user and assistant messages.
+
+Summarizing takes LLM calls, so requests only check the watermarks
+(has_new_messages); the refresh itself runs in the report job
+(prepare_report_inputs), a few chats at a time.
+"""
+import asyncio
+import json
+from collections import defaultdict
+
+from langchain_core.messages import HumanMessage
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.agents.tool_results import parse_result
+from app.core.config import settings
+from app.core.logging import logger
+from app.db.session import AsyncSessionLocal
+from app.models import Chat, ChatInsight, Message
+from app.services.message_writer import message_writer
+
+
+def _pairs(text: str) -> dict:
+    """Parse "rent:1200,food:500" into {"rent": 1200.0, "food": 500.0}."""
+    pairs = {}
+    for item in text.split(","):
+        name, value = item.strip().split(":")
+        pairs[name.strip()] = float(value)
+    return pairs
+
+
+# Each extractor gets the call's arguments and its typed result (None for
+# calls recorded without one)
+
+
+def _budget(args: dict, result) -> dict:
+    expenses = _pairs(args["expenses"])
+    facts = {
+        "monthly_income": float(args["income"]),
+        "expenses": expenses,
+        "monthly_expenses": sum(expenses.values()),
+    }
+    if result is not None:
+        facts["savings_rate"] = result.savings_rate
+    return facts
+
+
+def _emergency_fund(args: dict, result) -> dict:
+    facts = {
+        "monthly_expenses": float(args["monthly_expenses"]),
+        "emergency_savings": float(args["current_savings"]),
+    }
+    if result is not None:
+        facts["emergency_target"] = result.target_amount
+    return facts
+
+
+def _tax(args: dict, result) -> dict:
+    facts = {
+        "annual_income": float(args["income"]),
+        "filing_status": args.get("filing_status", "single"),
+    }
+    if result is not None:
+        facts["federal_tax"] = result.federal_tax
+        facts["effective_tax_rate"] = result.effective_rate
+    return facts
+
+
+def _debt(args: dict, result) -> dict:
+    debt = {
+        "balance": float(args["debt_amount"]),
+        "interest_rate": float(args["interest_rate"]),
+    }
+    if result is not None:
+        payable = [s.months for s in result.strategies if s.months is not None]
+        if payable:
+            debt["payoff_months"] = min(payable)
+    return {"debts": {"debt": debt}}
+
+
+def _loan(args: dict, result) -> dict:
+    loan = {
+        "balance": float(args["principal"]),
+        "interest_rate": float(args["annual_rate"]),
+        "years": int(args["years"]),
+    }
+    if result is not None:
+        loan["monthly_payment"] = result.monthly_payment
+    return {"debts": {"loan": loan}}
+
+
+def _retirement(args: dict, result) -> dict:
+    facts = {
+        "age": int(args["current_age"]),
+        "retirement_age": int(args["retirement_age"]),
+        "retirement_savings": float(args["current_savings"]),
+        "retirement_contribution": float(args["monthly_contribution"]),
+    }
+    if result is not None:
+        facts["projected_retirement_savings"] = result.total_at_retirement
+        facts["projected_retirement_income"] = result.monthly_income
+    return facts
+
+
+def _portfolio(args: dict, result) -> dict:
+    facts = {"portfolio": _pairs(args["investments"])}
+    if result is not None:
+        facts["portfolio_risk"] = result.risk_level
+    return facts
+
+
+# Tool name -> function turning a call into facts
+FACT_EXTRACTORS = {
+    "budget_planner": _budget,
+    "emergency_fund_calculator": _emergency_fund,
+    "tax_calculator": _tax,
+    "debt_payoff_calculator": _debt,
+    "loan_payment_calculator": _loan,
+    "retirement_calculator": _retirement,
+    "portfolio_analyzer": _portfolio,
+}
+
+
+def extract_facts(content: str) -> dict:
+    """Facts stated by one recorded tool call; {} if it has none."""
+    try:
+        call = json.loads(content)
+        extractor = FACT_EXTRACTORS.get(call.get("name"))
+        if extractor is None:
+            return {}
+        result = parse_result(call["name"], call.get("result"))
+        return extractor(call.get("input") or {}, result)
+    except Exception:
+        # Malformed arguments: the tool itself rejected them too
+        return {}
+
+
+def merge_facts(facts: dict, new: dict) -> dict:
+    """Apply newer facts over older ones; debts are merged by kind."""
+    for key, value in new.items():
+        if key == "debts":
+            facts.setdefault("debts", {}).update(value)
+        else:
+            facts[key] = value
+    return facts
+
+
+def _summary_request(summary: str, messages: list) -> list:
+    # app.agents.context loads LangGraph; only summarizing needs it
+    from app.agents.context import SUMMARY_PROMPT
+
+    transcript = "\n".join(f"{m.role}: {m.content}" for m in messages)
+    return [
+        HumanMessage(
+            SUMMARY_PROMPT.format(summary=summary or "(none)", messages=transcript)
+        )
+    ]
+
+
+async def _summarize(summary: str, messages: list) -> str:
+    # Imported here so the facts helpers (and the API) don't load the agent
+    from app.agents.agent import get_llm
+
+    summarizer = get_llm().bind(max_tokens=settings.CONTEXT_SUMMARY_MAX_TOKENS)
+    batch = settings.INSIGHTS_SUMMARY_BATCH_SIZE
+    for start in range(0, len(messages), batch):
+        response = await summarizer.ainvoke(
+            _summary_request(summary, messages[start : start + batch])
+        )
+        summary = response.content
+    return summary
+
+
+async def _advance(insight: ChatInsight, messages: list):
+    """Fold messages (ordered by id) into the insight."""
+    facts = json.loads(insight.facts or "{}")
+    dialogue = []
+    for message in messages:
+        if message.role == "tool":
+            merge_facts(facts, extract_facts(message.content))
+        else:
+            dialogue.append(message)
+    if dialogue:
+        insight.summary = await _summarize(insight.summary or "", dialogue)
+    insight.facts = json.dumps(facts)
+    insight.last_message_id = messages[-1].id
+
+
+async def _chat_titles(db: AsyncSession, user_id: int) -> dict:
+    """Chat id -> title for a user's chats."""
+    result = await db.execute(
+        select(Chat.id, Chat.title).filter(Chat.user_id == user_id)
+    )
+    return dict(result.all())
+
+
+async def _user_chats(db: AsyncSession, user_id: int) -> dict:
+    """Chat id -> title, with each chat's queued messages written first."""
+    chats = await _chat_titles(db, user_id)
+    for chat_id in chats:
+        await message_writer.flush_chat(chat_id)
+    return chats
+
+
+def _new_messages(user_id: int):
+    """Messages of a user's chats above each chat's watermark."""
+    return (
+        select(Message)
+        .join(Chat, Chat.id == Message.chat_id)
+        .outerjoin(ChatInsight, ChatInsight.chat_id == Message.chat_id)
+        .filter(
+            Chat.user_id == user_id,
+            Message.id > func.coalesce(ChatInsight.last_message_id, 0),
+        )
+    )
+
+
+async def _chat_insights(db: AsyncSession, chats: dict) -> dict:
+    result = await db.execute(
+        select(ChatInsight).filter(ChatInsight.chat_id.in_(chats))
+    )
+    return {insight.chat_id: insight for insight in result.scalars()}
+
+
+def _ordered(chats: dict, insights: dict) -> list[tuple]:
+    ordered = sorted(insights.values(), key=lambda i: i.last_message_id)
+    return [(chats[i.chat_id], i) for i in ordered]
+
+
+async def has_new_messages(db: AsyncSession, user_id: int) -> bool:
+    """True if some chat of the user has messages its insight doesn't cover yet."""
+    await _user_chats(db, user_id)
+    result = await db.execute(
+        _new_messages(user_id).with_only_columns(Message.id).limit(1)
+    )
+    return result.first() is not None
+
+
+async def load_user_insights(db: AsyncSession, user_id: int) -> list[tuple]:
+    """The stored insights of a user's chats, as refresh_user_insights returns them."""
+    chats = await _chat_titles(db, user_id)
+    return _ordered(chats, await _chat_insights(db, chats))
+
+
+async def refresh_user_insights(db: AsyncSession, user_id: int) -> list[tuple]:
+    """
+    Bring the insights of every chat of a user up to date.
+
+    Up to INSIGHTS_REFRESH_CONCURRENCY chats are summarized at once.
+    Returns (chat title, insight) pairs, oldest insight first. A chat whose
+    summary can't be updated keeps its previous insight.
+    """
+    chats = await _user_chats(db, user_id)
+    insights = await _chat_insights(db, chats)
+
+    # Everything above each chat's watermark, in one query
+    result = await db.execute(
+        _new_messages(user_id).order_by(Message.chat_id, Message.id)
+    )
+    new_messages = defaultdict(list)
+    for message in result.scalars():
+        new_messages[message.chat_id].append(message)
+
+    limit = asyncio.Semaphore(settings.INSIGHTS_REFRESH_CONCURRENCY)
+
+    async def update(chat_id: int, messages: list):
+        insight = insights.get(chat_id)
+        if insight is None:
+            insight = ChatInsight(
+                chat_id=chat_id, summary="", facts="{}", last_message_id=0
+            )
+        try:
+            async with limit:
+                await _advance(insight, messages)
+        except Exception as e:
+            logger.error("Chat insight update failed", chat_id=chat_id, error=str(e))
+            return
+        if chat_id not in insights:
+            insights[chat_id] = insight
+            db.add(insight)
+
+    await asyncio.gather(*(update(c, m) for c, m in new_messages.items()))
+    try:
+        await db.commit()
+    except IntegrityError:
+        # A concurrent refresh stored these chats first; use what it stored
+        await db.rollback()
+        insights = await _chat_insights(db, chats)
+
+    return _ordered(chats, insights)
+
+
+def report_inputs(user: dict, chat_insights: list[tuple]) -> tuple[dict, str]:
+    """
+    Build the report's user data and conversation summary from insights.
+
+    Facts from more recently active chats override older ones.
+    """
+    facts = {}
+    summaries = []
+    for title, insight in chat_insights:
+        merge_facts(facts, json.loads(insight.facts or "{}"))
+        if insight.summary:
+            summaries.append(f"{title}: {insight.summary}")
+    if "monthly_income" not in facts and "annual_income" in facts:
+        facts["monthly_income"] = facts["annual_income"] / 12
+    return {**user, **facts}, "\n\n".join(reversed(summaries))
+
+
+async def prepare_report_inputs(user_id: int, user: dict) -> tuple[dict, str]:
+    """Refresh a user's insights in a session of its own; for report jobs."""
+    async with AsyncSessionLocal() as db:
+        chat_insights = await refresh_user_insights(db, user_id)
+        return report_inputs(user, chat_insights)
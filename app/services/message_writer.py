@@ -0,0 +1,466 @@
+"""
+Write-behind persistence for chat messages.
+
+Handlers enqueue messages and return; a background consumer inserts them
+in coalesced batches. Every message carries an idempotency key (stored in
+messages.message_key), so a batch that is written twice - after a crash,
+a retry, or a flush-on-read racing the consumer - inserts each message
+once. That makes at-least-once delivery safe.
+
+Reads stay consistent with the caller's writes: before listing a chat,
+`flush_chat` writes that chat's pending messages synchronously.
+
+Messages are stamped with created_at when they are enqueued, and pending
+rows are written in that order, so a chat reads back in conversation
+order however the batches are split between consumers.
+
+A batch that fails is retried one row at a time, so a bad row can't hold
+up the messages behind it. A row that keeps failing while the database is
+up (MESSAGE_WRITE_MAX_ATTEMPTS) is dead-lettered: logged, and for redis
+also kept in the "<prefix>:dead" stream. During a database outage nothing
+is dropped.
+
+Backends (settings.MESSAGE_WRITE_BEHIND):
+    off     write in the request (the default)
+    memory  asyncio queue in this process; lost if the process dies, and
+            reads only see this process's writes (single worker only)
+    redis   Redis stream + consumer group shared by all workers; entries
+            are acknowledged only after their batch commits
+"""
+import asyncio
+import json
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.redis import redis_client
+from app.db.session import AsyncSessionLocal
+from app.models import Chat, Message
+
+
+_last_created = datetime.min.replace(tzinfo=timezone.utc)
+
+
+def _created_now() -> str:
+    """Current UTC time, strictly increasing within this process."""
+    global _last_created
+    _last_created = max(
+        datetime.now(timezone.utc), _last_created + timedelta(microseconds=1)
+    )
+    return _last_created.isoformat()
+
+
+def new_message(
+    chat_id: int, role: str, content: str, key: Optional[str] = None
+) -> dict:
+    return {
+        "chat_id": chat_id,
+        "role": role,
+        "content": content,
+        "message_key": key or uuid.uuid4().hex,
+        "created_at": _created_now(),
+    }
+
+
+def _values(row: dict) -> dict:
+    # Rows are JSON in the queues; rows queued without a stamp get one now
+    created_at = row.get("created_at") or _created_now()
+    return {**row, "created_at": datetime.fromisoformat(created_at)}
+
+
+async def write_messages(rows: list[dict]) -> int:
+    """
+    Insert messages whose keys aren't stored yet, in one transaction.
+
+    Messages for chats that no longer exist are dropped. Returns the number
+    of rows inserted.
+    """
+    for attempt in range(2):
+        async with AsyncSessionLocal() as session:
+            existing = await session.execute(
+                select(Message.message_key).filter(
+                    Message.message_key.in_([r["message_key"] for r in rows])
+                )
+            )
+            chats = await session.execute(
+                select(Chat.id).filter(Chat.id.in_({r["chat_id"] for r in rows}))
+            )
+            stored, live_chats = set(existing.scalars()), set(chats.scalars())
+            new_rows, seen = [], set()
+            for row in rows:
+                key = row["message_key"]
+                if key in stored or key in seen:
+                    continue
+                seen.add(key)
+                if row["chat_id"] in live_chats:
+                    new_rows.append(_values(row))
+            if not new_rows:
+                return 0
+            try:
+                batch = settings.BULK_INSERT_BATCH_SIZE
+                for start in range(0, len(new_rows), batch):
+                    await session.execute(
+                        insert(Message).values(new_rows[start : start + batch])
+                    )
+                await session.commit()
+                return len(new_rows)
+            except IntegrityError:
+                # A concurrent flush stored some of these keys; re-check once
+                await session.rollback()
+                if attempt:
+                    raise
+    return 0
+
+
+async def write_each(rows: list[dict]) -> list[tuple[dict, Exception]]:
+    """
+    Write rows in one transaction, or one transaction per row if that fails.
+
+    Rows are written in created_at order. Returns the rows that could not
+    be written, with their errors.
+    """
+    rows = sorted(rows, key=lambda row: row.get("created_at") or "")
+    if len(rows) > 1:
+        try:
+            await write_messages(rows)
+            return []
+        except Exception as e:
+            logger.warning(
+                "Message batch failed, writing rows one at a time",
+                error=str(e),
+                rows=len(rows),
+            )
+    failed = []
+    for row in rows:
+        try:
+            await write_messages([row])
+        except Exception as e:
+            failed.append((row, e))
+    return failed
+
+
+async def database_available() -> bool:
+    try:
+        async with AsyncSessionLocal() as session:
+            await session.execute(select(1))
+        return True
+    except Exception:
+        return False
+
+
+class MessageWriter:
+    """Writes messages in the request (MESSAGE_WRITE_BEHIND=off)."""
+
+    async def enqueue(self, rows: list[dict]):
+        await write_messages(rows)
+
+    async def flush_chat(self, chat_id: int):
+        pass
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+
+class BackgroundMessageWriter(MessageWriter):
+    """
+    Shared consumer loop: subclasses provide the queue primitives.
+
+    Rows that fail are queued again and retried with backoff, behind the
+    rows that come after them.
+    """
+
+    def __init__(
+        self,
+        flush_interval: float | None = None,
+        batch_size: int | None = None,
+    ):
+        self.flush_interval = (
+            flush_interval
+            if flush_interval is not None
+            else settings.MESSAGE_FLUSH_INTERVAL_MS / 1000
+        )
+        self.batch_size = batch_size or settings.MESSAGE_FLUSH_BATCH_SIZE
+        self.max_attempts = settings.MESSAGE_WRITE_MAX_ATTEMPTS
+        self._attempts: dict[str, int] = {}  # message key -> failed writes
+        self._task: asyncio.Task | None = None
+        self._stopping = False
+
+    async def _next_batch(self, wait: bool = True) -> tuple[object, list[dict]]:
+        """Wait up to flush_interval (if wait); return (batch handle, rows)."""
+        raise NotImplementedError
+
+    async def _done(self, handle, rows: list[dict]):
+        """Remove a batch from the queue; `rows` are the ones no longer pending."""
+        raise NotImplementedError
+
+    async def _requeue(self, rows: list[dict]):
+        """Queue rows of a removed batch again, at the back."""
+        raise NotImplementedError
+
+    async def _dead_letter(self, row: dict, error: Exception):
+        logger.error(
+            "Message dropped after repeated write failures",
+            chat_id=row["chat_id"],
+            message_key=row["message_key"],
+            role=row["role"],
+            error=str(error),
+        )
+
+    async def _write_batch(self, handle, rows: list[dict]) -> list[dict]:
+        """Write and remove a batch; return the rows queued again."""
+        failed = await write_each(rows)
+        retry = []
+        # Failures only count against rows while the database is up
+        if failed and (len(failed) < len(rows) or await database_available()):
+            for row, error in failed:
+                key = row["message_key"]
+                self._attempts[key] = self._attempts.get(key, 0) + 1
+                if self._attempts[key] < self.max_attempts:
+                    retry.append(row)
+                else:
+                    await self._dead_letter(row, error)
+        else:
+            retry = [row for row, _ in failed]
+        retry_keys = {row["message_key"] for row in retry}
+        for row in rows:
+            if row["message_key"] not in retry_keys:
+                self._attempts.pop(row["message_key"], None)
+        written = [r for r in rows if r["message_key"] not in retry_keys]
+        await self._done(handle, written)
+        if retry:
+            await self._requeue(retry)
+        return retry
+
+    async def _run(self):
+        backoff = self.flush_interval
+        while not self._stopping:
+            try:
+                handle, rows = await self._next_batch()
+                if rows and await self._write_batch(handle, rows):
+                    logger.error("Message flush failed, retrying")
+                    await asyncio.sleep(backoff)
+                    backoff = min(backoff * 2, 5.0)
+                    continue
+                backoff = self.flush_interval
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Message flush failed", error=str(e))
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 5.0)
+
+    async def start(self):
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the consumer after flushing what is queued."""
+        if self._task is None:
+            return
+        self._stopping = True
+        try:
+            await asyncio.wait_for(self._task, timeout=10)
+        except asyncio.TimeoutError:
+            self._task.cancel()
+        self._task = None
+        await self.drain()
+
+    async def drain(self):
+        """Write everything queued now (used on shutdown)."""
+        while True:
+            handle, rows = await self._next_batch(wait=False)
+            if not rows:
+                return
+            retry = await self._write_batch(handle, rows)
+            if retry:
+                logger.error("Messages left unwritten at shutdown", count=len(retry))
+                return
+
+
+class MemoryMessageWriter(BackgroundMessageWriter):
+    """In-process queue; pending messages are indexed by chat for reads."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._queue: list[dict] = []
+        self._pending: dict[int, dict[str, dict]] = {}
+        self._wakeup = asyncio.Event()
+
+    async def enqueue(self, rows: list[dict]):
+        for row in rows:
+            self._queue.append(row)
+            pending = self._pending.setdefault(row["chat_id"], {})
+            pending.setdefault(row["message_key"], row)  # first write wins
+        if len(self._queue) >= self.batch_size:
+            self._wakeup.set()
+
+    async def _next_batch(self, wait: bool = True):
+        if wait and len(self._queue) < self.batch_size:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+        self._wakeup.clear()
+        rows = self._queue[: self.batch_size]
+        return len(rows), rows
+
+    async def _done(self, count: int, rows: list[dict]):
+        del self._queue[:count]
+        for row in rows:
+            pending = self._pending.get(row["chat_id"])
+            if pending is not None:
+                pending.pop(row["message_key"], None)
+                if not pending:
+                    del self._pending[row["chat_id"]]
+
+    async def _requeue(self, rows: list[dict]):
+        self._queue.extend(rows)
+
+    async def flush_chat(self, chat_id: int):
+        pending = self._pending.pop(chat_id, None)
+        if pending:
+            failed = await write_each(list(pending.values()))
+            if failed:
+                # Left to the consumer, which retries or dead-letters them
+                logger.warning(
+                    "Chat flush incomplete", chat_id=chat_id, failed=len(failed)
+                )
+                self._pending.setdefault(chat_id, {}).update(
+                    {row["message_key"]: row for row, _ in failed}
+                )
+        # The queued copies are skipped by key when the consumer gets to them
+
+
+class RedisMessageWriter(BackgroundMessageWriter):
+    """
+    Redis stream consumed by a consumer group across workers.
+
+    Each message is also kept in a per-chat pending hash until written, so
+    any worker can flush a chat before reading it. Entries left unacked by
+    a dead consumer are reclaimed after MESSAGE_CLAIM_IDLE_MS.
+    """
+
+    def __init__(self, client=None, prefix: str = "messages", **kwargs):
+        super().__init__(**kwargs)
+        self.client = client or redis_client
+        self.stream = f"{prefix}:stream"
+        self.dead_stream = f"{prefix}:dead"
+        self.group = f"{prefix}:writers"
+        self.prefix = prefix
+        self.consumer = f"{socket.gethostname()}-{os.getpid()}"
+        self.claim_idle_ms = settings.MESSAGE_CLAIM_IDLE_MS
+
+    def _pending_key(self, chat_id: int) -> str:
+        return f"{self.prefix}:pending:{chat_id}"
+
+    async def enqueue(self, rows: list[dict]):
+        async with self.client.pipeline(transaction=True) as pipe:
+            for row in rows:
+                payload = json.dumps(row)
+                pending = self._pending_key(row["chat_id"])
+                pipe.hsetnx(pending, row["message_key"], payload)
+                pipe.xadd(self.stream, {"m": payload})
+            await pipe.execute()
+
+    async def start(self):
+        try:
+            await self.client.xgroup_create(
+                self.stream, self.group, id="0", mkstream=True
+            )
+        except Exception as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        await super().start()
+
+    async def _next_batch(self, wait: bool = True):
+        # Entries a crashed consumer never acknowledged come first
+        _, claimed, *_ = await self.client.xautoclaim(
+            self.stream,
+            self.group,
+            self.consumer,
+            min_idle_time=self.claim_idle_ms,
+            count=self.batch_size,
+        )
+        entries = list(claimed)
+        if len(entries) < self.batch_size:
+            response = await self.client.xreadgroup(
+                self.group,
+                self.consumer,
+                {self.stream: ">"},
+                count=self.batch_size - len(entries),
+                block=int(self.flush_interval * 1000) if wait and not entries else None,
+            )
+            for _, stream_entries in response or []:
+                entries.extend(stream_entries)
+        ids = [entry_id for entry_id, _ in entries]
+        rows = [json.loads(fields[b"m"]) for _, fields in entries if fields]
+        return ids, rows
+
+    async def _done(self, ids: list, rows: list[dict]):
+        async with self.client.pipeline(transaction=False) as pipe:
+            if ids:
+                pipe.xack(self.stream, self.group, *ids)
+                pipe.xdel(self.stream, *ids)
+            for row in rows:
+                pipe.hdel(self._pending_key(row["chat_id"]), row["message_key"])
+            await pipe.execute()
+
+    async def _requeue(self, rows: list[dict]):
+        async with self.client.pipeline(transaction=False) as pipe:
+            for row in rows:
+                pipe.xadd(self.stream, {"m": json.dumps(row)})
+            await pipe.execute()
+
+    async def _dead_letter(self, row: dict, error: Exception):
+        await super()._dead_letter(row, error)
+        await self.client.xadd(
+            self.dead_stream, {"m": json.dumps(row), "error": str(error)}
+        )
+
+    async def drain(self):
+        # Leave queued entries to the other workers' consumers
+        pass
+
+    async def flush_chat(self, chat_id: int):
+        key = self._pending_key(chat_id)
+        pending = await self.client.hgetall(key)
+        if pending:
+            rows = {k: json.loads(v) for k, v in pending.items()}
+            failed = await write_each(list(rows.values()))
+            failed_keys = {row["message_key"] for row, _ in failed}
+            written = [
+                k for k, row in rows.items() if row["message_key"] not in failed_keys
+            ]
+            if written:
+                await self.client.hdel(key, *written)
+            if failed:
+                # Left to the consumers, which retry or dead-letter them
+                logger.warning(
+                    "Chat flush incomplete", chat_id=chat_id, failed=len(failed)
+                )
+
+
+def build_message_writer(backend: str | None = None) -> MessageWriter:
+    """Create the writer selected by settings.MESSAGE_WRITE_BEHIND."""
+    backend = backend or settings.MESSAGE_WRITE_BEHIND
+    if backend == "off":
+        return MessageWriter()
+    if backend == "memory":
+        return MemoryMessageWriter()
+    if backend == "redis":
+        return RedisMessageWriter()
+    raise ValueError(f"Unknown message write-behind backend: {backend}")
+
+
+message_writer = build_message_writer()
@@ -0,0 +1,223 @@
+"""
+Monte Carlo simulation of savings/portfolio growth.
+
+Monthly returns are lognormal with the given annual mean and volatility.
+Paths are simulated in chunks: each chunk is a (paths x months) matrix of
+log-returns, and the ending balance of every path is computed in closed form
+from suffix sums, with no per-month Python loop.
+
+Chunks draw from independent child seeds of one SeedSequence, so results
+depend only on the seed and chunk size, not on how many processes run them.
+With `stream=True` each chunk is reduced to a fixed-size histogram as it
+finishes, so memory stays bounded however many paths are simulated.
+"""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+
+import numpy as np
+from pydantic import BaseModel, Field
+
+from app.core.config import settings
+
+PERCENTILES = (5, 10, 25, 50, 75, 90, 95)
+
+# Streaming percentiles: log10(balance) histogram from $1 to $10^12
+_HIST_EDGES = np.linspace(0, 12, 12 * 1024 + 1)
+
+# (expected annual return %, annual volatility %) per asset class
+ASSET_ASSUMPTIONS = {
+    "stocks": (7.0, 16.0), "equities": (7.0, 16.0),
+    "bonds": (3.5, 6.0), "treasuries": (3.0, 4.0),
+    "cash": (2.0, 0.5), "savings": (2.0, 0.5),
+    "reits": (6.0, 18.0), "real estate": (6.0, 18.0),
+    "commodities": (4.0, 20.0),
+    "crypto": (12.0, 70.0), "cryptocurrency": (12.0, 70.0),
+}
+DEFAULT_ASSUMPTION = (5.0, 12.0)
+ASSET_CORRELATION = 0.2  # assumed pairwise correlation between asset classes
+
+class SimulationInputs(BaseModel):
+    """
+    Bounds on a simulation's inputs, shared by the API and the agent tool.
+
+    They keep every balance finite and each chunk's (paths x months)
+    matrix a sensible size.
+    """
+
+    current_savings: float = Field(ge=0, le=1e12)
+    monthly_contribution: float = Field(0, ge=0, le=1e9)
+    years: int = Field(gt=0, le=100)
+    annual_return: float = Field(7.0, gt=-100, le=100)  # percent
+    volatility: float = Field(15.0, ge=0, le=100)  # percent
+    target: Optional[float] = Field(None, ge=0)
+
+
+# Worker pools by size, reused across simulations
+_pools: Dict[int, ProcessPoolExecutor] = {}
+
+
+def get_pool(workers: int) -> ProcessPoolExecutor:
+    pool = _pools.get(workers)
+    if pool is None:
+        # spawn: forking a threaded server process isn't safe
+        pool = _pools[workers] = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+    return pool
+
+
+def shutdown_pools():
+    for pool in _pools.values():
+        pool.shutdown(wait=False, cancel_futures=True)
+    _pools.clear()
+
+
+def portfolio_assumptions(allocations: Dict[str, float]) -> tuple[float, float]:
+    """
+    Blend per-asset assumptions into a portfolio (annual return %, volatility %).
+
+    allocations maps asset class to percent of the portfolio.
+    """
+    total = sum(allocations.values())
+    weights = np.array([v / total for v in allocations.values()])
+    stats = np.array(
+        [ASSET_ASSUMPTIONS.get(a.lower(), DEFAULT_ASSUMPTION) for a in allocations]
+    )
+    vols = stats[:, 1] / 100
+    corr = np.full((len(weights), len(weights)), ASSET_CORRELATION)
+    np.fill_diagonal(corr, 1.0)
+    variance = weights @ (np.outer(vols, vols) * corr) @ weights
+    return float(weights @ stats[:, 0]), float(np.sqrt(variance) * 100)
+
+
+def _ending_balances(
+    seed, paths, months, initial, contribution, annual_return, annual_volatility
+) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    sigma = annual_volatility / 100 / np.sqrt(12)
+    mu = np.log1p(annual_return / 100) / 12 - sigma**2 / 2
+    log_returns = rng.normal(mu, sigma, size=(paths, months))
+    # growth[:, t] = growth from month t to the end; contributions precede growth
+    growth = np.exp(np.cumsum(log_returns[:, ::-1], axis=1)[:, ::-1])
+    return initial * growth[:, 0] + contribution * growth.sum(axis=1)
+
+
+def _run_chunk(task: tuple) -> tuple:
+    seed, paths, months, initial, contribution, ret, vol, target, stream = task
+    balances = _ending_balances(seed, paths, months, initial, contribution, ret, vol)
+    successes = int((balances >= target).sum()) if target is not None else 0
+    if not stream:
+        return balances, successes
+    counts, _ = np.histogram(
+        np.log10(np.maximum(balances, 1.0)), bins=_HIST_EDGES
+    )
+    return (counts, float(balances.sum())), successes
+
+
+def _histogram_percentiles(counts: np.ndarray, total: int) -> list:
+    cumulative = np.cumsum(counts)
+    result = []
+    for q in PERCENTILES:
+        i = int(np.searchsorted(cumulative, q / 100 * total))
+        i = min(i, len(counts) - 1)
+        result.append(10 ** ((_HIST_EDGES[i] + _HIST_EDGES[i + 1]) / 2))
+    return result
+
+
+def simulate(
+    initial: float,
+    monthly_contribution: float,
+    years: int,
+    annual_return: float,
+    annual_volatility: float,
+    paths: int = 10_000,
+    target: Optional[float] = None,
+    seed: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    workers: Optional[int] = None,
+    stream: Optional[bool] = None,
+) -> dict:
+    """
+    Simulate ending balances after `years` of monthly contributions.
+
+    Args:
+        initial: Starting balance
+        monthly_contribution: Amount added at the start of each month
+        years: Horizon in years
+        annual_return: Expected annual return in percent
+        annual_volatility: Annual volatility (standard deviation) in percent
+        paths: Number of simulated paths
+        target: Balance that counts as success, if any
+        seed: Seed for reproducible results
+        chunk_size: Paths per chunk (defaults to settings.MONTE_CARLO_CHUNK_SIZE)
+        workers: Processes to spread chunks over; 0/1 runs in this process
+            (defaults to settings.MONTE_CARLO_WORKERS)
+        stream: Reduce chunks to histograms as they finish (bounded memory,
+            percentiles accurate to ~0.3%); defaults to True above
+            settings.MONTE_CARLO_EXACT_MAX_PATHS
+
+    Returns:
+        dict: paths, success_probability (None without a target), mean,
+        percentiles ({"p5": ..., "p50": ..., ...}) and whether they are exact
+    """
+    months = int(years * 12)
+    if months <= 0 or paths <= 0:
+        raise ValueError("years and paths must be positive")
+    if annual_return <= -100:
+        raise ValueError("annual_return must be above -100%")
+    if annual_volatility < 0:
+        raise ValueError("volatility can't be negative")
+    chunk_size = chunk_size or settings.MONTE_CARLO_CHUNK_SIZE
+    workers = settings.MONTE_CARLO_WORKERS if workers is None else workers
+    if stream is None:
+        stream = paths > settings.MONTE_CARLO_EXACT_MAX_PATHS
+
+    sizes = [chunk_size] * (paths // chunk_size)
+    if paths % chunk_size:
+        sizes.append(paths % chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = (
+        (s, n, months, initial, monthly_contribution, annual_return,
+         annual_volatility, target, stream)
+        for s, n in zip(seeds, sizes)
+    )
+
+    if workers and workers > 1:
+        summary = _summarize(get_pool(workers).map(_run_chunk, tasks), paths, stream)
+    else:
+        summary = _summarize(map(_run_chunk, tasks), paths, stream)
+
+    summary["success_probability"] = (
+        summary.pop("successes") / paths if target is not None else None
+    )
+    return summary
+
+
+def _summarize(results, paths: int, stream: bool) -> dict:
+    successes = 0
+    if stream:
+        counts = np.zeros(len(_HIST_EDGES) - 1, dtype=np.int64)
+        total = 0.0
+        for (chunk_counts, chunk_sum), chunk_successes in results:
+            counts += chunk_counts
+            total += chunk_sum
+            successes += chunk_successes
+        mean = total / paths
+        values = _histogram_percentiles(counts, paths)
+    else:
+        chunks = []
+        for balances, chunk_successes in results:
+            chunks.append(balances)
+            successes += chunk_successes
+        balances = np.concatenate(chunks)
+        mean = float(balances.mean())
+        values = np.percentile(balances, PERCENTILES).tolist()
+
+    return {
+        "paths": paths,
+        "mean": mean,
+        "percentiles": {f"p{q}": v for q, v in zip(PERCENTILES, values)},
+        "exact": not stream,
+        "successes": successes,
+    }
@@ -1,17 +1,84 @@
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.units import inch
 from datetime import datetime
+from functools import lru_cache
+from typing import Iterable, Iterator
+from xml.sax.saxutils import escape
+import contextlib
 import io
+import os
 
-def generate_financial_report(user_data: dict, chat_summary: str = "") -> bytes:
+
+@lru_cache(maxsize=None)
+def get_styles():
+    """Report styles, built once per process and shared by every render."""
+    styles = getSampleStyleSheet()
+    styles.add(ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Title'],
+        fontSize=24,
+        textColor='blue'
+    ))
+    return styles
+
+
+class LazyStory:
+    """
+    A story that pulls flowables from an iterator as the layout needs them.
+
+    SimpleDocTemplate.build consumes its story from the front, so passing
+    this instead of a list keeps only a few flowables in memory at a time,
+    however long the report is. `lookahead` flowables are buffered so
+    keep-with-next (e.g. a heading and its first paragraph) still works.
+    """
+
+    def __init__(self, flowables: Iterable, lookahead: int = 8):
+        self._source = iter(flowables)
+        self._buffer = []
+        self.lookahead = lookahead
+
+    def _fill(self, count: int):
+        while len(self._buffer) < count:
+            try:
+                self._buffer.append(next(self._source))
+            except StopIteration:
+                return
+
+    def __len__(self):
+        self._fill(self.lookahead)
+        return len(self._buffer)
+
+    def __getitem__(self, index):
+        if isinstance(index, int):
+            self._fill(index + 1)
+        return self._buffer[index]
+
+    def __setitem__(self, index, value):
+        self._buffer[index] = value
+
+    def __delitem__(self, index):
+        del self._buffer[index]
+
+    def insert(self, index: int, flowable):
+        self._buffer.insert(index, flowable)
+
+
+def _document(target, **kwargs) -> SimpleDocTemplate:
+    # Page compression keeps finished pages small until the file is written
+    return SimpleDocTemplate(target, pagesize=letter, pageCompression=1, **kwargs)
+
+
+def generate_financial_report(
+    user_data: dict, chat_summary: str = "", sections: Iterable = ()
+) -> bytes:
     """
     Generate a PDF financial report for a user.
     
     Args:
         user_data: Dict containing user info and financial data
         chat_summary: Summary of recent financial conversations
+        sections: Extra flowables appended to the report, consumed lazily
         
     Returns:
         bytes: PDF file content
@@ -20,52 +87,128 @@ def generate_financial_report(user_data: dict, chat_summary: str = "") -> bytes:
     buffer = io.BytesIO()
     
     # Create the PDF document
-    doc = SimpleDocTemplate(buffer, pagesize=letter)
-    story = []
+    doc = _document(buffer)
+    doc.build(LazyStory(iter_story(user_data, chat_summary, sections)))
     
-    # Get styles
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Title'],
-        fontSize=24,
-        textColor='blue'
-    )
+    # Get the PDF content
+    pdf_content = buffer.getvalue()
+    buffer.close()
+    
+    return pdf_content
+
+
+def render_report_file(
+    user_data: dict, chat_summary: str, path: str, sections: Iterable = ()
+) -> str:
+    """
+    Render the report straight to a file (used by the report job pool).
+
+    Writes to a temporary name and renames, so readers never see a
+    partially written PDF.
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            story = LazyStory(iter_story(user_data, chat_summary, sections))
+            _document(f).build(story)
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(tmp_path)
+        raise
+    return path
+
+
+def iter_story(user_data: dict, chat_summary: str, sections: Iterable = ()) -> Iterator:
+    """Yield the report's flowables in order; `sections` come last."""
+    
+    styles = get_styles()
     
     # Add title
-    story.append(Paragraph("Financial Analysis Report", title_style))
-    story.append(Spacer(1, 12))
+    yield Paragraph("Financial Analysis Report", styles['CustomTitle'])
+    yield Spacer(1, 12)
     
     # Add user info
-    story.append(Paragraph(f"Generated for: {user_data.get('name', 'User')}", styles['Normal']))
-    story.append(Paragraph(f"Date: {datetime.now().strftime('%B %d, %Y')}", styles['Normal']))
-    story.append(Spacer(1, 12))
+    yield Paragraph(
+        f"Generated for: {escape(user_data.get('name') or 'User')}",
+        styles['Normal'],
+    )
+    yield Paragraph(f"Date: {datetime.now().strftime('%B %d, %Y')}", styles['Normal'])
+    yield Spacer(1, 12)
     
     # Add financial summary section
-    story.append(Paragraph("Financial Summary", styles['Heading2']))
+    yield Paragraph("Financial Summary", styles['Heading2'])
     if user_data.get('monthly_income'):
-        story.append(Paragraph(f"Monthly Income: ${user_data['monthly_income']:,.2f}", styles['Normal']))
+        yield Paragraph(
+            f"Monthly Income: ${user_data['monthly_income']:,.2f}",
+            styles['Normal'],
+        )
     if user_data.get('monthly_expenses'):
-        story.append(Paragraph(f"Monthly Expenses: ${user_data['monthly_expenses']:,.2f}", styles['Normal']))
-    story.append(Spacer(1, 12))
+        yield Paragraph(
+            f"Monthly Expenses: ${user_data['monthly_expenses']:,.2f}",
+            styles['Normal'],
+        )
+    for category, amount in user_data.get('expenses', {}).items():
+        yield Paragraph(
+            f"• {escape(category.title())}: ${amount:,.2f}",
+            styles['Normal'],
+        )
+    if user_data.get('emergency_savings') is not None:
+        yield Paragraph(
+            f"Emergency Savings: ${user_data['emergency_savings']:,.2f}",
+            styles['Normal'],
+        )
+    if user_data.get('retirement_savings') is not None:
+        yield Paragraph(
+            f"Retirement Savings: ${user_data['retirement_savings']:,.2f} "
+            f"(+${user_data.get('retirement_contribution', 0):,.2f}/month)",
+            styles['Normal'],
+        )
+    for kind, debt in user_data.get('debts', {}).items():
+        text = f"{kind.title()}: ${debt['balance']:,.2f} at {debt['interest_rate']:g}%"
+        if debt.get('monthly_payment') is not None:
+            text += f", ${debt['monthly_payment']:,.2f}/month"
+        if debt.get('payoff_months') is not None:
+            text += f", paid off in {debt['payoff_months']} months"
+        yield Paragraph(text, styles['Normal'])
+    yield Spacer(1, 12)
+
+    # Figures the agent's calculators computed (structured tool results)
+    projections = [
+        ("Estimated Federal Tax", 'federal_tax', "${:,.2f}/year"),
+        ("Emergency Fund Target", 'emergency_target', "${:,.2f}"),
+        ("Projected Retirement Savings", 'projected_retirement_savings', "${:,.2f}"),
+        (
+            "Projected Retirement Income",
+            'projected_retirement_income',
+            "${:,.2f}/month",
+        ),
+    ]
+    lines = [
+        f"{label}: {fmt.format(user_data[key])}"
+        for label, key, fmt in projections
+        if user_data.get(key) is not None
+    ]
+    if lines:
+        yield Paragraph("Projections", styles['Heading2'])
+        for line in lines:
+            yield Paragraph(line, styles['Normal'])
+        yield Spacer(1, 12)
     
-    # Add chat summary if provided
+    # Add chat summary if provided (one paragraph per chat)
     if chat_summary:
-        story.append(Paragraph("Recent Financial Conversations", styles['Heading2']))
-        story.append(Paragraph(chat_summary, styles['Normal']))
-        story.append(Spacer(1, 12))
+        yield Paragraph("Recent Financial Conversations", styles['Heading2'])
+        for block in chat_summary.split("\n\n"):
+            yield Paragraph(escape(block).replace("\n", "<br/>"), styles['Normal'])
+            yield Spacer(1, 6)
+        yield Spacer(1, 6)
     
     # Add recommendations section
-    story.append(Paragraph("Recommendations", styles['Heading2']))
-    story.append(Paragraph("• Review your budget monthly", styles['Normal']))
-    story.append(Paragraph("• Build an emergency fund of 3-6 months expenses", styles['Normal']))
-    story.append(Paragraph("• Consider increasing retirement contributions", styles['Normal']))
-    
-    # Build the PDF
-    doc.build(story)
-    
-    # Get the PDF content
-    pdf_content = buffer.getvalue()
-    buffer.close()
-    
-    return pdf_content
\ No newline at end of file
+    yield Paragraph("Recommendations", styles['Heading2'])
+    yield Paragraph("• Review your budget monthly", styles['Normal'])
+    yield Paragraph(
+        "• Build an emergency fund of 3-6 months expenses", styles['Normal']
+    )
+    yield Paragraph("• Consider increasing retirement contributions", styles['Normal'])
+
+    yield from sections
\ No newline at end of file
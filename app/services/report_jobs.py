@@ -0,0 +1,197 @@
+"""
+Background PDF report jobs.
+
+A report's inputs are hashed (user data, summary and the report date); the
+rendered PDF is cached on disk under that hash, so requesting an unchanged
+report returns the cached file without rendering. Otherwise rendering runs
+in a process pool and the job's status is tracked in Redis, so any worker
+can answer status requests. Any worker may then serve the download, so
+with several hosts REPORT_CACHE_DIR must be a directory they all share;
+job records note the host that rendered them. Identical renders in
+flight in this process share one job.
+
+Inputs that take a while to build (chat summaries needing LLM calls) are
+built in the job too: submit_later returns a pending job at once.
+"""
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import os
+import socket
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from typing import Awaitable, Callable, Optional
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.redis import redis_client
+from app.services.pdf_generator import render_report_file
+
+# Bump when the report layout changes so cached PDFs are re-rendered
+RENDER_VERSION = 3
+
+
+def content_hash(inputs: dict) -> str:
+    canonical = json.dumps(
+        {"version": RENDER_VERSION, **inputs}, sort_keys=True, default=str
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class ReportJobs:
+    def __init__(
+        self,
+        client=None,
+        prefix: str = "report_job",
+        cache_dir: str | None = None,
+        workers: int | None = None,
+    ):
+        self.client = client or redis_client
+        self.prefix = prefix
+        self.cache_dir = cache_dir or settings.REPORT_CACHE_DIR
+        self.workers = workers or settings.REPORT_RENDER_WORKERS
+        self.host = socket.gethostname()
+        self._pool: ProcessPoolExecutor | None = None
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._trackers: set[asyncio.Task] = set()
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: forking a threaded server process isn't safe
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._pool
+
+    def _job_key(self, job_id: str) -> str:
+        return f"{self.prefix}:{job_id}"
+
+    def path_for(self, report_hash: str) -> str:
+        return os.path.join(self.cache_dir, f"{report_hash}.pdf")
+
+    @staticmethod
+    def _new_job(user_id: int) -> dict:
+        return {"id": uuid.uuid4().hex, "user_id": user_id, "status": "pending"}
+
+    def _background(self, coro):
+        tracker = asyncio.create_task(coro)
+        self._trackers.add(tracker)
+        tracker.add_done_callback(self._trackers.discard)
+
+    async def submit(self, user_id: int, user_data: dict, chat_summary: str) -> dict:
+        """
+        Start (or reuse) a render of the report; returns the job record.
+        """
+        job = self._new_job(user_id)
+        task = self._start(job, user_data, chat_summary)
+        await self._save(job)
+        if task is not None:
+            self._background(self._track(job, task))
+        return job
+
+    async def submit_later(
+        self, user_id: int, prepare: Callable[[], Awaitable[tuple[dict, str]]]
+    ) -> dict:
+        """
+        Like submit, with the inputs built in the job by `prepare`.
+
+        Returns the pending job record without waiting for `prepare`.
+        """
+        job = self._new_job(user_id)
+        await self._save(job)
+        self._background(self._prepare_and_track(job, prepare))
+        return job
+
+    def _start(
+        self, job: dict, user_data: dict, chat_summary: str
+    ) -> asyncio.Task | None:
+        """Set the job's hash; return its render task, or None if already cached."""
+        inputs = {
+            "user_data": user_data,
+            "chat_summary": chat_summary,
+            "report_date": date.today().isoformat(),
+        }
+        report_hash = content_hash(inputs)
+        job["hash"] = report_hash
+        job["host"] = self.host
+        path = self.path_for(report_hash)
+        if os.path.exists(path):
+            os.utime(path)  # keep recently requested reports from being pruned
+            job["status"] = "done"
+            return None
+
+        task = self._inflight.get(report_hash)
+        if task is None:
+            task = asyncio.create_task(self._render(report_hash, inputs))
+            self._inflight[report_hash] = task
+            task.add_done_callback(lambda _: self._inflight.pop(report_hash, None))
+        return task
+
+    async def _prepare_and_track(self, job: dict, prepare):
+        try:
+            user_data, chat_summary = await prepare()
+        except Exception as e:
+            logger.error("Report inputs failed", job_id=job["id"], error=str(e))
+            job["status"] = "failed"
+            await self._save(job)
+            return
+        task = self._start(job, user_data, chat_summary)
+        if task is None:
+            await self._save(job)
+        else:
+            await self._track(job, task)
+
+    async def _render(self, report_hash: str, inputs: dict):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(
+            self.pool,
+            render_report_file,
+            inputs["user_data"],
+            inputs["chat_summary"],
+            self.path_for(report_hash),
+        )
+        self.prune()
+
+    async def _track(self, job: dict, task: asyncio.Task):
+        try:
+            await task
+            job["status"] = "done"
+        except Exception as e:
+            logger.error("Report render failed", job_id=job["id"], error=str(e))
+            job["status"] = "failed"
+        await self._save(job)
+
+    async def _save(self, job: dict):
+        await self.client.set(
+            self._job_key(job["id"]),
+            json.dumps(job),
+            ex=settings.REPORT_JOB_TTL_SECONDS,
+        )
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        raw = await self.client.get(self._job_key(job_id))
+        return json.loads(raw) if raw else None
+
+    def prune(self):
+        """Delete cached PDFs older than REPORT_CACHE_TTL_SECONDS."""
+        cutoff = time.time() - settings.REPORT_CACHE_TTL_SECONDS
+        for entry in os.scandir(self.cache_dir):
+            try:
+                if entry.name.endswith(".pdf") and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+report_jobs = ReportJobs()
@@ -0,0 +1,165 @@
+"""
+Parameter-grid sweeps over the calculators, evaluated in one vectorized pass.
+
+A grid maps each calculator parameter to a list of values; every
+combination is evaluated and results come back as columns (one list per
+parameter and per output), which keeps large sweeps compact.
+"""
+import math
+from typing import Callable, Dict, List, NamedTuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.services import finance_math
+
+
+class Calculator(NamedTuple):
+    params: List[str]
+    compute: Callable[..., Dict[str, np.ndarray]]
+
+
+def _loan(principal, annual_rate, years):
+    payment = finance_math.loan_payment(principal, annual_rate, years)
+    total_paid = payment * years * 12
+    return {
+        "monthly_payment": payment,
+        "total_paid": total_paid,
+        "total_interest": total_paid - principal,
+    }
+
+
+def _debt_payoff(debt_amount, interest_rate, monthly_payment):
+    months, total_paid, interest_paid = finance_math.payoff_totals(
+        debt_amount, interest_rate, monthly_payment
+    )
+    return {"months": months, "total_paid": total_paid, "interest_paid": interest_paid}
+
+
+def _retirement(
+    current_age, retirement_age, current_savings, monthly_contribution, annual_return
+):
+    years = retirement_age - current_age
+    total = finance_math.future_value(
+        current_savings, monthly_contribution, annual_return, np.maximum(years, 0)
+    )
+    total = np.where(years > 0, total, np.nan)  # already retired
+    return {
+        "total_at_retirement": total,
+        "annual_income": total * 0.04,
+        "monthly_income": total * 0.04 / 12,
+    }
+
+
+def _compound(principal, monthly_contrib, annual_rate, years):
+    return {
+        "future_value": finance_math.future_value(
+            principal, monthly_contrib, annual_rate, years, contrib_at_start=True
+        )
+    }
+
+
+CALCULATORS: Dict[str, Calculator] = {
+    "loan_payment_calculator": Calculator(["principal", "annual_rate", "years"], _loan),
+    "debt_payoff_calculator": Calculator(
+        ["debt_amount", "interest_rate", "monthly_payment"], _debt_payoff
+    ),
+    "retirement_calculator": Calculator(
+        [
+            "current_age",
+            "retirement_age",
+            "current_savings",
+            "monthly_contribution",
+            "annual_return",
+        ],
+        _retirement,
+    ),
+    "compound_interest": Calculator(
+        ["principal", "monthly_contrib", "annual_rate", "years"], _compound
+    ),
+}
+
+
+def expand_range(start: float, stop: float, step: float) -> np.ndarray:
+    """Values from start to stop inclusive; at most BATCH_MAX_POINTS of them."""
+    if not all(math.isfinite(v) for v in (start, stop, step)):
+        raise ValueError("range bounds and step must be finite")
+    if step <= 0:
+        raise ValueError("step must be positive")
+    # Same length as the arange below, checked before anything is allocated
+    count = math.ceil((stop - start) / step + 0.5)
+    if count > settings.BATCH_MAX_POINTS:
+        raise ValueError(
+            f"Range has {count:,} values; the limit is {settings.BATCH_MAX_POINTS:,}"
+        )
+    return np.arange(start, stop + step / 2, step)
+
+
+def parse_grid_spec(spec: str) -> Dict[str, np.ndarray]:
+    """
+    Parse a grid written as "param:values;param:values".
+
+    values is a comma-separated list ("5,10,15") or an inclusive range
+    "start..stop..step" ("200..2000..50").
+    """
+    grid = {}
+    for item in spec.split(";"):
+        if not item.strip():
+            continue
+        name, values = item.split(":", 1)
+        values = values.strip()
+        if ".." in values:
+            start, stop, step = (float(v) for v in values.split(".."))
+            grid[name.strip()] = expand_range(start, stop, step)
+        else:
+            grid[name.strip()] = np.array([float(v) for v in values.split(",")])
+    return grid
+
+
+def run_batch(name: str, grid: Dict[str, object]) -> Dict[str, np.ndarray]:
+    """
+    Evaluate a calculator over every combination of the grid values.
+
+    Returns:
+        dict: Column name -> array; parameter columns first, then outputs
+
+    Raises:
+        KeyError: Unknown calculator
+        ValueError: Missing/unknown parameters or too many points
+    """
+    calculator = CALCULATORS[name]
+    missing = [p for p in calculator.params if p not in grid]
+    unknown = [p for p in grid if p not in calculator.params]
+    if missing or unknown:
+        raise ValueError(
+            f"Expected parameters {calculator.params}"
+            + (f"; missing {missing}" if missing else "")
+            + (f"; unknown {unknown}" if unknown else "")
+        )
+
+    # Python ints: a NumPy product wraps around for huge grids
+    points = math.prod(int(np.size(grid[p])) for p in calculator.params)
+    if points > settings.BATCH_MAX_POINTS:
+        raise ValueError(
+            f"Grid has {points:,} points; the limit is {settings.BATCH_MAX_POINTS:,}"
+        )
+
+    columns = finance_math.scenario_grid(**{p: grid[p] for p in calculator.params})
+    outputs = calculator.compute(**columns)
+    columns.update(
+        {k: np.broadcast_to(v, (points,)) for k, v in outputs.items()}
+    )
+    return columns
+
+
+def to_lists(columns: Dict[str, np.ndarray], decimals: int = 2) -> Dict[str, list]:
+    """JSON-ready columns: values rounded, non-finite values as None."""
+    result = {}
+    for name, values in columns.items():
+        values = np.round(np.asarray(values, dtype=float), decimals)
+        finite = np.isfinite(values)
+        as_list = values.tolist()
+        if not finite.all():
+            as_list = [v if ok else None for v, ok in zip(as_list, finite.tolist())]
+        result[name] = as_list
+    return result
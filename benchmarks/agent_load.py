@@ -0,0 +1,70 @@
+"""
+Load benchmark for POST /api/v1/query against a stubbed ChatOpenAI.
+
+Compares the old handler (sync `agent.invoke` inside an async endpoint) with
+the async executor path. Run with:
+
+    python -m benchmarks.agent_load --requests 100 --latency 0.05
+"""
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.prebuilt import create_react_agent
+
+from app.agents.agent import tools
+from app.agents.executor import run_agent
+from app.agents.quota import token_budget
+from app.core.config import settings
+from benchmarks.stubs import StubChatModel
+
+
+async def blocking_handler(agent, query: str, thread_id: str):
+    # Mirrors the original endpoint: async def calling the sync graph
+    result = agent.invoke(
+        {"messages": [("user", query)]},
+        config={"configurable": {"thread_id": thread_id}},
+    )
+    return result["messages"][-1].content
+
+
+async def async_handler(agent, query: str, thread_id: str):
+    return await run_agent(query, thread_id, agent=agent, user_key=thread_id)
+
+
+async def measure(handler, agent, requests: int) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(handler(agent, "save 200 for 12 months", f"t{i}") for i in range(requests))
+    )
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+    # Measure agent execution, not the response cache, coalescing or quotas
+    settings.RESPONSE_CACHE_ENABLED = False
+    settings.SINGLE_FLIGHT_ENABLED = False
+    token_budget.daily_tokens = 0
+
+    agent = create_react_agent(
+        StubChatModel(latency=args.latency), tools, checkpointer=MemorySaver()
+    )
+
+    for name, handler in [("blocking", blocking_handler), ("async", async_handler)]:
+        elapsed = asyncio.run(measure(handler, agent, args.requests))
+        print(
+            f"{name:>8}: {args.requests} requests in {elapsed:.2f}s "
+            f"({args.requests / elapsed:,.1f} req/s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+DB queries per authenticated request: email lookup vs the user cache.
+
+Runs the API in-process against a temporary SQLite database and counts
+the SQL statements each request executes. "before" uses tokens without
+the user id claim (the old per-request `SELECT ... WHERE email = ?`
+path); "after" uses tokens issued by /auth/login, resolved from the
+user cache.
+
+Needs Redis at REDIS_URL, or fakeredis installed to run without one.
+
+    python -m benchmarks.auth --requests 500
+"""
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+os.environ["DB_URI"] = "sqlite+aiosqlite:///" + os.path.join(
+    tempfile.mkdtemp(), "bench.db"
+)
+
+import httpx
+from sqlalchemy import event
+
+from app.auth.cache import user_cache
+from app.db.session import engine
+from app.main import app
+from app.models import Base
+from app.utils.jwt import create_access_token
+from benchmarks.stubs import use_sqlite_timestamps
+
+try:
+    import fakeredis
+
+    user_cache.client = fakeredis.FakeAsyncRedis()
+except ImportError:
+    pass
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+        event.listen(engine.sync_engine, "before_cursor_execute", self.on_execute)
+
+    def on_execute(self, *args):
+        self.count += 1
+
+
+async def measure(client, path, headers, requests, counter):
+    counter.count = 0
+    start = time.perf_counter()
+    for _ in range(requests):
+        response = await client.get(path, headers=headers)
+        response.raise_for_status()
+    elapsed = time.perf_counter() - start
+    return counter.count / requests, elapsed / requests * 1000
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    use_sqlite_timestamps(Base.metadata)  # DB_URI is SQLite here
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    counter = QueryCounter()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        user = {"email": "bench@example.com", "password": "pw", "full_name": "Bench"}
+        await client.post("/api/v1/auth/register", json=user)
+        response = await client.post(
+            "/api/v1/auth/login", json={"email": user["email"], "password": "pw"}
+        )
+        tokens = {
+            "before": create_access_token({"sub": user["email"]}),
+            "after": response.json()["access_token"],
+        }
+
+        print(f"{args.requests} requests each\n")
+        for path in ("/api/v1/auth/me", "/api/v1/chats/"):
+            print(path)
+            for name, token in tokens.items():
+                headers = {"Authorization": f"Bearer {token}"}
+                queries, latency = await measure(
+                    client, path, headers, args.requests, counter
+                )
+                print(f"  {name:<7} {queries:5.2f} queries/request  {latency:6.2f} ms")
+            print()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
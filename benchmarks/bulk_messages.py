@@ -0,0 +1,111 @@
+"""
+Importing chat history: one POST per message vs the bulk endpoint.
+
+Runs the API in-process against a temporary SQLite database and imports
+--messages messages spread over --chats chats both ways, counting the SQL
+statements each approach executes.
+
+Needs Redis at REDIS_URL, or fakeredis installed to run without one.
+
+    python -m benchmarks.bulk_messages --messages 5000 --chats 10
+"""
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+os.environ["DB_URI"] = "sqlite+aiosqlite:///" + os.path.join(
+    tempfile.mkdtemp(), "bench.db"
+)
+
+import httpx
+from sqlalchemy import event
+
+from app.auth import rate_limit
+from app.auth.cache import user_cache
+from app.db.session import engine
+from app.main import app
+from app.models import Base
+from benchmarks.stubs import use_sqlite_timestamps
+
+try:
+    import fakeredis
+
+    user_cache.client = fakeredis.FakeAsyncRedis()
+    rate_limit.redis_client = fakeredis.FakeAsyncRedis()
+except ImportError:
+    pass
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--chats", type=int, default=10)
+    args = parser.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    use_sqlite_timestamps(Base.metadata)  # DB_URI is SQLite here
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    statements = 0
+
+    def count(*_):
+        nonlocal statements
+        statements += 1
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        user = {"email": "bench@example.com", "password": "pw", "full_name": "Bench"}
+        await client.post("/api/v1/auth/register", json=user)
+        response = await client.post(
+            "/api/v1/auth/login", json={"email": user["email"], "password": "pw"}
+        )
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        chat_ids = []
+        for i in range(args.chats):
+            response = await client.post(
+                "/api/v1/chats/", json={"title": f"chat {i}"}, headers=headers
+            )
+            chat_ids.append(response.json()["id"])
+
+        messages = [
+            {
+                "chat_id": chat_ids[i % args.chats],
+                "role": "user" if i % 2 == 0 else "assistant",
+                "content": f"historical message {i} " + "lorem ipsum " * 20,
+            }
+            for i in range(args.messages)
+        ]
+        print(f"{args.messages:,} messages across {args.chats} chats\n")
+
+        statements = 0
+        start = time.perf_counter()
+        for message in messages:
+            response = await client.post(
+                f"/api/v1/chats/{message['chat_id']}/messages",
+                json={"role": message["role"], "content": message["content"]},
+                headers=headers,
+            )
+            response.raise_for_status()
+        elapsed = time.perf_counter() - start
+        print(f"one by one: {elapsed:7.2f}s  {statements:6,} statements")
+
+        statements = 0
+        start = time.perf_counter()
+        response = await client.post(
+            "/api/v1/chats/messages/bulk", json={"messages": messages}, headers=headers
+        )
+        response.raise_for_status()
+        elapsed = time.perf_counter() - start
+        print(f"bulk:       {elapsed:7.2f}s  {statements:6,} statements")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
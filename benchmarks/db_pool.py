@@ -0,0 +1,108 @@
+"""
+Per-request DB overhead: the old engine (echo=True, default 5+10 pool) vs
+the settings-driven engine (pool sized for the load, slow-query-only logging).
+With an undersized pool, overflow connections are opened and closed on
+almost every burst; the pool metrics show the connects.
+
+Uses SQLite+aiosqlite as a local stand-in for MySQL. Each simulated request
+opens a session, looks a user up by id and closes the session, with
+--concurrency requests in flight. Echo output goes to /dev/null so the cost
+measured is statement logging itself, not the terminal.
+
+    python -m benchmarks.db_pool --requests 5000 --concurrency 32
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.engine import build_engine, pool_status
+from app.models import Base, User
+
+
+class Discard(io.TextIOBase):
+    """A stdout that drops everything written to it."""
+
+    def write(self, text: str) -> int:
+        return len(text)
+
+
+async def seed(engine, users: int):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with sessionmaker(bind=engine, class_=AsyncSession)() as session:
+        session.add_all(
+            User(email=f"user{i}@example.com", hashed_password="x", full_name="U")
+            for i in range(users)
+        )
+        await session.commit()
+
+
+async def load(engine, requests: int, concurrency: int, users: int) -> list:
+    Session = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i):
+        async with semaphore:
+            start = time.perf_counter()
+            async with Session() as session:
+                result = await session.execute(
+                    select(User).where(User.id == i % users + 1)
+                )
+                result.scalar_one()
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return latencies
+
+
+async def run(name, engine, args):
+    await load(engine, 200, args.concurrency, args.users)  # warm the pool
+    start = time.perf_counter()
+    latencies = await load(engine, args.requests, args.concurrency, args.users)
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return (
+        f"{name:<10} {args.requests / elapsed:8,.0f} req/s  "
+        f"mean {statistics.mean(latencies) * 1000:6.2f} ms  "
+        f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:6.2f} ms"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--users", type=int, default=1000)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    url = f"sqlite+aiosqlite:///{path}"
+    await seed(create_async_engine(url), args.users)
+    print(f"{args.requests:,} requests, concurrency {args.concurrency}\n")
+
+    # The echo handler binds to sys.stdout when the engine is created
+    with contextlib.redirect_stdout(Discard()):
+        before = create_async_engine(url, echo=True, future=True)
+        report = await run("before", before, args)
+        await before.dispose()
+    print(report)
+
+    # Sized for the concurrency, as DB_POOL_SIZE should be for a worker
+    after = build_engine(url, pool_size=args.concurrency)
+    print(await run("after", after, args))
+    print(f"\npool after: {pool_status(after)}")
+    await after.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,65 @@
+"""
+p50 latency of calculator queries: deterministic fast path vs the full agent.
+
+The agent runs against a stubbed chat model with the given per-call latency
+(each query costs two LLM calls: choose the tool, then phrase the answer).
+
+    python -m benchmarks.fast_path --latency 0.4
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.prebuilt import create_react_agent
+
+from app.agents.agent import tools
+from app.agents.executor import run_agent
+from app.agents.quota import token_budget
+from app.core.config import settings
+from benchmarks.stubs import StubChatModel
+
+QUERIES = [
+    "monthly payment on a 300k loan at 6.5% for 30 years",
+    "What's the payment on a $250,000 mortgage at 7% over 15 years?",
+    "how much tax on 80k single",
+    "If I save 200 per month for 12 months, how much will I have?",
+    "invest 10k with 500 per month at 7% for 20 years",
+]
+
+
+async def p50(agent, rounds: int) -> float:
+    latencies = []
+    for i in range(rounds):
+        for j, query in enumerate(QUERIES):
+            start = time.perf_counter()
+            await run_agent(query, f"t{i}-{j}", agent=agent)
+            latencies.append(time.perf_counter() - start)
+    return statistics.median(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.4)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+    settings.RESPONSE_CACHE_ENABLED = False
+    settings.SINGLE_FLIGHT_ENABLED = False
+    token_budget.daily_tokens = 0
+
+    agent = create_react_agent(
+        StubChatModel(latency=args.latency), tools, checkpointer=MemorySaver()
+    )
+    for enabled in (False, True):
+        settings.FAST_PATH_ENABLED = enabled
+        median = asyncio.run(p50(agent, args.rounds))
+        label = "fast path" if enabled else "agent"
+        print(f"{label:>9}: p50 {median * 1000:,.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
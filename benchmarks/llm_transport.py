@@ -0,0 +1,156 @@
+"""
+LLM tail latency: the SDK's default client vs ResilientTransport.
+
+Starts a mock OpenAI-compatible server on localhost. Most completions take
+--latency seconds, a --slow-rate fraction take --slow-latency, and an
+--error-rate fraction answer 503. It then sends --requests ChatOpenAI
+calls (--concurrency at a time) three ways:
+    - the SDK's default client and retries
+    - ResilientTransport (pooled client, per-attempt timeout, jittered retries)
+    - ResilientTransport with hedging after the recent p95
+The transport's retry backoff starts at --backoff; the SDK's at 0.5s.
+Reports p50/p95/p99 latency, failures and the transport's counters. Every
+mode sees the same sequence of server behaviour (seeded). The mock speaks
+HTTP/1.1, so HTTP/2 is only used against servers that offer it over TLS.
+
+    python -m benchmarks.llm_transport --requests 400 --concurrency 16
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+import httpx
+import openai
+import uvicorn
+from fastapi import FastAPI, Response
+from langchain_openai import ChatOpenAI
+
+from app.agents.transport import ResilientTransport, llm_timeout
+from app.core.config import settings
+
+
+def mock_openai(args) -> FastAPI:
+    app = FastAPI()
+    app.state.rng = random.Random(0)
+
+    @app.post("/v1/chat/completions")
+    async def completions(response: Response):
+        roll = app.state.rng.random()
+        if roll < args.error_rate:
+            response.status_code = 503
+            return {"error": {"message": "overloaded", "type": "server_error"}}
+        slow = roll < args.error_rate + args.slow_rate
+        await asyncio.sleep(args.slow_latency if slow else args.latency)
+        return {
+            "id": "chatcmpl-mock",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": "gpt-4o-mini",
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "ok"},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 1, "total_tokens": 11},
+        }
+
+    return app
+
+
+async def serve(app: FastAPI) -> tuple[uvicorn.Server, asyncio.Task, str]:
+    config = uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning")
+    server = uvicorn.Server(config)
+    task = asyncio.create_task(server.serve())
+    for _ in range(500):  # uvicorn has no startup event; poll for up to 5s
+        if server.started:
+            break
+        await asyncio.sleep(0.01)
+    else:
+        raise RuntimeError("stub upstream did not start")
+    port = server.servers[0].sockets[0].getsockname()[1]
+    return server, task, f"http://127.0.0.1:{port}/v1"
+
+
+async def run(llm: ChatOpenAI, requests: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, failures = [], 0
+
+    async def one():
+        nonlocal failures
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await llm.ainvoke("hi")
+            except openai.APIError:
+                failures += 1
+                return
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return latencies, failures
+
+
+def quantile(values: list, q: float) -> float:
+    return statistics.quantiles(values, n=100)[q - 1] if len(values) > 1 else 0.0
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--slow-latency", type=float, default=1.5)
+    parser.add_argument("--slow-rate", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.03)
+    parser.add_argument("--backoff", type=float, default=0.05)
+    args = parser.parse_args()
+    settings.LLM_RETRY_BACKOFF_SECONDS = args.backoff
+
+    app = mock_openai(args)
+    server, serving, base_url = await serve(app)
+    modes = {
+        "SDK default": None,
+        "transport": ResilientTransport(hedge=False),
+        "transport + hedge": ResilientTransport(hedge=True),
+    }
+    print(
+        f"{args.requests} requests, {args.concurrency} concurrent; "
+        f"{args.slow_rate:.0%} slow ({args.slow_latency:g}s), "
+        f"{args.error_rate:.0%} 503\n"
+    )
+    for name, transport in modes.items():
+        app.state.rng = random.Random(0)
+        if transport is None:
+            llm = ChatOpenAI(model="gpt-4o-mini", base_url=base_url)
+        else:
+            client = httpx.AsyncClient(transport=transport, timeout=llm_timeout())
+            llm = ChatOpenAI(
+                model="gpt-4o-mini",
+                base_url=base_url,
+                http_async_client=client,
+                timeout=llm_timeout(),
+                max_retries=0,
+            )
+        latencies, failures = await run(llm, args.requests, args.concurrency)
+        print(
+            f"{name:>18}: p50 {quantile(latencies, 50) * 1000:6.0f} ms  "
+            f"p95 {quantile(latencies, 95) * 1000:6.0f} ms  "
+            f"p99 {quantile(latencies, 99) * 1000:6.0f} ms  failed {failures}"
+        )
+        if transport is not None:
+            print(f"{'':>18}  {transport.stats()}")
+            await client.aclose()
+
+    server.should_exit = True
+    await serving
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
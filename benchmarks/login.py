@@ -0,0 +1,72 @@
+"""
+Login burst: bcrypt on the event loop vs the password-hashing pool.
+
+Fires --logins concurrent password checks and, alongside them, a ticker
+standing in for agent traffic that should run every 10 ms. Reports login
+throughput and how long the ticker was held up (event-loop stall).
+
+    python -m benchmarks.login --logins 64 --rounds 12
+"""
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from passlib.context import CryptContext
+
+from app.auth.passwords import PasswordHasher
+
+
+async def ticker(stop: asyncio.Event, interval: float = 0.01) -> float:
+    """Largest delay past the expected wake-up time."""
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - start - interval)
+    return worst
+
+
+async def burst(check, logins: int):
+    stop = asyncio.Event()
+    tick = asyncio.create_task(ticker(stop))
+    await asyncio.sleep(0.05)
+    start = time.perf_counter()
+    await asyncio.gather(*(check() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    return elapsed, await tick
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=args.rounds)
+    hashed = context.hash("correct horse")
+
+    async def inline():
+        # What the handlers did before: bcrypt directly in the coroutine
+        assert context.verify("correct horse", hashed)
+
+    hasher = PasswordHasher(workers=args.workers, max_pending=args.logins)
+
+    async def pooled():
+        assert await hasher.verify("correct horse", hashed)
+
+    print(f"{args.logins} concurrent logins, bcrypt cost {args.rounds}\n")
+    for name, check in (("inline", inline), (f"pool x{args.workers}", pooled)):
+        elapsed, stall = await burst(check, args.logins)
+        print(
+            f"{name:<10} {args.logins / elapsed:7.1f} logins/s  "
+            f"event loop stalled up to {stall * 1000:7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
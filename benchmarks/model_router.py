@@ -0,0 +1,118 @@
+"""
+Cheap-first model routing vs sending every query to the large model.
+
+Runs a mix of queries (mostly calculator-style, some open-ended planning
+questions, and some whose first tool call fails) through the agent with
+stubbed small and large models: fast and cheap vs slow and expensive,
+priced as in MODEL_TIERS. Reports latency and cost per query both ways,
+then the per-tier stats the router recorded.
+
+Needs Redis at REDIS_URL, or fakeredis installed to run without one.
+
+    python -m benchmarks.model_router --queries 60
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.prebuilt import create_react_agent
+
+from app.agents.agent import tools
+from app.agents.model_router import ModelRouter, RouteMetrics
+from app.core.redis import redis_client
+from benchmarks.stubs import StubChatModel
+
+try:
+    import fakeredis
+
+    client = fakeredis.FakeAsyncRedis()
+except ImportError:
+    client = redis_client
+
+USAGE = {"input_tokens": 1200, "output_tokens": 150, "total_tokens": 1350}
+
+# (query, tool args the stub calls); bad arguments make the tool fail
+QUERIES = [
+    ("What is my budget surplus on 5k income?", {"expenses": "rent:1500,food:600"}),
+    ("Make me a budget for 5000 a month", {"expenses": "rent:1500,food:600"}),
+    ("Break down my monthly budget", {"expenses": "rent 1500"}),  # tool fails
+    (
+        (
+            "Should I pay off my credit card debt first or invest and save for "
+            "retirement, and how does my budget change?"
+        ),
+        {"expenses": "rent:1500,food:600"},
+    ),
+]
+
+
+async def run(agent, queries: int) -> list[float]:
+    latencies = []
+    for i in range(queries):
+        query, _ = QUERIES[i % len(QUERIES)]
+        start = time.perf_counter()
+        await agent.ainvoke(
+            {"messages": [("user", query)]},
+            config={"configurable": {"thread_id": f"t{i}"}},
+        )
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+class QueryStub(StubChatModel):
+    """Calls budget_planner with the arguments of the query being run."""
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        query = next(m.content for m in messages if m.type == "human")
+        args = dict(next(a for q, a in QUERIES if q == query))
+        self.tool_name, self.tool_args = "budget_planner", {"income": 5000, **args}
+        return await super()._agenerate(messages, stop, run_manager, **kwargs)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--queries", type=int, default=60)
+    parser.add_argument("--small-latency", type=float, default=0.02)
+    parser.add_argument("--large-latency", type=float, default=0.08)
+    args = parser.parse_args()
+
+    models = {
+        "small": QueryStub(latency=args.small_latency, usage=USAGE),
+        "large": QueryStub(latency=args.large_latency, usage=USAGE),
+    }
+    results = {}
+    # A confidence above 1 is never reached, so every call goes to the large tier
+    for name, min_confidence in (("large only", 1.01), ("routed", None)):
+        metrics = RouteMetrics(client=client, prefix=f"bench_router:{name}")
+        await client.delete(f"bench_router:{name}:stats")
+        model = ModelRouter(
+            models, tools, metrics=metrics, min_confidence=min_confidence
+        )
+        agent = create_react_agent(model, tools, checkpointer=MemorySaver())
+        latencies = await run(agent, args.queries)
+        stats = await metrics.stats()
+        cost = sum(t["cost_usd"] for t in stats["tiers"].values())
+        results[name] = (statistics.median(latencies), cost, stats)
+
+    for name, (p50, cost, _) in results.items():
+        print(
+            f"{name:>10}: p50 {p50 * 1000:6.1f} ms per query, "
+            f"${cost / args.queries * 1000:.3f} per 1000 queries"
+        )
+    print("\nrouted stats:")
+    stats = results["routed"][2]
+    for tier, tier_stats in stats["tiers"].items():
+        print(
+            f"{tier:>10}: {tier_stats['calls']} calls, "
+            f"avg {tier_stats['avg_latency_ms']:.1f} ms, ${tier_stats['cost_usd']:.4f}"
+        )
+    print(f"escalations: {stats['escalations']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,127 @@
+"""
+Multi-tool turns: tool calls one after another vs ParallelToolNode.
+
+The stubbed model asks for --calls tool calls in one message (Monte Carlo
+simulations and scenario sweeps mixed with light calculators, with
+distinct arguments so nothing is coalesced). Reports the latency of the
+whole turn with the calls run sequentially, with the prebuilt ToolNode,
+and with ParallelToolNode (CPU-heavy calls in a process pool). Process
+parallelism needs more than one core.
+
+    python -m benchmarks.parallel_tools --calls 6 --rounds 3
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.prebuilt import ToolNode, create_react_agent
+
+from app.agents.agent import tools
+from app.agents.tool_node import ParallelToolNode
+from app.agents.tool_pool import get_tool_pool, shutdown_tool_pool
+from app.core.config import settings
+from benchmarks.stubs import StubChatModel
+
+tools_by_name = {t.name: t for t in tools}
+
+
+def tool_calls(count: int) -> list:
+    calls = []
+    for i in range(count):
+        if i % 3 == 0:
+            calls.append({
+                "name": "monte_carlo_simulation",
+                "args": {
+                    "current_savings": 10_000 + i,
+                    "monthly_contribution": 500,
+                    "years": 30,
+                },
+            })
+        elif i % 3 == 1:
+            calls.append({
+                "name": "scenario_sweep",
+                "args": {
+                    "calculator": "retirement_calculator",
+                    "grid": (
+                        "current_age:30;retirement_age:60..70..1;"
+                        f"current_savings:{i}..100000..500;"
+                        "monthly_contribution:100..2000..100;annual_return:4..9..1"
+                    ),
+                },
+            })
+        else:
+            calls.append({
+                "name": "budget_planner",
+                "args": {
+                    "income": 5000 + i,
+                    "expenses": "rent:1500,food:600,transport:300",
+                },
+            })
+    return calls
+
+
+async def sequential_turn(calls: list):
+    # Reference: each call awaited before the next starts
+    for call in calls:
+        await tools_by_name[call["name"]].ainvoke(call["args"])
+
+
+async def graph_turn(agent, thread: str):
+    await agent.ainvoke(
+        {"messages": [("user", "compare my options")]},
+        config={"configurable": {"thread_id": thread}},
+    )
+
+
+async def p50(turn, rounds: int) -> float:
+    latencies = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        await turn()
+        latencies.append(time.perf_counter() - start)
+    return statistics.median(latencies)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=6)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+    settings.SINGLE_FLIGHT_ENABLED = False
+    calls = tool_calls(args.calls)
+    model = StubChatModel(latency=0, tool_calls=calls)
+
+    # Start the worker processes outside the measurements
+    pool = get_tool_pool()
+    if pool is not None:
+        await asyncio.gather(*(
+            asyncio.get_running_loop().run_in_executor(pool, abs, 0)
+            for _ in range(settings.TOOL_PROCESS_WORKERS)
+        ))
+
+    stock = create_react_agent(model, ToolNode(tools), checkpointer=MemorySaver())
+    parallel = create_react_agent(
+        model, ParallelToolNode(tools), checkpointer=MemorySaver()
+    )
+    counter = iter(range(10**6))
+    modes = [
+        ("sequential", lambda: sequential_turn(calls)),
+        ("ToolNode", lambda: graph_turn(stock, f"s{next(counter)}")),
+        ("ParallelToolNode", lambda: graph_turn(parallel, f"p{next(counter)}")),
+    ]
+    print(
+        f"{args.calls} tool calls per turn, {os.cpu_count()} CPU(s), "
+        f"{settings.TOOL_PROCESS_WORKERS} tool processes\n"
+    )
+    for name, turn in modes:
+        print(f"{name:>16}: p50 {await p50(turn, args.rounds) * 1000:8.1f} ms per turn")
+    shutdown_tool_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,75 @@
+"""
+Large PDF reports: list story rendered to bytes vs the lazy file render.
+
+Renders a report with --paragraphs transcript paragraphs both ways and
+reports time, peak Python memory (tracemalloc) and output size. The list
+version builds every flowable up front and returns the PDF as one bytes
+object; the file version pulls flowables lazily and writes the PDF to
+disk, as the report jobs do.
+
+    python -m benchmarks.pdf_report --paragraphs 5000
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from reportlab.platypus import Paragraph
+
+from app.services.pdf_generator import (
+    generate_financial_report,
+    get_styles,
+    render_report_file,
+)
+
+USER = {"name": "Bench", "monthly_income": 5000, "monthly_expenses": 3200}
+
+
+def transcript(count: int):
+    style = get_styles()["Normal"]
+    for i in range(count):
+        role = "user" if i % 2 == 0 else "assistant"
+        text = f"<b>{role}</b>: message {i} " + "lorem ipsum dolor " * 12
+        yield Paragraph(text, style)
+
+
+def measure(render):
+    tracemalloc.start()
+    start = time.perf_counter()
+    size = render()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, size
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--paragraphs", type=int, default=5000)
+    args = parser.parse_args()
+    get_styles()  # built once per process; keep it out of the measurements
+
+    def as_list():
+        sections = list(transcript(args.paragraphs))
+        return len(generate_financial_report(USER, "summary", sections))
+
+    def to_file():
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "report.pdf")
+            render_report_file(USER, "summary", path, transcript(args.paragraphs))
+            return os.path.getsize(path)
+
+    print(f"report with {args.paragraphs:,} transcript paragraphs\n")
+    for name, render in (("list + bytes", as_list), ("lazy file", to_file)):
+        elapsed, peak, size = measure(render)
+        print(
+            f"{name:<13} {elapsed:6.2f}s  peak {peak / 2**20:7.1f} MiB  "
+            f"output {size / 2**20:5.1f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Identical first messages arriving together: one agent run each vs shared.
+
+Sends --requests concurrent copies of the same question, each to a new
+thread, through run_agent with a stubbed LLM, with single-flight off and
+on. Counts LLM calls and wall time. Then shows coalescing across workers:
+two SingleFlight instances (separate in-flight maps, as in two processes)
+sharing one Redis.
+
+Needs Redis at REDIS_URL, or fakeredis installed to run without one.
+
+    python -m benchmarks.single_flight --requests 50 --latency 0.2
+"""
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.prebuilt import create_react_agent
+
+from app.agents import singleflight
+from app.agents.agent import tools
+from app.agents.executor import run_agent
+from app.agents.quota import token_budget
+from app.core.config import settings
+from app.core.redis import redis_client
+from benchmarks.stubs import StubChatModel
+
+try:
+    import fakeredis
+
+    client = fakeredis.FakeAsyncRedis()
+except ImportError:
+    client = redis_client
+
+
+class CountingChatModel(StubChatModel):
+    calls: int = 0
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.calls += 1
+        return await super()._agenerate(messages, stop, run_manager, **kwargs)
+
+
+async def burst(requests: int, latency: float, enabled: bool):
+    settings.SINGLE_FLIGHT_ENABLED = enabled
+    model = CountingChatModel(latency=latency)
+    agent = create_react_agent(model, tools, checkpointer=MemorySaver())
+    query = f"what should I prioritise, saving or investing? ({enabled})"
+    start = time.perf_counter()
+    answers = await asyncio.gather(
+        *(
+            run_agent(query, f"t{enabled}{i}", agent=agent, user_key=f"u{i}")
+            for i in range(requests)
+        )
+    )
+    assert len(set(answers)) == 1
+    return time.perf_counter() - start, model.calls
+
+
+async def across_workers(requests: int, latency: float):
+    workers = [singleflight.SingleFlight("bench", client=client) for _ in range(2)]
+    runs = 0
+
+    async def compute():
+        nonlocal runs
+        runs += 1
+        await asyncio.sleep(latency)
+        return "answer"
+
+    await asyncio.gather(
+        *(workers[i % 2].do("same-question", compute) for i in range(requests))
+    )
+    return runs, await workers[0].stats()
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args()
+    # Measure coalescing alone: no response cache, fast path or quotas
+    settings.RESPONSE_CACHE_ENABLED = False
+    settings.FAST_PATH_ENABLED = False
+    token_budget.daily_tokens = 0
+    singleflight.agent_flight.client = client
+
+    print(f"{args.requests} identical first messages, {args.latency}s per LLM call\n")
+    for enabled in (False, True):
+        elapsed, calls = await burst(args.requests, args.latency, enabled)
+        label = "single-flight" if enabled else "independent"
+        print(f"{label:>13}: {elapsed:5.2f}s  {calls:4} LLM calls")
+
+    runs, stats = await across_workers(args.requests, args.latency)
+    print(
+        f"\n2 workers sharing Redis: {runs} computation(s) "
+        f"for {args.requests} calls; coalesced local {stats['coalesced_local']}, "
+        f"remote {stats['coalesced_remote']}"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
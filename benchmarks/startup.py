@@ -0,0 +1,105 @@
+"""
+API startup cost, from `python -X importtime -c "import app.main"`.
+
+Each run imports the app in a fresh interpreter and reports the total
+import time and the packages that cost the most. Exits non-zero when
+startup regresses, so it can gate CI:
+    - a module that must stay lazy (the agent, LangChain's OpenAI client,
+      LangGraph) is imported by the app module graph
+    - the median import time exceeds --max-ms
+
+The agent warm-up the lifespan runs afterwards is timed separately.
+
+    python -m benchmarks.startup --runs 5 --max-ms 2500
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+# Must not be imported until the agent is first used (see app.agents.agent)
+LAZY_MODULES = ("app.agents.agent", "langchain_openai", "openai", "langgraph")
+ENV = {**os.environ, "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY", "sk-benchmark")}
+
+
+def import_profile() -> dict[str, tuple[int, int]]:
+    """{module: (self us, cumulative us)} for one fresh import of app.main."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        capture_output=True,
+        text=True,
+        env=ENV,
+        check=True,
+    )
+    profile = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        profile[name.strip()] = (int(own), int(cumulative))
+    return profile
+
+
+def top_packages(profile: dict, count: int) -> list[tuple[str, int]]:
+    """Top-level packages by the import time of all their modules."""
+    totals = {}
+    for name, (own, _) in profile.items():
+        package = name.split(".")[0]
+        totals[package] = totals.get(package, 0) + own
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)[:count]
+
+
+def warm_up_ms() -> float:
+    code = (
+        "import time; import app.main; start = time.perf_counter(); "
+        "from app.agents.agent import warm_up; warm_up(); "
+        "print((time.perf_counter() - start) * 1000)"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        env=ENV,
+        check=True,
+    )
+    return float(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, default=2500, help="0 = no time budget")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    import_profile()  # first run compiles bytecode; not measured
+    profiles = [import_profile() for _ in range(args.runs)]
+    totals = [p["app.main"][1] / 1000 for p in profiles]
+    median = statistics.median(totals)
+
+    print(
+        f"import app.main: p50 {median:.0f} ms, min {min(totals):.0f} ms "
+        f"({args.runs} runs)\n"
+    )
+    for package, own in top_packages(profiles[0], args.top):
+        print(f"{package:>20}: {own / 1000:7.1f} ms")
+    print(f"\nagent warm-up (lifespan): {warm_up_ms():.0f} ms")
+
+    failures = []
+    loaded = [
+        m for m in profiles[0] if m.split(".")[0] in LAZY_MODULES or m in LAZY_MODULES
+    ]
+    if loaded:
+        failures.append("imported at startup: " + ", ".join(sorted(loaded)[:10]))
+    if args.max_ms and median > args.max_ms:
+        failures.append(
+            f"import time {median:.0f} ms is over the {args.max_ms:.0f} ms budget"
+        )
+    for failure in failures:
+        print(f"FAIL {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
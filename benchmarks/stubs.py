@@ -0,0 +1,83 @@
+"""Offline stand-ins used by the benchmark scripts (no OpenAI calls, SQLite)."""
+import asyncio
+import time
+from typing import Any
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import Field
+from sqlalchemy import DateTime, MetaData
+from sqlalchemy.dialects import sqlite
+
+
+class StubChatModel(BaseChatModel):
+    """
+    Chat model that simulates upstream latency.
+
+    The first turn calls `tool_name` with `tool_args` (or every call in
+    `tool_calls`, as one message), the second turn answers with the tool
+    output, so a run exercises the full ReAct loop.
+    """
+
+    latency: float = 0.05
+    tool_name: str = "savings_calculator"
+    tool_args: dict = Field(default_factory=lambda: {"amount": 200, "months": 12})
+    tool_calls: list = Field(default_factory=list)  # [{"name": ..., "args": {...}}]
+    # usage_metadata reported on every reply, e.g. for cost stats
+    usage: dict = Field(default_factory=dict)
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _reply(self, messages: list[BaseMessage]) -> ChatResult:
+        if isinstance(messages[-1], ToolMessage):
+            message = AIMessage(content=f"Result: {messages[-1].content}")
+        else:
+            default = {"name": self.tool_name, "args": self.tool_args}
+            calls = self.tool_calls or [default]
+            message = AIMessage(
+                content="",
+                tool_calls=[
+                    {**call, "id": f"call_{i + 1}"} for i, call in enumerate(calls)
+                ],
+            )
+        if self.usage:
+            message.usage_metadata = self.usage
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(
+        self, messages: list[BaseMessage], stop: list[str] | None = None,
+        run_manager: Any = None, **kwargs: Any,
+    ) -> ChatResult:
+        time.sleep(self.latency)
+        return self._reply(messages)
+
+    async def _agenerate(
+        self, messages: list[BaseMessage], stop: list[str] | None = None,
+        run_manager: Any = None, **kwargs: Any,
+    ) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        return self._reply(messages)
+
+
+def use_sqlite_timestamps(metadata: MetaData):
+    """
+    Bind datetimes on SQLite in CURRENT_TIMESTAMP's text format.
+
+    SQLite stores server-default timestamps as "YYYY-MM-DD HH:MM:SS" and
+    compares them as text, so keyset cursors only line up with them when
+    bound values use the same format. Other dialects are unaffected.
+    """
+    timestamp = sqlite.DATETIME(
+        storage_format="%(year)04d-%(month)02d-%(day)02d "
+        "%(hour)02d:%(minute)02d:%(second)02d"
+    )
+    for table in metadata.tables.values():
+        for column in table.columns:
+            if isinstance(column.type, DateTime):
+                column.type = column.type.with_variant(timestamp, "sqlite")
@@ -0,0 +1,101 @@
+"""
+Size of what the model reads back from each tool: formatted text vs compact JSON.
+
+Calls every financial tool once with typical arguments, the way ToolNode
+does, and compares the text the tools used to return (the result's
+summary()) with the ToolMessage content the model now gets. Tokens are
+counted with tiktoken when it is installed, else estimated from characters.
+
+    python -m benchmarks.tool_outputs
+"""
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from app.agents.agent import tools
+from app.agents.tool_results import parse_result
+
+try:
+    import tiktoken
+
+    _encoding = tiktoken.get_encoding("o200k_base")  # downloaded on first use
+
+    def count_tokens(text: str) -> int:
+        return len(_encoding.encode(text))
+
+    TOKENIZER = "tiktoken o200k_base"
+except (ImportError, OSError, ValueError):  # not installed, or no encoding
+    from langchain_core.messages import HumanMessage
+    from langchain_core.messages.utils import count_tokens_approximately
+
+    def count_tokens(text: str) -> int:
+        return count_tokens_approximately([HumanMessage(text)])
+
+    TOKENIZER = "approximate (~4 chars per token)"
+
+CALLS = {
+    "savings_calculator": {"amount": 500, "months": 24},
+    "compound_interest": {
+        "principal": 10000,
+        "monthly_contrib": 500,
+        "annual_rate": 7,
+        "years": 20,
+    },
+    "loan_payment_calculator": {"principal": 300000, "annual_rate": 6.5, "years": 30},
+    "portfolio_analyzer": {"investments": "stocks:60,bonds:30,cash:10"},
+    "budget_planner": {
+        "income": 6000,
+        "expenses": "rent:1800,food:700,transport:400,utilities:250,fun:500",
+    },
+    "retirement_calculator": {
+        "current_age": 35, "retirement_age": 65, "current_savings": 50000,
+        "monthly_contribution": 1000, "annual_return": 7,
+    },
+    "debt_payoff_calculator": {
+        "debt_amount": 15000,
+        "interest_rate": 19.9,
+        "payment_strategies": "minimum:300,moderate:500,aggressive:800",
+    },
+    "emergency_fund_calculator": {"monthly_expenses": 3500, "current_savings": 8000},
+    "tax_calculator": {"income": 95000, "filing_status": "married", "state": "CA"},
+    "scenario_sweep": {
+        "calculator": "loan_payment_calculator",
+        "grid": "principal:300000;annual_rate:5..7..0.5;years:15,30",
+    },
+    "monte_carlo_simulation": {
+        "current_savings": 50000, "monthly_contribution": 1000, "years": 20,
+        "target_amount": 1000000,
+    },
+}
+
+
+def row(name, text_chars, text_tokens, compact_chars, compact_tokens) -> str:
+    return (
+        f"{name:>26}  {text_chars:>10} {text_tokens:>6}  "
+        f"{compact_chars:>13} {compact_tokens:>6}"
+    )
+
+
+def main():
+    by_name = {t.name: t for t in tools}
+    rows = []
+    for name, args in CALLS.items():
+        message = by_name[name].invoke(
+            {"name": name, "args": args, "id": "benchmark", "type": "tool_call"}
+        )
+        text = parse_result(name, message.artifact).summary()
+        rows.append((name, text, str(message.content)))
+
+    print(f"tokens: {TOKENIZER}\n")
+    print(row("tool", "text chars", "tokens", "compact chars", "tokens"))
+    totals = [0, 0, 0, 0]
+    for name, text, compact in rows:
+        sizes = (len(text), count_tokens(text), len(compact), count_tokens(compact))
+        totals = [t + s for t, s in zip(totals, sizes, strict=True)]
+        print(row(name, *sizes))
+    print(row("total", *totals))
+    print(f"\ntool output tokens: -{1 - totals[3] / totals[1]:.0%}")
+
+
+if __name__ == "__main__":
+    main()
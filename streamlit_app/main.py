@@ -1,5 +1,5 @@
 import streamlit as st
-from utils.api_client import login, register, query_agent, create_chat, save_message, generate_report
+from utils.api_client import login, register, stream_query, create_chat, generate_report
 from datetime import datetime   
 
 st.title("Financial AI Agents")
@@ -67,25 +67,19 @@ if st.session_state.logged_in:
             # Add user message to display
             st.session_state.messages.append(("user", user_input))
             
-            # Save user message to database
-            save_result = save_message(st.session_state.current_chat_id, "user", user_input, st.session_state.auth_token)
-            
-            
-            # Get agent response
-            thread_id = st.session_state.get("current_thread_id", "default")
-            response = query_agent(user_input, thread_id)
-            
-            if response["success"]:
-                answer = response["data"]["answer"]
+            # Stream agent response (the API saves both messages when done)
+            try:
+                answer = st.write_stream(
+                    stream_query(
+                        user_input,
+                        st.session_state.current_chat_id,
+                        st.session_state.auth_token,
+                    )
+                )
                 st.session_state.messages.append(("assistant", answer))
-                
-                # Save assistant message
-                save_result = save_message(st.session_state.current_chat_id, "assistant", answer, st.session_state.auth_token)
-                
-                
                 st.rerun()
-            else:
-                st.error(f"Error: {response['error']}")
+            except Exception as e:
+                st.error(f"Error: {e}")
 
     with tab2:
                     st.write("Upload financial data functionality will go here")
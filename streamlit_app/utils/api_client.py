@@ -1,3 +1,5 @@
+import json
+import time
 import httpx
 
 BASE_URL = "http://localhost:8000"
@@ -141,16 +143,75 @@ def save_message(chat_id: int, role: str, content: str, token: str):
     except Exception as e:
         return {"success": False, "error": str(e)}
     
-def generate_report(token: str):
+def generate_report(token: str, timeout: float = 60.0):
+    """Start a report job, wait for it to finish and download the PDF."""
+    headers = {"Authorization": f"Bearer {token}"}
     try:
         response = httpx.post(
-            f"{BASE_URL}/api/v1/reports/generate",
-            headers={"Authorization": f"Bearer {token}"},
-            timeout=30.0
+            f"{BASE_URL}/api/v1/reports/generate", headers=headers, timeout=30.0
+        )
+        if response.status_code != 202:
+            return {"success": False, "error": f"HTTP {response.status_code}"}
+        job = response.json()
+
+        deadline = time.monotonic() + timeout
+        while job["status"] == "pending":
+            if time.monotonic() > deadline:
+                return {"success": False, "error": "Timed out waiting for the report"}
+            time.sleep(0.5)
+            response = httpx.get(
+                f"{BASE_URL}/api/v1/reports/jobs/{job['job_id']}",
+                headers=headers,
+                timeout=30.0,
+            )
+            if response.status_code != 200:
+                return {"success": False, "error": f"HTTP {response.status_code}"}
+            job = response.json()
+
+        if job["status"] != "done":
+            return {"success": False, "error": "Report generation failed"}
+        response = httpx.get(
+            f"{BASE_URL}{job['download_url']}", headers=headers, timeout=30.0
         )
         if response.status_code == 200:
             return {"success": True, "data": response.content}
         else:
             return {"success": False, "error": f"HTTP {response.status_code}"}
     except Exception as e:
-        return {"success": False, "error": str(e)}
\ No newline at end of file
+        return {"success": False, "error": str(e)}
+
+def stream_query(query: str, chat_id: int, token: str):
+    """
+    Stream the agent's answer for a chat as it is generated.
+
+    The API saves both the user and assistant messages when the answer
+    completes, so no separate save_message call is needed.
+
+    Args:
+        query: The user's question/message
+        chat_id: Chat the conversation belongs to
+        token: JWT access token
+
+    Yields:
+        str: Chunks of the assistant's answer
+    """
+    with httpx.stream(
+        "POST",
+        f"{BASE_URL}/api/v1/query/stream",
+        json={"query": query, "chat_id": chat_id},
+        headers={"Authorization": f"Bearer {token}"},
+        timeout=httpx.Timeout(30.0, read=None),  # tokens may arrive slowly
+    ) as response:
+        if response.status_code != 200:
+            raise RuntimeError(f"HTTP {response.status_code}")
+
+        event = None
+        for line in response.iter_lines():
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+            elif line.startswith("data: "):
+                data = json.loads(line[len("data: "):])
+                if event == "token":
+                    yield data["content"]
+                elif event == "error":
+                    raise RuntimeError(data["detail"])
@@ -0,0 +1,64 @@
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+
+from typing import List, Optional
+
+import pytest
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models import Base
+
+
+class FakeChatModel(BaseChatModel):
+    """Answers every call with `reply`, or with the next of `replies`."""
+
+    reply: str = "ok"
+    replies: list = []  # AIMessages returned in turn, then `reply`
+    usage: dict = {}
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager=None,
+        **kwargs,
+    ) -> ChatResult:
+        self.calls += 1
+        if self.replies:
+            message = self.replies.pop(0)
+        else:
+            message = AIMessage(content=self.reply)
+        if self.usage:
+            message.usage_metadata = self.usage
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+@pytest.fixture
+def redis():
+    fakeredis = pytest.importorskip("fakeredis")
+    return fakeredis.FakeAsyncRedis()
+
+
+@pytest.fixture
+async def session_factory():
+    """Sessions on an in-memory SQLite database with the app's tables."""
+    pytest.importorskip("aiosqlite")
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
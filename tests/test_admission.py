@@ -0,0 +1,29 @@
+import asyncio
+
+import pytest
+
+from app.agents.quota import AdmissionRejected, FairAdmission
+from app.agents.router import admission_rejected
+
+
+async def rejection(admission: FairAdmission, key: str) -> AdmissionRejected:
+    with pytest.raises(AdmissionRejected) as info:
+        await admission.acquire(key)
+    return info.value
+
+
+async def test_full_user_queue_is_429_and_full_worker_is_503():
+    admission = FairAdmission(limit=1, max_queued_per_key=1, max_queued=2)
+    await admission.acquire("a")  # running
+    waiters = [asyncio.create_task(admission.acquire(k)) for k in ("a", "b")]
+    await asyncio.sleep(0)
+
+    per_user = admission_rejected(await rejection(admission, "a"))
+    assert per_user.status_code == 429
+    assert per_user.headers["Retry-After"]
+
+    busy = admission_rejected(await rejection(admission, "c"))
+    assert busy.status_code == 503
+
+    for waiter in waiters:
+        waiter.cancel()
@@ -0,0 +1,22 @@
+import os
+import subprocess
+import sys
+
+HEAVY = ("langgraph", "langchain_openai", "openai")
+
+
+def test_tools_load_without_the_agent_stack():
+    # A fresh interpreter: this test session has already imported everything
+    code = (
+        "import sys, app.agents.agent, app.agents.tool_pool; "
+        f"print(sorted({{m.split('.')[0] for m in sys.modules}} & set({HEAVY!r})))"
+    )
+    env = {**os.environ, "OPENAI_API_KEY": "sk-test"}
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    assert out.stdout.strip() == "[]"
@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+
+from app.agents.cache import ResponseCache
+
+# Unit vectors per normalized query; "loan at 6%" and "a loan at 6%" are close
+VECTORS = {
+    "loan at 6%": [1.0, 0.0, 0.0],
+    "a loan at 6%": [0.99, 0.14, 0.0],
+    "tax on 80k": [0.0, 1.0, 0.0],
+    "budget for 5k": [0.0, 0.0, 1.0],
+}
+
+
+class FakeEmbeddings:
+    def __init__(self):
+        self.calls = 0
+
+    async def aembed_query(self, text: str) -> list[float]:
+        self.calls += 1
+        return VECTORS[text]
+
+
+def cache(redis, **kwargs) -> ResponseCache:
+    defaults = {"prefix": "test_cache", "ttl": 60, "max_entries": 10}
+    return ResponseCache(client=redis, **{**defaults, **kwargs})
+
+
+async def test_exact_tier_matches_the_normalized_query(redis):
+    exact = cache(redis, semantic=False)
+    await exact.set("Loan at 6%?", "answer")
+
+    assert await exact.get("  loan AT 6% ") == "answer"
+    assert await exact.get("tax on 80k") is None
+    stats = await exact.stats()
+    assert (stats["exact_hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+
+async def test_semantic_tier_reuses_close_queries(redis):
+    semantic = cache(redis, semantic=True, threshold=0.95, embeddings=FakeEmbeddings())
+    await semantic.set("loan at 6%", "loan answer")
+
+    assert await semantic.get("a loan at 6%") == "loan answer"
+    assert await semantic.get("tax on 80k") is None
+    assert (await semantic.stats())["semantic_hits"] == 1
+
+
+async def test_max_entries_evicts_the_least_recently_used(redis):
+    small = cache(redis, semantic=True, max_entries=2, embeddings=FakeEmbeddings())
+    await small.set("loan at 6%", "loan")
+    await small.set("tax on 80k", "tax")
+    assert await small.get("loan at 6%") == "loan"  # now more recent than tax
+    await small.set("budget for 5k", "budget")
+
+    assert await small.get("tax on 80k") is None
+    assert await small.get("loan at 6%") == "loan"
+    assert (await small.stats())["entries"] == 2
+    assert await redis.hlen("test_cache:vectors") == 2
+    await small._sync()
+    assert sorted(k for k in small.index.keys if k) == sorted(
+        [small.key_for("loan at 6%"), small.key_for("budget for 5k")]
+    )
+
+
+async def test_workers_sync_vectors_incrementally(redis, monkeypatch):
+    writer = cache(redis, semantic=True, embeddings=FakeEmbeddings())
+    reader = cache(redis, semantic=True, embeddings=FakeEmbeddings())
+    await writer.set("loan at 6%", "loan")
+    assert await reader.get("a loan at 6%") == "loan"  # first lookup loads all
+
+    full_loads = []
+    hgetall = redis.hgetall
+
+    async def counting_hgetall(key):
+        full_loads.append(key)
+        return await hgetall(key)
+
+    monkeypatch.setattr(redis, "hgetall", counting_hgetall)
+    await writer.set("tax on 80k", "tax")
+    assert await reader.get("tax on 80k") == "tax"  # exact tier
+    await writer.set("budget for 5k", "budget")
+    vector = np.asarray(VECTORS["budget for 5k"], dtype=np.float32)
+    assert await reader._nearest(vector) == reader.key_for("budget for 5k")
+
+    assert full_loads == []
+    assert len(reader.index) == 3
+
+
+@pytest.mark.parametrize("trimmed", [True, False])
+async def test_trimmed_change_log_reloads(redis, trimmed):
+    writer = cache(redis, semantic=True, embeddings=FakeEmbeddings())
+    reader = cache(redis, semantic=True, embeddings=FakeEmbeddings())
+    await writer.set("loan at 6%", "loan")
+    await reader._sync()
+    await writer.set("tax on 80k", "tax")
+    if trimmed:
+        await writer.set("budget for 5k", "budget")
+        await redis.xtrim("test_cache:vector_log", maxlen=1)
+
+    await reader._sync()
+    expected = {"loan at 6%", "tax on 80k"} | ({"budget for 5k"} if trimmed else set())
+    assert set(reader.index.rows) == {reader.key_for(q) for q in expected}
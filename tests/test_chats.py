@@ -0,0 +1,188 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event, select
+
+from app.api.v1 import chats
+from app.auth.cache import Principal
+from app.models import Chat, Message, User
+
+START = datetime(2026, 1, 1, 12, 0)
+
+
+async def setup_user(session_factory, count: int, tied: int = 0) -> Principal:
+    """A user with `count` chats; the last `tied` share one created_at."""
+    async with session_factory() as session:
+        user = User(email="a@example.com", hashed_password="x")
+        other = User(email="b@example.com", hashed_password="x")
+        for i in range(count):
+            step = min(i, count - tied) if tied else i
+            user.chats.append(
+                Chat(
+                    title=f"chat {i}",
+                    thread_id=f"t{i}",
+                    created_at=START + timedelta(minutes=step),
+                )
+            )
+        other.chats.append(Chat(title="other", thread_id="other", created_at=START))
+        session.add_all([user, other])
+        await session.commit()
+        return Principal(id=user.id, email=user.email)
+
+
+async def list_all(session_factory, user: Principal, limit: int) -> list[list[int]]:
+    pages, cursor = [], None
+    while True:
+        async with session_factory() as db:
+            page = await chats.get_user_chats(
+                limit=limit, cursor=cursor, current_user=user, db=db
+            )
+        pages.append([chat.id for chat in page["items"]])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+async def test_chat_pages_are_newest_first_and_disjoint(session_factory):
+    user = await setup_user(session_factory, 7)
+
+    pages = await list_all(session_factory, user, limit=3)
+
+    assert [len(page) for page in pages] == [3, 3, 1]
+    ids = [id for page in pages for id in page]
+    # Newest first; ids were assigned in creation order
+    assert ids == sorted(ids, reverse=True)
+    assert len(ids) == 7
+
+
+async def test_chats_created_together_are_paged_by_id(session_factory):
+    user = await setup_user(session_factory, 6, tied=4)
+
+    pages = await list_all(session_factory, user, limit=2)
+
+    ids = [id for page in pages for id in page]
+    assert ids == sorted(ids, reverse=True)
+    assert len(set(ids)) == 6
+
+
+async def test_last_full_page_has_no_cursor(session_factory):
+    user = await setup_user(session_factory, 4)
+
+    pages = await list_all(session_factory, user, limit=2)
+
+    assert [len(page) for page in pages] == [2, 2]
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "MjAyNnwx", "!!"])
+async def test_invalid_chat_cursor_is_rejected(session_factory, cursor):
+    user = await setup_user(session_factory, 1)
+
+    async with session_factory() as db:
+        with pytest.raises(HTTPException) as error:
+            await chats.get_user_chats(
+                limit=10, cursor=cursor, current_user=user, db=db
+            )
+    assert error.value.status_code == 400
+
+
+async def test_messages_page_backwards_and_poll_forwards(session_factory):
+    user = await setup_user(session_factory, 1)
+    chat_id = (await list_all(session_factory, user, limit=1))[0][0]
+    async with session_factory() as session:
+        session.add_all(
+            Message(
+                chat_id=chat_id,
+                role="user",
+                content=f"m{i}",
+                created_at=START + timedelta(seconds=i // 2),
+            )
+            for i in range(5)
+        )
+        await session.commit()
+
+    async def messages(**kwargs):
+        async with session_factory() as db:
+            kwargs = {"limit": 2, "before": None, "since": None, **kwargs}
+            return await chats.get_chat_messages(
+                chat_id, current_user=user, db=db, **kwargs
+            )
+
+    latest = await messages()
+    assert [m.content for m in latest["items"]] == ["m3", "m4"]
+    older = await messages(before=latest["before_cursor"])
+    assert [m.content for m in older["items"]] == ["m1", "m2"]
+    oldest = await messages(before=older["before_cursor"])
+    assert [m.content for m in oldest["items"]] == ["m0"]
+    assert oldest["before_cursor"] is None
+
+    # Nothing new yet: the cursor stays put
+    polled = await messages(since=latest["since_cursor"])
+    assert polled["items"] == []
+    assert polled["since_cursor"] == latest["since_cursor"]
+
+
+def bulk(*messages) -> chats.BulkMessagesRequest:
+    return chats.BulkMessagesRequest(
+        messages=[
+            {"chat_id": chat_id, "role": "user", "content": content}
+            for chat_id, content in messages
+        ]
+    )
+
+
+async def test_bulk_messages_are_inserted_in_batches(session_factory, monkeypatch):
+    user = await setup_user(session_factory, 2)
+    first, second = (await list_all(session_factory, user, limit=2))[0]
+    monkeypatch.setattr(chats.settings, "BULK_INSERT_BATCH_SIZE", 2)
+    inserts = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO messages"):
+            inserts.append(statement)
+
+    engine = session_factory.kw["bind"].sync_engine
+    event.listen(engine, "before_cursor_execute", count)
+    request = bulk(*[(first, f"a{i}") for i in range(3)], (second, "b0"), (first, "a3"))
+    async with session_factory() as db:
+        saved = await chats.save_messages_bulk(request, current_user=user, db=db)
+    event.remove(engine, "before_cursor_execute", count)
+
+    assert saved == {"saved": 5, "chats": {first: 4, second: 1}}
+    # 5 rows in multi-row INSERTs of at most 2
+    assert len(inserts) == 3
+    async with session_factory() as db:
+        result = await db.execute(select(Message.content).order_by(Message.id))
+        assert list(result.scalars()) == ["a0", "a1", "a2", "b0", "a3"]
+
+
+async def test_bulk_messages_over_the_limit_are_rejected(session_factory, monkeypatch):
+    user = await setup_user(session_factory, 1)
+    chat_id = (await list_all(session_factory, user, limit=1))[0][0]
+    monkeypatch.setattr(chats.settings, "BULK_MESSAGES_MAX", 2)
+
+    async with session_factory() as db:
+        with pytest.raises(HTTPException) as error:
+            await chats.save_messages_bulk(
+                bulk(*[(chat_id, "m")] * 3), current_user=user, db=db
+            )
+    assert error.value.status_code == 400
+
+
+async def test_bulk_messages_to_other_users_chats_save_nothing(session_factory):
+    user = await setup_user(session_factory, 1)
+    chat_id = (await list_all(session_factory, user, limit=1))[0][0]
+    async with session_factory() as db:
+        other = await db.execute(select(Chat.id).filter(Chat.title == "other"))
+        other_id = other.scalar_one()
+
+        with pytest.raises(HTTPException) as error:
+            await chats.save_messages_bulk(
+                bulk((chat_id, "mine"), (other_id, "theirs"), (999, "nobody's")),
+                current_user=user,
+                db=db,
+            )
+    assert error.value.status_code == 404
+    assert error.value.detail == f"Chat not found: {sorted([other_id, 999])}"
+    async with session_factory() as db:
+        assert (await db.execute(select(Message.id))).first() is None
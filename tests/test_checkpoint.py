@@ -0,0 +1,68 @@
+import pytest
+from langgraph.checkpoint.base import empty_checkpoint
+from langgraph.prebuilt import create_react_agent
+
+from app.agents.checkpoint import RedisCheckpointSaver, SQLCheckpointSaver
+from tests.conftest import FakeChatModel
+
+
+@pytest.fixture(params=["redis", "sql"])
+def saver(request, redis, session_factory):
+    if request.param == "redis":
+        return RedisCheckpointSaver(client=redis, history=3)
+    return SQLCheckpointSaver(session_factory=session_factory, history=3)
+
+
+def config(thread_id: str, checkpoint_id: str | None = None) -> dict:
+    configurable = {"thread_id": thread_id, "checkpoint_ns": ""}
+    if checkpoint_id:
+        configurable["checkpoint_id"] = checkpoint_id
+    return {"configurable": configurable}
+
+
+async def test_conversation_survives_a_new_agent(saver):
+    def build():
+        return create_react_agent(FakeChatModel(reply="noted"), [], checkpointer=saver)
+
+    thread = config("t1")
+    await build().ainvoke({"messages": [("user", "I earn 5000 a month")]}, thread)
+    # Another worker: a new graph reading the same store
+    result = await build().ainvoke({"messages": [("user", "and spend 3000")]}, thread)
+
+    contents = [m.content for m in result["messages"]]
+    assert contents == ["I earn 5000 a month", "noted", "and spend 3000", "noted"]
+    state = await build().aget_state(thread)
+    assert [m.content for m in state.values["messages"]] == contents
+
+
+async def test_round_trip_with_pending_writes(saver):
+    checkpoint = empty_checkpoint()
+    checkpoint["channel_values"] = {"messages": ["hello"], "summary": "s" * 1000}
+    stored = await saver.aput(config("t2"), checkpoint, {"step": 1}, {})
+    writes = [("messages", "pending"), ("summary", "x")]
+    await saver.aput_writes(stored, writes, "task-1")
+
+    found = await saver.aget_tuple(config("t2"))
+    assert found.config == stored
+    assert found.checkpoint["channel_values"] == checkpoint["channel_values"]
+    assert found.metadata["step"] == 1
+    assert found.pending_writes == [("task-1", *write) for write in writes]
+    assert found.parent_config is None
+
+
+async def test_history_is_trimmed(saver):
+    parent = None
+    ids = []
+    for step in range(6):
+        checkpoint = empty_checkpoint()
+        checkpoint["channel_values"] = {"step": step}
+        stored = await saver.aput(config("t3", parent), checkpoint, {"step": step}, {})
+        parent = stored["configurable"]["checkpoint_id"]
+        ids.append(parent)
+
+    listed = [t async for t in saver.alist(config("t3"))]
+    assert [t.config["configurable"]["checkpoint_id"] for t in listed] == ids[::-1][:3]
+    latest = await saver.aget_tuple(config("t3"))
+    assert latest.checkpoint["channel_values"] == {"step": 5}
+    assert latest.parent_config["configurable"]["checkpoint_id"] == ids[4]
+    assert await saver.aget_tuple(config("t3", ids[0])) is None
@@ -0,0 +1,76 @@
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.prebuilt import create_react_agent
+
+from app.agents import executor
+from app.agents.context import ContextState, make_context_hook
+from app.agents.quota import token_budget
+from app.core.config import settings
+from tests.conftest import FakeChatModel
+
+USAGE = {"input_tokens": 40, "output_tokens": 10, "total_tokens": 50}
+
+
+async def test_summarizing_turn_streams_only_the_answer(monkeypatch, redis):
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "SINGLE_FLIGHT_ENABLED", False)
+    monkeypatch.setattr(token_budget, "client", redis)
+
+    summarizer = FakeChatModel(reply="SUMMARY OF EARLIER TURNS", usage=USAGE)
+    agent = create_react_agent(
+        FakeChatModel(reply="final answer", usage=USAGE),
+        [],
+        state_schema=ContextState,
+        pre_model_hook=make_context_hook(summarizer, max_tokens=40),
+        checkpointer=MemorySaver(),
+    )
+    config = {"configurable": {"thread_id": "t1"}}
+    query = "tell me about budgeting " * 20
+    await agent.ainvoke({"messages": [("user", query)]}, config)
+    assert summarizer.calls == 0
+
+    events = [
+        event
+        async for event in executor.stream_agent(
+            "and what about saving?", "t1", agent=agent, user_key="u1"
+        )
+    ]
+
+    assert summarizer.calls == 1
+    assert [e["content"] for e in events if e["type"] == "token"] == ["final answer"]
+    assert events[-1] == {"type": "done", "answer": "final answer"}
+    state = await agent.aget_state(config)
+    assert state.values["summary"] == "SUMMARY OF EARLIER TURNS"
+    # The summary call is still charged
+    assert await token_budget.used("u1") == 2 * USAGE["total_tokens"]
+
+
+async def test_summary_tokens_are_charged_on_both_paths(monkeypatch, redis):
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "SINGLE_FLIGHT_ENABLED", False)
+    monkeypatch.setattr(token_budget, "client", redis)
+    summarizer = FakeChatModel(reply="SUMMARY", usage=USAGE)
+    agent = create_react_agent(
+        FakeChatModel(reply="final answer", usage=USAGE),
+        [],
+        state_schema=ContextState,
+        pre_model_hook=make_context_hook(summarizer, max_tokens=40),
+        checkpointer=MemorySaver(),
+    )
+    earlier = [("user", "tell me about budgeting " * 20)]
+    for thread in ("run", "stream"):
+        config = {"configurable": {"thread_id": thread}}
+        await agent.ainvoke({"messages": earlier}, config)
+
+    answer = await executor.run_agent(
+        "and what about saving?", "run", agent=agent, user_key="run"
+    )
+    async for _ in executor.stream_agent(
+        "and what about saving?", "stream", agent=agent, user_key="stream"
+    ):
+        pass
+
+    assert answer == "final answer"
+    assert summarizer.calls == 2
+    charged = 2 * USAGE["total_tokens"]
+    assert await token_budget.used("run") == charged
+    assert await token_budget.used("stream") == charged
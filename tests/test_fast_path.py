@@ -0,0 +1,69 @@
+import pytest
+
+from app.agents.agent import tools
+from app.agents.fast_path import fast_path_answer, match_fast_path
+
+TOOLS = {t.name: t for t in tools}
+
+
+@pytest.mark.parametrize(
+    "query, tool, args",
+    [
+        (
+            "What is the payment on a 300k loan at 6.5% for 30 years?",
+            "loan_payment_calculator",
+            {"principal": 300000, "annual_rate": 6.5, "years": 30},
+        ),
+        (
+            "If I invest $10,000 plus $200/month at 7% for 20 years?",
+            "compound_interest",
+            {"principal": 10000, "monthly_contrib": 200, "annual_rate": 7, "years": 20},
+        ),
+        (
+            "I save $500 a month for 2 years",
+            "savings_calculator",
+            {"amount": 500, "months": 24},
+        ),
+        (
+            "How much tax on 90k married filing jointly?",
+            "tax_calculator",
+            {"income": 90000, "filing_status": "married_joint"},
+        ),
+    ],
+)
+def test_matches_a_calculator(query, tool, args):
+    match = match_fast_path(query)
+    assert (match.tool, match.args, match.confidence) == (tool, args, 1.0)
+    assert fast_path_answer(query, TOOLS)
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "Should I take a 300k loan at 6.5% for 30 years or keep renting?",
+        "Is a 300k loan at 6.5% for 30 years better than 15 years?",
+        "Help me plan my retirement",
+    ],
+)
+def test_open_ended_queries_go_to_the_agent(query):
+    assert fast_path_answer(query, TOOLS) is None
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "loan 300k at 6.5% for 0 years",
+        "loan 300k at 6.5% for 0.5 years",
+        "I save $500 a month for 0 months",
+    ],
+)
+def test_terms_under_one_period_are_not_matched(query):
+    assert match_fast_path(query) is None
+    assert fast_path_answer(query, TOOLS) is None
+
+
+def test_non_finite_results_go_to_the_agent():
+    query = "invest 10k at 99999999% for 100 years"
+    assert match_fast_path(query) is not None
+    with pytest.warns(RuntimeWarning):
+        assert fast_path_answer(query, TOOLS) is None
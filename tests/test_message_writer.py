@@ -0,0 +1,105 @@
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import select
+
+from app.api.v1.chats import BulkMessage, SaveMessageRequest
+from app.models import Chat, Message, User
+from app.services import message_writer
+from app.services.message_writer import MemoryMessageWriter, new_message
+
+
+async def setup_chat(session_factory, monkeypatch) -> int:
+    monkeypatch.setattr(message_writer, "AsyncSessionLocal", session_factory)
+    async with session_factory() as session:
+        user = User(email="a@example.com", hashed_password="x")
+        chat = Chat(user=user, title="t", thread_id="thread")
+        session.add(chat)
+        await session.commit()
+        return chat.id
+
+
+async def stored(session_factory) -> list[str]:
+    async with session_factory() as session:
+        result = await session.execute(select(Message.content).order_by(Message.id))
+        return list(result.scalars())
+
+
+async def test_bad_row_does_not_block_the_queue(session_factory, monkeypatch):
+    chat_id = await setup_chat(session_factory, monkeypatch)
+    writer = MemoryMessageWriter(flush_interval=0)
+    writer.max_attempts = 3
+    bad = new_message(chat_id, "user", None)  # violates NOT NULL
+    first = new_message(chat_id, "user", "first")
+    await writer.enqueue([first, bad, new_message(chat_id, "assistant", "second")])
+
+    handle, rows = await writer._next_batch(wait=False)
+    assert await writer._write_batch(handle, rows) == [bad]
+    assert await stored(session_factory) == ["first", "second"]
+    assert writer._queue == [bad]
+
+    # Later messages are written while the bad one is retried, then dropped
+    await writer.enqueue([new_message(chat_id, "user", "third")])
+    for _ in range(3):
+        handle, rows = await writer._next_batch(wait=False)
+        await writer._write_batch(handle, rows)
+    assert await stored(session_factory) == ["first", "second", "third"]
+    assert writer._queue == []
+    assert writer._pending == {}
+
+
+async def test_flush_chat_skips_rows_that_fail(session_factory, monkeypatch):
+    chat_id = await setup_chat(session_factory, monkeypatch)
+    writer = MemoryMessageWriter(flush_interval=0)
+    bad = new_message(chat_id, "user", None)
+    await writer.enqueue([new_message(chat_id, "user", "first"), bad])
+
+    await writer.flush_chat(chat_id)
+
+    assert await stored(session_factory) == ["first"]
+    assert list(writer._pending[chat_id].values()) == [bad]
+
+
+async def test_rows_are_written_in_conversation_order(session_factory, monkeypatch):
+    chat_id = await setup_chat(session_factory, monkeypatch)
+    rows = [
+        new_message(chat_id, "user", "question"),
+        new_message(chat_id, "assistant", "answer"),
+    ]
+    assert rows[0]["created_at"] < rows[1]["created_at"]
+
+    # e.g. a pending hash read back in another order
+    assert await message_writer.write_each(rows[::-1]) == []
+
+    async with session_factory() as session:
+        result = await session.execute(
+            select(Message.content).order_by(Message.created_at, Message.id)
+        )
+        assert list(result.scalars()) == ["question", "answer"]
+
+
+async def test_outage_does_not_drop_messages(monkeypatch):
+    async def unavailable(rows):
+        raise ConnectionError("database down")
+
+    async def database_down():
+        return False
+
+    monkeypatch.setattr(message_writer, "write_messages", unavailable)
+    monkeypatch.setattr(message_writer, "database_available", database_down)
+    writer = MemoryMessageWriter(flush_interval=0)
+    writer.max_attempts = 1
+    rows = [new_message(1, "user", "a"), new_message(1, "user", "b")]
+    await writer.enqueue(rows)
+
+    for _ in range(3):
+        handle, batch = await writer._next_batch(wait=False)
+        assert await writer._write_batch(handle, batch) == rows
+    assert writer._queue == rows
+
+
+def test_message_requests_reject_rows_the_table_cannot_store():
+    with pytest.raises(ValidationError):
+        SaveMessageRequest(role="x" * 60, content="hi")
+    with pytest.raises(ValidationError):
+        BulkMessage(chat_id=1, role="user", content="x" * 20000)
+    assert SaveMessageRequest(role="tool", content="{}").role == "tool"
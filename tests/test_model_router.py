@@ -0,0 +1,79 @@
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.prebuilt import create_react_agent
+
+from app.agents.agent import tools
+from app.agents.model_router import LARGE, SMALL, ModelRouter, RouteMetrics
+from tests.conftest import FakeChatModel
+
+USAGE = {"input_tokens": 1000, "output_tokens": 100, "total_tokens": 1100}
+
+
+def router(redis, **models) -> ModelRouter:
+    models = {
+        SMALL: FakeChatModel(reply="small"),
+        LARGE: FakeChatModel(reply="large"),
+        **models,
+    }
+    metrics = RouteMetrics(client=redis, prefix="test_router")
+    return ModelRouter(models, tools, metrics=metrics, min_confidence=0.5)
+
+
+def test_simple_query_stays_on_the_small_tier(redis):
+    query = "What's the payment on a 300k loan at 6%?"
+    route = router(redis).route([HumanMessage(query)])
+    assert route.tier == SMALL
+    assert route.reason == "simple"
+
+
+def test_open_ended_multi_topic_query_starts_large(redis):
+    query = (
+        "Should I pay off my credit card debt first or invest for retirement, "
+        "and how does that change my budget?"
+    )
+    route = router(redis).route([HumanMessage(query)])
+    assert route.tier == LARGE
+    assert route.reason == "low_confidence"
+
+
+def test_failed_tool_call_escalates_the_rest_of_the_turn(redis):
+    call = AIMessage("", tool_calls=[{"name": "budget_planner", "args": {}, "id": "1"}])
+    failed = ToolMessage("Error parsing budget.", tool_call_id="1")
+    model_router = router(redis)
+
+    turn = [HumanMessage("Budget 5000"), call, failed]
+    assert model_router.route(turn).reason == "tool_error"
+    # Earlier turns don't count
+    later = [*turn, AIMessage("ok"), HumanMessage("Tax on 80k")]
+    assert model_router.route(later).tier == SMALL
+
+
+async def test_agent_escalates_after_a_tool_error_and_records_stats(redis):
+    bad_call = AIMessage(
+        "",
+        tool_calls=[
+            {
+                "name": "budget_planner",
+                "args": {"income": 5000, "expenses": "rent 1500"},
+                "id": "1",
+            }
+        ],
+    )
+    small = FakeChatModel(replies=[bad_call], reply="small", usage=USAGE)
+    large = FakeChatModel(reply="large answer", usage=USAGE)
+    model_router = router(redis, small=small, large=large)
+    agent = create_react_agent(model_router, tools, checkpointer=MemorySaver())
+
+    result = await agent.ainvoke(
+        {"messages": [("user", "Make me a budget for 5000 a month")]},
+        {"configurable": {"thread_id": "t"}},
+    )
+
+    assert result["messages"][-1].content == "large answer"
+    assert (small.calls, large.calls) == (1, 1)
+    stats = await model_router.metrics.stats()
+    assert stats["tiers"]["small"]["calls"] == 1
+    assert stats["tiers"]["large"]["calls"] == 1
+    assert stats["tiers"]["large"]["input_tokens"] == 1000
+    assert stats["escalations"] == {"low_confidence": 0, "tool_error": 1}
+    assert stats["tiers"]["large"]["cost_usd"] > stats["tiers"]["small"]["cost_usd"] > 0
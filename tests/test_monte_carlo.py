@@ -0,0 +1,61 @@
+import pytest
+from pydantic import ValidationError
+
+from app.api.v1.simulations import MonteCarloRequest
+from app.services import monte_carlo
+
+
+@pytest.mark.parametrize(
+    "field, value",
+    [
+        ("annual_return", -100),
+        ("annual_return", -250),
+        ("volatility", -1),
+        ("paths", 0),
+    ],
+)
+def test_request_rejects_out_of_range_assumptions(field, value):
+    with pytest.raises(ValidationError):
+        MonteCarloRequest(current_savings=1000, years=10, **{field: value})
+
+
+def test_simulate_rejects_a_total_loss_return():
+    with pytest.raises(ValueError, match="above -100"):
+        monte_carlo.simulate(1000, 100, 10, -100, 15, paths=100)
+
+
+def test_worker_pool_is_reused_and_matches_in_process(monkeypatch):
+    args = (10_000, 500, 20, 7, 15)
+    kwargs = {"paths": 4_000, "seed": 1, "chunk_size": 1_000}
+    try:
+        pooled = monte_carlo.simulate(*args, workers=2, **kwargs)
+        pool = monte_carlo.get_pool(2)
+        again = monte_carlo.simulate(*args, workers=2, **kwargs)
+        assert monte_carlo.get_pool(2) is pool
+    finally:
+        monte_carlo.shutdown_pools()
+    assert pool._mp_context.get_start_method() == "spawn"
+    assert pooled == again == monte_carlo.simulate(*args, workers=0, **kwargs)
+
+
+@pytest.mark.parametrize(
+    "field, value",
+    [("years", 100_000), ("current_savings", 1e15), ("monthly_contribution", -5)],
+)
+def test_tool_rejects_out_of_range_inputs(monkeypatch, field, value):
+    from app.agents.agent import monte_carlo_simulation
+
+    def no_simulation(*args, **kwargs):
+        raise AssertionError("simulate called")
+
+    monkeypatch.setattr(monte_carlo, "simulate", no_simulation)
+    args = {"current_savings": 1000, "monthly_contribution": 100, "years": 10}
+    message = monte_carlo_simulation.invoke(
+        {
+            "name": "monte_carlo_simulation",
+            "args": {**args, field: value},
+            "id": "1",
+            "type": "tool_call",
+        }
+    )
+    assert message.content.startswith(f"Error: {field}:")
@@ -0,0 +1,110 @@
+import asyncio
+import json
+
+import pytest
+from reportlab.platypus import Paragraph
+
+from app.models import Chat, Message, User
+from app.services import insights, message_writer
+from app.services.pdf_generator import get_styles, render_report_file
+from app.services.report_jobs import ReportJobs
+
+
+async def setup_user(session_factory, monkeypatch) -> int:
+    monkeypatch.setattr(insights, "AsyncSessionLocal", session_factory)
+    monkeypatch.setattr(message_writer, "AsyncSessionLocal", session_factory)
+    async with session_factory() as session:
+        user = User(email="a@example.com", hashed_password="x")
+        chat = Chat(user=user, title="Budget", thread_id="thread")
+        tool_call = {
+            "name": "tax_calculator",
+            "input": {"income": 90000},
+            "result": None,
+        }
+        chat.messages = [
+            Message(role="user", content="How much tax on 90k?"),
+            Message(role="tool", content=json.dumps(tool_call)),
+            Message(role="assistant", content="About 11k."),
+        ]
+        session.add(chat)
+        await session.commit()
+        return user.id
+
+
+async def test_report_job_summarizes_new_messages(
+    session_factory, monkeypatch, redis, tmp_path
+):
+    user_id = await setup_user(session_factory, monkeypatch)
+    summarized = asyncio.Event()
+
+    async def summarize(summary, messages):
+        await summarized.wait()
+        return f"{len(messages)} messages"
+
+    monkeypatch.setattr(insights, "_summarize", summarize)
+    jobs = ReportJobs(client=redis, prefix="test_job", cache_dir=str(tmp_path))
+    rendered = []
+
+    async def render(report_hash, inputs):
+        rendered.append(inputs)
+        (tmp_path / f"{report_hash}.pdf").write_bytes(b"%PDF")
+
+    monkeypatch.setattr(jobs, "_render", render)
+
+    async with session_factory() as db:
+        assert await insights.has_new_messages(db, user_id)
+    user = {"name": "A", "email": "a@example.com"}
+    job = await jobs.submit_later(
+        user_id, lambda: insights.prepare_report_inputs(user_id, user)
+    )
+
+    # The job is returned before any summary is written
+    assert job["status"] == "pending"
+    assert (await jobs.get(job["id"]))["status"] == "pending"
+
+    summarized.set()
+    await asyncio.gather(*jobs._trackers)
+    stored = await jobs.get(job["id"])
+    assert stored["status"] == "done"
+    assert stored["host"] == jobs.host
+    assert rendered[0]["chat_summary"] == "Budget: 2 messages"
+    assert rendered[0]["user_data"]["annual_income"] == 90000
+
+    async with session_factory() as db:
+        assert not await insights.has_new_messages(db, user_id)
+        user_data, summary = insights.report_inputs(
+            user, await insights.load_user_insights(db, user_id)
+        )
+    # Unchanged inputs hit the cached file and are done at once
+    again = await jobs.submit(user_id, user_data, summary)
+    assert again["status"] == "done"
+    assert again["hash"] == stored["hash"]
+
+
+def test_report_file_is_written_whole(tmp_path):
+    pulled = []
+
+    def transcript():
+        for i in range(2000):
+            pulled.append(i)
+            yield Paragraph(f"Message {i}", get_styles()["Normal"])
+
+    path = tmp_path / "report.pdf"
+    user = {"name": "A", "monthly_income": 5000}
+    render_report_file(user, "Budget: 2 messages", str(path), sections=transcript())
+
+    data = path.read_bytes()
+    assert data.startswith(b"%PDF-")
+    assert data.rstrip().endswith(b"%%EOF")
+    assert len(pulled) == 2000
+    assert [p.name for p in tmp_path.iterdir()] == ["report.pdf"]
+
+
+def test_failed_render_leaves_no_partial_file(tmp_path):
+    def broken():
+        yield Paragraph("Message 0", get_styles()["Normal"])
+        raise RuntimeError("bad section")
+
+    with pytest.raises(RuntimeError):
+        render_report_file({}, "", str(tmp_path / "report.pdf"), sections=broken())
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from app.services.scenarios import CALCULATORS, expand_range, parse_grid_spec, run_batch
+
+
+@pytest.mark.parametrize(
+    "start, stop, step",
+    [(0, 10, 1), (200, 2000, 50), (5, 7, 0.5), (0, 1, 0.3), (3, 1, 1)],
+)
+def test_expand_range_matches_inclusive_arange(start, stop, step):
+    expected = np.arange(start, stop + step / 2, step)
+    np.testing.assert_array_equal(expand_range(start, stop, step), expected)
+
+
+def test_huge_range_is_rejected_before_allocating(monkeypatch):
+    def no_arange(*args, **kwargs):
+        raise AssertionError("arange called")
+
+    monkeypatch.setattr(np, "arange", no_arange)
+    with pytest.raises(ValueError, match="limit"):
+        expand_range(0, 1e10, 1)
+    with pytest.raises(ValueError, match="limit"):
+        parse_grid_spec("debt_amount:0..1e10..1")
+    with pytest.raises(ValueError, match="finite"):
+        expand_range(0, float("inf"), 1)
+
+
+def test_oversized_grid_is_rejected_without_overflow():
+    # 65536**4 is 2**64: an int64 product wraps around to 0
+    axis = np.arange(65536, dtype=float)
+    params = CALCULATORS["retirement_calculator"].params
+    grid = {p: axis for p in params[:4]} | {params[4]: np.array([7.0])}
+    with pytest.raises(ValueError, match="limit"):
+        run_batch("retirement_calculator", grid)
@@ -0,0 +1,65 @@
+import pytest
+
+from app.agents.agent import tools
+from app.agents.tool_results import RESULT_TYPES, ToolResult, parse_result
+
+TOOLS = {t.name: t for t in tools}
+
+ARGS = {
+    "savings_calculator": {"amount": 500, "months": 24},
+    "compound_interest": {
+        "principal": 10000, "monthly_contrib": 200, "annual_rate": 7, "years": 20
+    },
+    "loan_payment_calculator": {"principal": 300000, "annual_rate": 6.5, "years": 30},
+    "portfolio_analyzer": {"investments": "stocks:60,bonds:30,cash:10"},
+    "budget_planner": {"income": 5000, "expenses": "rent:1500,food:500"},
+    "retirement_calculator": {
+        "current_age": 35,
+        "retirement_age": 65,
+        "current_savings": 50000,
+        "monthly_contribution": 800,
+        "annual_return": 7,
+    },
+    "debt_payoff_calculator": {
+        "debt_amount": 10000,
+        "interest_rate": 18,
+        "payment_strategies": "minimum:200,aggressive:500",
+    },
+    "emergency_fund_calculator": {"monthly_expenses": 3000, "current_savings": 5000},
+    "tax_calculator": {"income": 90000, "filing_status": "married_joint"},
+    "scenario_sweep": {
+        "calculator": "loan_payment_calculator",
+        "grid": "principal:300000;annual_rate:5,6,7;years:15,30",
+    },
+    "monte_carlo_simulation": {
+        "current_savings": 50000,
+        "monthly_contribution": 500,
+        "years": 20,
+        "target_amount": 500000,
+    },
+}
+
+
+def test_every_typed_tool_is_covered():
+    assert set(ARGS) == set(RESULT_TYPES)
+
+
+@pytest.mark.parametrize("name", sorted(RESULT_TYPES))
+def test_artifact_round_trips(name):
+    message = TOOLS[name].invoke(
+        {"name": name, "args": ARGS[name], "id": "1", "type": "tool_call"}
+    )
+    result = parse_result(name, message.artifact)
+
+    assert isinstance(result, RESULT_TYPES[name])
+    assert result.model_dump() == message.artifact
+    assert result.compact() == message.content
+    assert result.summary().strip()
+
+
+def test_results_must_define_a_summary():
+    class Unsummarized(ToolResult):
+        total: float
+
+    with pytest.raises(TypeError):
+        Unsummarized(total=1.0)
@@ -0,0 +1,146 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.agents.transport import ResilientTransport
+from app.core.config import settings
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_RETRY_BACKOFF_SECONDS", 0.001)
+
+
+def transport(responses: list, **kwargs) -> tuple[ResilientTransport, list]:
+    """Transport over a mock answering with `responses` in turn.
+
+    The last response repeats once the others are used up. Exceptions in
+    `responses` are raised by the mock.
+    """
+    requests = []
+
+    async def handler(request: httpx.Request):
+        requests.append(request)
+        response = responses.pop(0) if len(responses) > 1 else responses[0]
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    return ResilientTransport(inner=httpx.MockTransport(handler), **kwargs), requests
+
+
+async def post(transport_: ResilientTransport) -> httpx.Response:
+    async with httpx.AsyncClient(transport=transport_) as client:
+        return await client.post("https://llm.test/v1/chat/completions", json={"q": 1})
+
+
+async def test_retries_server_errors_with_the_same_body():
+    t, requests = transport(
+        [httpx.Response(503), httpx.Response(502), httpx.Response(200)]
+    )
+    response = await post(t)
+    assert response.status_code == 200
+    assert len(requests) == 3
+    assert {r.content for r in requests} == {b'{"q":1}'}
+    assert t.stats()["retries"] == 2
+
+
+async def test_gives_up_after_max_retries():
+    t, requests = transport([httpx.Response(429)], max_retries=2)
+    response = await post(t)
+    assert response.status_code == 429
+    assert len(requests) == 3
+
+
+async def test_client_errors_are_not_retried():
+    t, requests = transport([httpx.Response(400)])
+    assert (await post(t)).status_code == 400
+    assert len(requests) == 1
+
+
+async def test_connection_errors_are_retried_then_raised():
+    t, requests = transport([httpx.ConnectError("down")], max_retries=1)
+    with pytest.raises(httpx.ConnectError):
+        await post(t)
+    assert len(requests) == 2
+
+
+async def test_retry_after_is_honored(monkeypatch):
+    waits = []
+    original = ResilientTransport.backoff
+
+    def backoff(attempt, retry_after=None):
+        waits.append(original(attempt, retry_after))
+        return 0
+
+    monkeypatch.setattr(ResilientTransport, "backoff", staticmethod(backoff))
+    t, _ = transport(
+        [httpx.Response(429, headers={"Retry-After": "3"}), httpx.Response(200)]
+    )
+    assert (await post(t)).status_code == 200
+    assert waits == [3.0]
+
+
+def test_backoff_is_capped_and_ignores_http_dates(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_RETRY_BACKOFF_MAX_SECONDS", 8.0)
+    assert ResilientTransport.backoff(0, "120") == 8.0
+    assert 0 <= ResilientTransport.backoff(0, "Wed, 21 Oct 2015 07:28:00 GMT") <= 0.001
+    assert all(0 <= ResilientTransport.backoff(10) <= 8.0 for _ in range(100))
+
+
+async def test_slow_attempt_times_out_and_is_retried():
+    calls = 0
+
+    async def handler(request):
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            await asyncio.sleep(5)
+        return httpx.Response(200)
+
+    t = ResilientTransport(inner=httpx.MockTransport(handler), attempt_timeout=0.05)
+    assert (await post(t)).status_code == 200
+    assert t.stats()["timeouts"] == 1
+    assert t.stats()["retries"] == 1
+
+
+async def test_hedged_request_wins_over_a_slow_one(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_HEDGE_AFTER_MS", 50.0)
+    monkeypatch.setattr(settings, "LLM_HEDGE_MIN_SAMPLES", 1000)
+    calls = 0
+    cancelled = asyncio.Event()
+
+    async def handler(request):
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+        return httpx.Response(200, json={"attempt": calls})
+
+    t = ResilientTransport(inner=httpx.MockTransport(handler), hedge=True)
+    start = time.perf_counter()
+    response = await post(t)
+
+    assert time.perf_counter() - start < 1
+    assert response.json() == {"attempt": 2}
+    stats = t.stats()
+    assert (stats["hedges"], stats["hedge_wins"]) == (1, 1)
+    await asyncio.wait_for(cancelled.wait(), 1)  # the slow attempt was cancelled
+
+
+async def test_no_hedge_when_disabled(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_HEDGE_AFTER_MS", 10.0)
+
+    async def handler(request):
+        await asyncio.sleep(0.05)
+        return httpx.Response(200)
+
+    t = ResilientTransport(inner=httpx.MockTransport(handler), hedge=False)
+    assert (await post(t)).status_code == 200
+    assert t.stats()["hedges"] == 0